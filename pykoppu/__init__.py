@@ -7,5 +7,6 @@ from . import oos
 from . import problems
 from . import electrophysiology
 from . import biocompiler
+from . import solvers
 
-__all__ = ["opu", "oos", "problems", "electrophysiology", "biocompiler"]
+__all__ = ["opu", "oos", "problems", "electrophysiology", "biocompiler", "solvers"]
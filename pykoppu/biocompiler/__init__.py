@@ -4,5 +4,8 @@ BioCompiler Package Initialization.
 
 from .isa import OpCode, Instruction
 from .compiler import BioCompiler
+from .embedding import Embedder, Embedding
+from .binary import encode_program, dumps_program, loads_program, save_program, load_program
 
-__all__ = ["OpCode", "Instruction", "BioCompiler"]
+__all__ = ["OpCode", "Instruction", "BioCompiler", "Embedder", "Embedding",
+           "encode_program", "dumps_program", "loads_program", "save_program", "load_program"]
@@ -0,0 +1,169 @@
+"""
+Binary BioASM Module.
+
+This module serializes BioASM programs into a compact binary format: a
+small header followed by the raw array operands, each aligned so that it
+can be mapped straight into memory.
+
+Layout::
+
+    MAGIC (8 bytes) | header length (uint32, little endian) | JSON header
+    | padding | buffer 0 | padding | buffer 1 | ...
+
+The JSON header lists the instructions; scalar operands are stored inline
+and array operands refer to a buffer by its absolute offset, dtype and shape.
+"""
+
+import os
+import json
+import struct
+import numpy as np
+from typing import Any, Dict, List, Union
+from .isa import OpCode, Instruction
+
+MAGIC = b"\x93BIOASM\x01"
+
+# Alignment of every buffer in bytes (one cache line)
+ALIGNMENT = 64
+
+def _padding(position: int) -> int:
+    """Bytes needed to align a position."""
+    return -position % ALIGNMENT
+
+def _encode_operand(operand: Any, arrays: List[np.ndarray]) -> Dict[str, Any]:
+    """Describe an operand in the header; arrays are queued as buffers."""
+    if isinstance(operand, list):
+        try:
+            array = np.asarray(operand)
+        except ValueError:
+            array = None
+        if array is not None and array.dtype != object and array.dtype.kind in "biuf":
+            operand = array
+    if isinstance(operand, np.ndarray) and operand.dtype != object:
+        arrays.append(np.ascontiguousarray(operand))
+        return {"buffer": len(arrays) - 1}
+    if isinstance(operand, np.generic):
+        operand = operand.item()
+    return {"value": operand}
+
+def encode_program(instructions: List[Instruction]) -> List[Union[bytes, memoryview]]:
+    """
+    Serialize a program into a list of chunks.
+
+    Array operands are not copied: their chunks are memoryviews of the
+    arrays, ready for file.writelines or socket.sendmsg.
+
+    Args:
+        instructions (List[Instruction]): The program.
+
+    Returns:
+        List[Union[bytes, memoryview]]: Chunks whose concatenation is the binary program.
+    """
+    arrays: List[np.ndarray] = []
+    program = [
+        {"opcode": instr.opcode.name, "operands": [_encode_operand(op, arrays) for op in instr.operands]}
+        for instr in instructions
+    ]
+
+    def header_bytes(buffers: List[Dict[str, Any]]) -> bytes:
+        return json.dumps({"program": program, "buffers": buffers}, separators=(",", ":")).encode()
+
+    # Offsets depend on the header length, which depends on the offsets:
+    # iterate until the layout is stable (digits only ever grow)
+    buffers = [{"offset": 0, "dtype": a.dtype.str, "shape": list(a.shape)} for a in arrays]
+    while True:
+        header = header_bytes(buffers)
+        position = len(MAGIC) + 4 + len(header)
+        offsets = []
+        for array in arrays:
+            position += _padding(position)
+            offsets.append(position)
+            position += array.nbytes
+        if offsets == [b["offset"] for b in buffers]:
+            break
+        for buffer, offset in zip(buffers, offsets):
+            buffer["offset"] = offset
+
+    chunks: List[Union[bytes, memoryview]] = [MAGIC, struct.pack("<I", len(header)), header]
+    position = len(MAGIC) + 4 + len(header)
+    for array, buffer in zip(arrays, buffers):
+        chunks.append(b"\0" * (buffer["offset"] - position))
+        chunks.append(memoryview(array).cast("B") if array.nbytes else b"")
+        position = buffer["offset"] + array.nbytes
+    return chunks
+
+def loads_program(buffer: Any) -> List[Instruction]:
+    """
+    Deserialize a program from any buffer (bytes, mmap, np.memmap).
+
+    Array operands are read-only views into the buffer; nothing is copied.
+
+    Args:
+        buffer: The binary program.
+
+    Returns:
+        List[Instruction]: The program.
+
+    Raises:
+        ValueError: If the buffer is not a binary BioASM program.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    start = len(MAGIC) + 4
+    if data.size < start or data[:len(MAGIC)].tobytes() != MAGIC:
+        raise ValueError("Not a binary BioASM program.")
+    (length,) = struct.unpack("<I", data[len(MAGIC):start].tobytes())
+    header = json.loads(data[start:start + length].tobytes())
+
+    arrays = []
+    for spec in header["buffers"]:
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        array = data[spec["offset"]:spec["offset"] + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+        array.flags.writeable = False
+        arrays.append(array)
+
+    return [
+        Instruction(
+            OpCode[instr["opcode"]],
+            [arrays[op["buffer"]] if "buffer" in op else op["value"] for op in instr["operands"]]
+        )
+        for instr in header["program"]
+    ]
+
+def dumps_program(instructions: List[Instruction]) -> bytes:
+    """
+    Serialize a program into bytes.
+
+    Args:
+        instructions (List[Instruction]): The program.
+
+    Returns:
+        bytes: The binary program.
+    """
+    return b"".join(encode_program(instructions))
+
+def save_program(path: Union[str, os.PathLike], instructions: List[Instruction]) -> None:
+    """
+    Write a program to a file, streaming the array operands.
+
+    Args:
+        path: Destination file.
+        instructions (List[Instruction]): The program.
+    """
+    with open(path, 'wb') as f:
+        f.writelines(encode_program(instructions))
+
+def load_program(path: Union[str, os.PathLike]) -> List[Instruction]:
+    """
+    Open a program file memory-mapped.
+
+    Array operands are read-only views of the mapped file, so loading costs
+    O(header) however large the couplings are.
+
+    Args:
+        path: Program file.
+
+    Returns:
+        List[Instruction]: The program.
+    """
+    return loads_program(np.memmap(path, dtype=np.uint8, mode='r'))
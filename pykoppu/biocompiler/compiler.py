@@ -4,23 +4,94 @@ BioCompiler Module.
 This module compiles high-level problem descriptions into BioASM instructions.
 """
 
-from typing import List, Any
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Any, Optional
 from .isa import OpCode, Instruction
+from .embedding import Embedder
+from ..opu.kernel import Kernel, LowRankCoupling
+from ..problems.cache import BuildCache, get_cache, stable_hash
+
+def _view(array: Any) -> np.ndarray:
+    """Read-only view of an array operand (no copy for ndarrays)."""
+    view = np.asarray(array).view()
+    view.flags.writeable = False
+    return view
 
 class BioCompiler:
     """
     Compiler for translating problems into BioASM instructions.
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, precision: Optional[str] = None, cache: Optional[BuildCache] = None, embedder: Optional[Embedder] = None):
+        """
+        Initialize the compiler.
+        
+        Args:
+            precision (Optional[str]): Coefficient precision of the emitted program
+                ("float64", "float32" or "int16"). Defaults to None, which keeps
+                the problem's own precision.
+            cache (Optional[BuildCache]): Cache for compiled programs. Defaults to
+                None, which uses the default cache (see pykoppu.problems.set_cache).
+            embedder (Optional[Embedder]): Places variables on MEA channels and
+                emits a MAP instruction. Defaults to None (identity placement).
+        """
+        self.precision = precision
+        self.cache = cache
+        self.embedder = embedder
+        self.embedding = None
         
+    def _program_key(self, problem: Any, strategy: str, duration: float) -> Optional[str]:
+        """
+        Cache key of a program: the problem's key plus every compile setting.
+        """
+        if not hasattr(problem, 'cache_key'):
+            return None
+        device = None
+        if self.embedder is not None:
+            device = (self.embedder.opu.capacity, self.embedder.opu.layout, self.embedder.max_passes)
+        try:
+            return stable_hash(
+                problem.cache_key(), getattr(problem, 'precision', "float64"), getattr(problem, 'scale', 1.0),
+                self.precision, strategy, float(duration), device
+            )
+        except TypeError:
+            return None
+            
     def compile(self, problem: Any, strategy: str = "annealing", duration: float = 1000.0) -> List[Instruction]:
+        """
+        Compile a problem into a sequence of instructions, reusing a cached program if available.
+        
+        Args:
+            problem: The problem instance (must have J and h attributes; J may be
+                scipy.sparse or a LowRankCoupling).
+            strategy (str): The compilation strategy. Defaults to "annealing".
+            duration (float): Total simulation duration in milliseconds. Defaults to 1000.0.
+            
+        Returns:
+            List[Instruction]: The sequence of BioASM instructions.
+        """
+        cache = self.cache if self.cache is not None else get_cache()
+        key = None if cache is None else self._program_key(problem, strategy, duration)
+        if key is not None:
+            instructions = cache.load_program(key)
+            if instructions is not None:
+                if self.embedder is not None:
+                    self.embedding = self.embedder.embed(problem)
+                return instructions
+                
+        instructions = self._compile(problem, strategy=strategy, duration=duration)
+        if key is not None:
+            cache.store_program(key, instructions)
+        return instructions
+        
+    def _compile(self, problem: Any, strategy: str = "annealing", duration: float = 1000.0) -> List[Instruction]:
         """
         Compile a problem into a sequence of instructions.
         
         Args:
-            problem: The problem instance (must have J and h attributes).
+            problem: The problem instance (must have J and h attributes; J may be
+                scipy.sparse or a LowRankCoupling).
             strategy (str): The compilation strategy. Defaults to "annealing".
             duration (float): Total simulation duration in milliseconds. Defaults to 1000.0.
             
@@ -34,10 +105,40 @@ class BioCompiler:
         num_vars = problem.J.shape[0]
         instructions.append(Instruction(OpCode.ALC, [num_vars]))
         
+        # Topology-aware placement: strongly coupled variables on nearby channels
+        if self.embedder is not None:
+            self.embedding = self.embedder.embed(problem)
+            instructions.append(Instruction(OpCode.MAP, [_view(self.embedding.channels)]))
+        
+        # Coefficient precision: convert only if the compiler overrides the problem's
+        J, h, K = problem.J, problem.h, list(getattr(problem, 'K', []))
+        scale = getattr(problem, 'scale', 1.0)
+        precision = getattr(problem, 'precision', "float64")
+        if self.precision is not None and self.precision != precision:
+            J, h, K, scale = Kernel.quantize(J, h, self.precision, K=K, scale=scale)
+            precision = self.precision
+        if precision != "float64":
+            instructions.append(Instruction(OpCode.PRC, [precision, scale]))
+        
         # 2. Load Hamiltonian (J and h)
-        # We pass the raw data as operands (simplified for this implementation)
-        instructions.append(Instruction(OpCode.LDJ, [problem.J.tolist()]))
-        instructions.append(Instruction(OpCode.LDH, [problem.h.tolist()]))
+        # Arrays are passed as read-only views, without copying
+        factors = None
+        if isinstance(J, LowRankCoupling):
+            # Sparse part as usual, factors follow as LDL
+            J, factors = J.sparse, (J.U, J.V)
+        if sp.issparse(J):
+            # Sparse J is shipped as COO triplets (rows, cols, values)
+            J = sp.coo_matrix(J)
+            instructions.append(Instruction(OpCode.LDS, [_view(J.row), _view(J.col), _view(J.data)]))
+        else:
+            instructions.append(Instruction(OpCode.LDJ, [_view(J)]))
+        if factors is not None:
+            instructions.append(Instruction(OpCode.LDL, [_view(factors[0]), _view(factors[1])]))
+        instructions.append(Instruction(OpCode.LDH, [_view(h)]))
+        
+        # Higher-order (k-PUBO) hyperedges, one LDK per arity block
+        for block in K:
+            instructions.append(Instruction(OpCode.LDK, [_view(block.indices), _view(block.weights)]))
         
         # 3. Apply Strategy
         # Convert duration from ms to seconds
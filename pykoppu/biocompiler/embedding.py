@@ -0,0 +1,231 @@
+"""
+Embedding Module.
+
+This module maps logical problem variables onto physical MEA channels.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from ..opu.device import OPU
+from ..opu.pobit import Pobit
+from ..problems.cache import BuildCache, get_cache, stable_hash
+from ..solvers.decomposition import interaction_graph
+
+@dataclass
+class Embedding:
+    """
+    Placement of logical variables on MEA channels.
+
+    Attributes:
+        channels (np.ndarray): Channel of every logical variable.
+        latency (float): Mean feedback latency between coupled variables,
+            weighted by |J|, in seconds.
+        baseline_latency (float): The same for variables placed in order on
+            channels 0..n-1.
+    """
+    channels: np.ndarray
+    latency: float
+    baseline_latency: float
+
+    def pobits(self) -> List[Pobit]:
+        """
+        Get one pobit per logical variable, indexed by its channel.
+
+        Returns:
+            List[Pobit]: The pobits in variable order.
+        """
+        return [Pobit(int(channel), label=f"x{i}") for i, channel in enumerate(self.channels)]
+
+    def __repr__(self):
+        return f"Embedding(variables={len(self.channels)}, latency={self.latency:.3e}, baseline_latency={self.baseline_latency:.3e})"
+
+class Embedder:
+    """
+    Topology-aware placement of logical variables on OPU channels.
+
+    Placement minimizes sum_{i<j} |J_ij| latency(channel_i, channel_j) over the
+    feedback latency model of the OPU: variables are placed greedily, most
+    strongly attached first, each on the free channel closest to its placed
+    neighbours, then refined by single moves and pairwise swaps.
+
+    Embeddings depend only on the structure of a problem (the sparsity
+    pattern of J and K) and on the OPU, so they are cached per structure in
+    memory and, when available, in the BuildCache. Re-solving an instance
+    with the same structure skips placement.
+    """
+
+    def __init__(self, opu: Optional[OPU] = None, cache: Optional[BuildCache] = None, max_passes: int = 10):
+        """
+        Initialize the embedder.
+
+        Args:
+            opu (Optional[OPU]): The target device. Defaults to OPU().
+            cache (Optional[BuildCache]): Cache for embeddings. Defaults to None,
+                which uses the default cache (see pykoppu.problems.set_cache).
+            max_passes (int): Maximum refinement passes. Defaults to 10.
+        """
+        self.opu = opu if opu is not None else OPU()
+        self.cache = cache
+        self.max_passes = max_passes
+        self._embeddings: Dict[str, np.ndarray] = {}
+
+    def structure_key(self, graph: sp.csr_matrix) -> str:
+        """
+        Cache key of an interaction graph: its sparsity pattern and the device.
+
+        Args:
+            graph (sp.csr_matrix): Interaction graph (see interaction_graph).
+
+        Returns:
+            str: The key.
+        """
+        graph = sp.csr_matrix(graph)
+        graph.sort_indices()
+        return stable_hash(
+            graph.shape[0], graph.indptr, graph.indices,
+            self.opu.capacity, self.opu.layout, self.max_passes
+        )
+
+    def embed(self, problem: Any) -> Embedding:
+        """
+        Embed a problem, reusing the placement of a problem with the same structure.
+
+        Args:
+            problem: The problem instance (must have a J attribute; K is honoured).
+
+        Returns:
+            Embedding: The placement and its latency.
+        """
+        graph = interaction_graph(problem.J, getattr(problem, 'K', []))
+        key = self.structure_key(graph)
+        cache = self.cache if self.cache is not None else get_cache()
+
+        channels = self._embeddings.get(key)
+        if channels is None and cache is not None:
+            channels = cache.load_embedding(key)
+        if channels is None:
+            channels = self.place(graph)
+            if cache is not None:
+                cache.store_embedding(key, channels)
+        self._embeddings[key] = channels
+        return self.evaluate(graph, channels)
+
+    def evaluate(self, graph: sp.csr_matrix, channels: np.ndarray) -> Embedding:
+        """
+        Measure the feedback latency of a placement.
+
+        Args:
+            graph (sp.csr_matrix): Interaction graph.
+            channels (np.ndarray): Channel of every variable.
+
+        Returns:
+            Embedding: The placement with its latency statistics.
+        """
+        upper = sp.triu(graph, k=1).tocoo()
+        latency = self.opu.feedback_latency()
+        total = upper.data.sum()
+
+        def mean_latency(placement: np.ndarray) -> float:
+            if total == 0:
+                return 0.0
+            return float(upper.data @ latency[placement[upper.row], placement[upper.col]] / total)
+
+        channels = np.asarray(channels)
+        return Embedding(
+            channels=channels,
+            latency=mean_latency(channels),
+            baseline_latency=mean_latency(np.arange(graph.shape[0]))
+        )
+
+    def place(self, graph: sp.csr_matrix) -> np.ndarray:
+        """
+        Place the variables of an interaction graph on channels.
+
+        Args:
+            graph (sp.csr_matrix): Symmetric weighted interaction graph.
+
+        Returns:
+            np.ndarray: Channel of every variable.
+
+        Raises:
+            ValueError: If the problem has more variables than the OPU has channels.
+        """
+        n, capacity = graph.shape[0], self.opu.capacity
+        if n > capacity:
+            raise ValueError(
+                f"Problem has {n} variables but the OPU has {capacity} channels; "
+                "use pykoppu.solvers.DecompositionSolver to split it."
+            )
+        W = sp.csr_matrix(graph, dtype=float)
+        L = self.opu.feedback_latency()
+        np.fill_diagonal(L, 0.0)
+        centrality = L.sum(axis=1)
+        degree = np.asarray(W.sum(axis=1)).ravel()
+
+        channels = np.full(n, -1)
+        owner = np.full(capacity, -1)
+
+        # 1. Greedy: the variable most attached to the placed ones goes on the
+        # free channel with the lowest latency to its placed neighbours
+        attach = np.zeros(n)
+        for _ in range(n):
+            unplaced = np.flatnonzero(channels < 0)
+            best = attach[unplaced].max()
+            candidates = unplaced[attach[unplaced] >= best]
+            v = candidates[np.argmax(degree[candidates])]
+
+            neighbours = W.indices[W.indptr[v]:W.indptr[v + 1]]
+            weights = W.data[W.indptr[v]:W.indptr[v + 1]]
+            placed = channels[neighbours] >= 0
+            if np.any(placed):
+                cost = L[:, channels[neighbours[placed]]] @ weights[placed]
+            else:
+                # A new component starts on the most central free channel
+                cost = centrality.copy()
+            cost[owner >= 0] = np.inf
+            c = int(np.argmin(cost))
+            channels[v], owner[c] = c, v
+            attach[neighbours] += weights
+
+        # 2. Refinement: F[c, v] = sum_k |J_vk| latency(c, channel_k), so moving v
+        # to c changes the cost by F[c, v] - F[channel_v, v]
+        F = np.asarray(W @ L[channels]).T
+        tol = 1e-12 * (L.max() * W.data.sum() if W.nnz > 0 else 1.0)
+        for _ in range(self.max_passes):
+            improved = False
+            for a in range(n):
+                pa = channels[a]
+                delta = F[:, a] - F[pa, a]
+                # Swapping with the occupant b of c also moves b to pa; the
+                # (a, b) coupling keeps its latency
+                occupied = np.flatnonzero(owner >= 0)
+                b = owner[occupied]
+                row = W.getrow(a).toarray().ravel()
+                delta[occupied] += F[pa, b] - F[occupied, b] + 2 * row[b] * L[pa, occupied]
+                delta[pa] = 0.0
+                c = int(np.argmin(delta))
+                if delta[c] >= -tol:
+                    continue
+
+                b = owner[c]
+                self._move(F, W, L, a, pa, c)
+                channels[a], owner[c] = c, a
+                if b >= 0:
+                    self._move(F, W, L, b, c, pa)
+                    channels[b], owner[pa] = pa, b
+                else:
+                    owner[pa] = -1
+                improved = True
+            if not improved:
+                break
+
+        return channels
+
+    @staticmethod
+    def _move(F: np.ndarray, W: sp.csr_matrix, L: np.ndarray, v: int, source: int, target: int) -> None:
+        """Update F in place after moving variable v from channel source to target."""
+        neighbours = W.indices[W.indptr[v]:W.indptr[v + 1]]
+        weights = W.data[W.indptr[v]:W.indptr[v + 1]]
+        F[:, neighbours] += np.outer(L[:, target] - L[:, source], weights)
@@ -4,6 +4,7 @@ Instruction Set Architecture (ISA) Module.
 This module defines the low-level instructions (BioASM) used to control the OPU.
 """
 
+import numpy as np
 from enum import Enum, auto
 from dataclasses import dataclass
 from typing import List, Optional, Union
@@ -19,14 +20,24 @@ class OpCode(Enum):
     RUN = auto()  # Run Simulation
     RST = auto()  # Reset State
     RD  = auto()  # Read State
+    LDS = auto()  # Load Sparse Coupling Matrix (J, COO triplets)
+    LDK = auto()  # Load Higher-Order Couplings (K, one hyperedge block)
+    PRC = auto()  # Set Coefficient Precision (dtype name, fixed-point scale)
+    LDL = auto()  # Load Low-Rank Coupling Factors (U, V; J += U V^T)
+    MAP = auto()  # Map Logical Variables to Physical Channels
 
 @dataclass
 class Instruction:
     """
     A single BioASM instruction.
+    
+    Array operands are ndarrays, usually read-only views of the problem's
+    own arrays, so compiling and loading a program copies no coefficients.
+    Problems never modify a built J or h in place (mutations and patches
+    produce new arrays), so a compiled program keeps its values.
     """
     opcode: OpCode
-    operands: List[Union[int, float, str, list]]
+    operands: List[Union[int, float, str, list, np.ndarray]]
     
     def __repr__(self) -> str:
         ops = ", ".join(map(str, self.operands))
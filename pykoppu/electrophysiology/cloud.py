@@ -7,6 +7,7 @@ Implements the driver for Cloud-based organoids.
 from typing import List, Any
 from .base import ElectrophysiologyDriver
 from ..biocompiler.isa import Instruction
+from ..biocompiler.binary import encode_program
 
 class CLOUDDriver(ElectrophysiologyDriver):
     """
@@ -15,6 +16,7 @@ class CLOUDDriver(ElectrophysiologyDriver):
     
     def __init__(self, opu: Any):
         self.opu = opu
+        self.payload = None
         
     def connect(self):
         """Initialize the Cloud connection."""
@@ -28,5 +30,7 @@ class CLOUDDriver(ElectrophysiologyDriver):
         """
         Execute BioASM instructions using Cloud.
         """
-        # Placeholder implementation
+        # Placeholder implementation: the program is framed as binary BioASM
+        # chunks for upload; array operands are sent without copying
+        self.payload = encode_program(instructions)
         return {}
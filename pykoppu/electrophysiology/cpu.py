@@ -6,10 +6,12 @@ Implements the digital twin driver using the Brian2 simulator.
 
 import brian2 as b2
 import numpy as np
+import scipy.sparse as sp
 from typing import List, Any
 from .base import ElectrophysiologyDriver
 from ..biocompiler.isa import OpCode, Instruction
 from ..opu.device import OPU
+from ..opu.kernel import Kernel, HyperEdges, LowRankCoupling, PRECISIONS
 
 class CPUDriver(ElectrophysiologyDriver):
     """
@@ -20,9 +22,14 @@ class CPUDriver(ElectrophysiologyDriver):
         self.opu = opu
         self.network = None
         self.neurons = None
+        self.num_neurons = 0
         self.J = None
         self.h = None
+        self.K = []
+        self.dtype = np.float64
+        self.scale = 1.0
         self.sigma = 0.0
+        self.channels = None
         
     def connect(self):
         """Initialize the Brian2 environment."""
@@ -68,6 +75,10 @@ class CPUDriver(ElectrophysiologyDriver):
         
     def _allocate(self, num_neurons: int):
         """Create the neuron group with Critical Regime parameters."""
+        self.num_neurons = num_neurons
+        self.K = []
+        self.dtype = np.float64
+        self.scale = 1.0
         # Hardcoded Critical Regime Parameters as requested
         R = 50 * b2.Mohm
         tau = 20 * b2.ms
@@ -134,9 +145,13 @@ class CPUDriver(ElectrophysiologyDriver):
                 # Linear mapping of v to [0, 1]
                 s = np.clip((v_raw - el_raw) / (vt_raw - el_raw), 0, 1)
                 
+                # Reduced-precision programs stay in float32 arithmetic
+                if self.dtype != np.float64:
+                    s = s.astype(np.float32)
+                
                 # 2. Compute Feedback Current
-                # I_fb = J @ s + h
-                raw_current = (self.J @ s + self.h)
+                # I_fb = J @ s + h (+ higher-order local fields from K)
+                raw_current = Kernel.local_field(self.J, self.h, s, self.K)
                 
                 # 3. Normalize Feedback
                 # Target range: +/- 1.5 nA
@@ -152,7 +167,7 @@ class CPUDriver(ElectrophysiologyDriver):
                 # 4. Telemetry: Calculate Energy
                 # E = -0.5 * s^T J s - h^T s
                 # Note: This is an approximation using the continuous state 's'
-                energy = -0.5 * s.T @ self.J @ s - self.h.T @ s
+                energy = Kernel.compute_energy(self.J, self.h, s, self.K) / self.scale
                 self.energy_trace.append(energy)
                 
         self.network.add(feedback_loop)
@@ -171,10 +186,30 @@ class CPUDriver(ElectrophysiologyDriver):
         for instr in instructions:
             if instr.opcode == OpCode.ALC:
                 self._allocate(instr.operands[0])
+            elif instr.opcode == OpCode.MAP:
+                # Channel placement; the twin has no geometry, so it is only recorded
+                self.channels = np.asarray(instr.operands[0])
+            elif instr.opcode == OpCode.PRC:
+                # Coefficient precision of the following loads
+                self.dtype = PRECISIONS[instr.operands[0]]
+                self.scale = float(instr.operands[1])
             elif instr.opcode == OpCode.LDJ:
-                self.J = np.array(instr.operands[0])
+                self.J = np.asarray(instr.operands[0], dtype=self.dtype)
+            elif instr.opcode == OpCode.LDS:
+                # Sparse coupling matrix: feedback loop uses a sparse matvec
+                rows, cols, data = instr.operands[:3]
+                self.J = sp.csr_matrix((np.asarray(data, dtype=self.dtype), (rows, cols)), shape=(self.num_neurons, self.num_neurons))
+            elif instr.opcode == OpCode.LDL:
+                # Low-rank factors on top of the loaded sparse part (factors stay floating point)
+                U, V = instr.operands[:2]
+                factor_dtype = np.result_type(self.dtype, np.float32)
+                base = self.J if sp.issparse(self.J) else None
+                self.J = LowRankCoupling(base, np.asarray(U, dtype=factor_dtype), np.asarray(V, dtype=factor_dtype))
+            elif instr.opcode == OpCode.LDK:
+                indices, weights = instr.operands[:2]
+                self.K.append(HyperEdges(indices, np.asarray(weights, dtype=self.dtype)))
             elif instr.opcode == OpCode.LDH:
-                self.h = np.array(instr.operands[0])
+                self.h = np.asarray(instr.operands[0], dtype=self.dtype)
             elif instr.opcode == OpCode.SIG:
                 self.sigma = float(instr.operands[0])
                 # Update noise in the neuron model dynamically
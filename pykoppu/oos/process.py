@@ -4,10 +4,14 @@ OOS Process Module.
 This module defines the Process class which manages the execution lifecycle.
 """
 
-from typing import Any, Optional
+import warnings
+from typing import Any, Dict, Optional, Tuple
 import numpy as np
 from ..biocompiler.compiler import BioCompiler
+from ..biocompiler.embedding import Embedder
+from ..opu.kernel import Kernel
 from ..electrophysiology import connect
+from ..solvers.presolve import presolve
 from .result import SimulationResult
 
 class Process:
@@ -15,7 +19,7 @@ class Process:
     Represents a computing process on the OPU.
     """
     
-    def __init__(self, problem: Any, backend: str = "cpu", t: float = 1000.0):
+    def __init__(self, problem: Any, backend: str = "cpu", t: float = 1000.0, presolve: bool = False, embed: bool = False):
         """
         Initialize a process.
         
@@ -23,12 +27,19 @@ class Process:
             problem: The problem instance to solve.
             backend (str): The backend driver to use. Defaults to "cpu".
             t (float): Total simulation duration in milliseconds. Defaults to 1000.0.
+            presolve (bool): Fix persistent variables before submission and run
+                only the reduced instance. Defaults to False.
+            embed (bool): Place coupled variables on nearby MEA channels of the
+                driver's OPU (see Embedder). Defaults to False.
         """
         self.problem = problem
         self.backend = backend
         self.t = t
-        self.compiler = BioCompiler()
+        self.presolve = presolve
+        self.presolved = None
+        self.embed = embed
         self.driver = connect(backend)
+        self.compiler = BioCompiler(embedder=Embedder(self.driver.opu) if embed else None)
         
     def run(self, backend: Optional[str] = None) -> SimulationResult:
         """
@@ -45,13 +56,31 @@ class Process:
             self.driver.disconnect()
             self.backend = backend
             self.driver = connect(self.backend)
-        # 1. Compile
-        instructions = self.compiler.compile(self.problem, duration=self.t)
+            if self.embed:
+                self.compiler.embedder = Embedder(self.driver.opu)
+        # 1. Presolve and compile
+        target = self.problem
+        if self.presolve:
+            self.presolved = presolve(self.problem)
+            target = self.presolved.reduced
+        instructions = self.compiler.compile(target, duration=self.t)
+        
+        num_vars = len(getattr(target, 'h', []))
+        capacity = getattr(getattr(self.driver, 'opu', None), 'capacity', None)
+        if capacity is not None and num_vars > capacity:
+            warnings.warn(
+                f"Problem has {num_vars} variables but the OPU has {capacity} channels; "
+                "use pykoppu.solvers.DecompositionSolver to split it."
+            )
         
         # 2. Execute
         try:
-            # Driver now returns (state, energy, spikes)
-            raw_result = self.driver.execute(instructions)
+            if num_vars == 0:
+                # Presolve fixed every variable
+                raw_result = (np.zeros(0), [], ([], []))
+            else:
+                # Driver now returns (state, energy, spikes)
+                raw_result = self.driver.execute(instructions)
             
             # Handle different return types for backward compatibility or different drivers
             if isinstance(raw_result, tuple) and len(raw_result) == 3:
@@ -68,7 +97,7 @@ class Process:
                 spike_data = ([], [])
         
             # Apply problem-specific energy offset
-            offset = getattr(self.problem, 'offset', 0.0)
+            offset = getattr(target, 'offset', 0.0)
             if len(energy_trace) > 0:
                 energy_trace = np.array(energy_trace) + offset
                 
@@ -85,7 +114,20 @@ class Process:
             
         # 3. Evaluate Metrics
         metrics = {}
-        if hasattr(self.problem, 'evaluate'):
+        samples = None
+        final_state = np.asarray(final_state)
+        metadata = {"backend": self.backend}
+        if self.presolved is not None:
+            # Back to the full variable space
+            final_state = self.presolved.expand(final_state)
+            metadata["pobits_saved"] = self.presolved.pobits_saved
+        if self.compiler.embedding is not None:
+            metadata["embedding"] = self.compiler.embedding
+        if final_state.ndim == 2:
+            # Multiple reads: score them all at once and report the best one
+            samples = final_state
+            final_state, metrics = self._best_sample(samples)
+        elif hasattr(self.problem, 'evaluate'):
             metrics = self.problem.evaluate(final_state)
             
         # 4. Construct Result
@@ -94,5 +136,41 @@ class Process:
             energy_history=energy_trace,
             spikes=spike_data,
             metrics=metrics,
-            metadata={"backend": self.backend}
+            metadata=metadata,
+            samples=samples
         )
+        
+    def _best_sample(self, samples: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Pick the best of several reads using the problem's batched evaluation.
+        
+        The lowest-energy valid read wins (the lowest-energy read if none is
+        valid). Its metrics are returned together with the columnar metrics of
+        all reads ("samples") and the fraction of valid reads ("valid_rate").
+        
+        Args:
+            samples (np.ndarray): (B, n) matrix of final states.
+            
+        Returns:
+            Tuple[np.ndarray, Dict[str, Any]]: The best state and its metrics.
+        """
+        batch = {}
+        if hasattr(self.problem, 'evaluate_batch'):
+            batch = self.problem.evaluate_batch(samples)
+            
+        order = np.arange(len(samples))
+        if hasattr(self.problem, 'J') and hasattr(self.problem, 'h'):
+            binary = (samples > 0.5).astype(float)
+            energies = Kernel.compute_energy_batch(
+                self.problem.J, self.problem.h, binary, K=getattr(self.problem, 'K', None), scale=getattr(self.problem, 'scale', 1.0)
+            )
+            order = np.argsort(energies, kind='stable')
+        if 'valid' in batch and np.any(batch['valid']):
+            order = order[np.asarray(batch['valid'])[order]]
+        best = int(order[0])
+        
+        metrics = {key: values[best] for key, values in batch.items()}
+        metrics["samples"] = batch
+        if 'valid' in batch:
+            metrics["valid_rate"] = float(np.mean(batch['valid']))
+        return samples[best], metrics
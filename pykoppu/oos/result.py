@@ -18,6 +18,8 @@ class SimulationResult:
         spikes (Tuple[np.ndarray, np.ndarray]): Tuple of (spike_times, neuron_indices).
         metrics (Dict[str, Any]): Evaluation metrics (validity, etc.).
         metadata (Dict[str, Any]): Simulation metadata.
+        samples (Optional[np.ndarray]): (B, n) matrix of all reads when the run
+            returned several samples; solution is then the best of them.
     """
     
     def __init__(
@@ -26,13 +28,15 @@ class SimulationResult:
         energy_history: List[float],
         spikes: Tuple[np.ndarray, np.ndarray],
         metrics: Optional[Dict[str, Any]] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        samples: Optional[np.ndarray] = None
     ):
         self.solution = np.array(solution)
         self.energy_history = np.array(energy_history)
         self.spikes = spikes
         self.metrics = metrics or {}
         self.metadata = metadata or {}
+        self.samples = None if samples is None else np.asarray(samples)
         
     def plot(self):
         """
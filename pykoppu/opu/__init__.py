@@ -2,8 +2,8 @@
 OPU Package Initialization.
 """
 
-from .device import OPU
+from .device import OPU, MEALayout
 from .pobit import Pobit
-from .kernel import Kernel
+from .kernel import Kernel, DeltaKernel, HyperEdges, LowRankCoupling, HamiltonianPatch
 
-__all__ = ["OPU", "Pobit", "Kernel"]
+__all__ = ["OPU", "MEALayout", "Pobit", "Kernel", "DeltaKernel", "HyperEdges", "LowRankCoupling", "HamiltonianPatch"]
@@ -4,8 +4,9 @@ OPU (Organoid Processing Unit) Device Module.
 This module defines the physical specifications and interface for the OPU.
 """
 
+import numpy as np
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 @dataclass
 class BioSpecs:
@@ -29,6 +30,25 @@ class BioSpecs:
     I_offset: float
     sigma: float
 
+@dataclass
+class MEALayout:
+    """
+    Geometry and signal model of the microelectrode array (MEA).
+    
+    Channels sit on a rectangular grid, filled row by row. Feedback between
+    two channels travels along axons, so its latency grows with distance.
+    
+    Attributes:
+        columns (int): Channels per grid row.
+        pitch (float): Electrode spacing in meters.
+        velocity (float): Axonal conduction velocity in m/s.
+        delay (float): Fixed synaptic and stimulation delay in seconds.
+    """
+    columns: int
+    pitch: float = 200e-6
+    velocity: float = 0.3
+    delay: float = 1e-3
+
 class OPU:
     """
     Organoid Processing Unit (OPU) Device Class.
@@ -36,16 +56,19 @@ class OPU:
     Represents the physical cartridge containing the organoid and MEA interface.
     """
     
-    def __init__(self, model: str = "lif_critical", capacity: int = 100):
+    def __init__(self, model: str = "lif_critical", capacity: int = 100, layout: Optional[MEALayout] = None):
         """
         Initialize the OPU device.
         
         Args:
             model (str): The biological model to use. Defaults to "lif_critical".
             capacity (int): The number of neurons/channels available. Defaults to 100.
+            layout (Optional[MEALayout]): MEA geometry. Defaults to a square grid
+                that holds all channels.
         """
         self.model = model
         self.capacity = capacity
+        self.layout = layout if layout is not None else MEALayout(columns=int(np.ceil(np.sqrt(capacity))))
         self.specs = self._load_bio_specs(model)
         
     def _load_bio_specs(self, model: str) -> BioSpecs:
@@ -85,3 +108,27 @@ class OPU:
             Dict[str, Any]: Dictionary of specifications.
         """
         return self.specs.__dict__
+        
+    def channel_positions(self) -> np.ndarray:
+        """
+        Get the positions of all channels on the MEA.
+        
+        Returns:
+            np.ndarray: (capacity, 2) array of (x, y) coordinates in meters.
+        """
+        index = np.arange(self.capacity)
+        grid = np.stack([index % self.layout.columns, index // self.layout.columns], axis=1)
+        return grid * self.layout.pitch
+        
+    def feedback_latency(self) -> np.ndarray:
+        """
+        Get the feedback latency between every pair of channels.
+        
+        latency(p, q) = delay + |pos(p) - pos(q)| / velocity
+        
+        Returns:
+            np.ndarray: (capacity, capacity) latency matrix in seconds.
+        """
+        positions = self.channel_positions()
+        distance = np.linalg.norm(positions[:, None, :] - positions[None, :, :], axis=2)
+        return self.layout.delay + distance / self.layout.velocity
@@ -5,7 +5,327 @@ This module handles tensor math logic for the OPU.
 """
 
 import numpy as np
-from typing import Any
+import scipy.sparse as sp
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Supported coefficient precisions. int16 is a fixed-point format: stored
+# coefficients are round(value * scale) and energies are divided by scale.
+PRECISIONS: Dict[str, Any] = {
+    "float64": np.float64,
+    "float32": np.float32,
+    "int16": np.int16,
+}
+
+@dataclass
+class HyperEdges:
+    """
+    Higher-order (k-PUBO) couplings of a single arity k.
+    
+    Each row of `indices` is one hyperedge e = (i_1, ..., i_k) of distinct
+    variables with coupling `weights[e]`. Following the sign convention of J
+    and h, a hyperedge contributes -K_e * prod_{i in e} x_i to the energy.
+    
+    Attributes:
+        indices (np.ndarray): Packed (m, k) integer array of variable indices.
+        weights (np.ndarray): Vector of m coupling strengths (K).
+    """
+    indices: np.ndarray
+    weights: np.ndarray
+    
+    def __post_init__(self):
+        self.indices = np.atleast_2d(np.asarray(self.indices, dtype=np.int64))
+        self.weights = np.asarray(self.weights).ravel()
+        if not np.issubdtype(self.weights.dtype, np.number):
+            self.weights = self.weights.astype(float)
+        if self.indices.shape[0] != self.weights.shape[0]:
+            raise ValueError("HyperEdges needs one weight per hyperedge.")
+            
+    @property
+    def arity(self) -> int:
+        """Number of variables per hyperedge (k)."""
+        return self.indices.shape[1]
+        
+    def canonical(self) -> "HyperEdges":
+        """
+        Sort the indices of every hyperedge and merge duplicate hyperedges.
+        
+        Returns:
+            HyperEdges: Equivalent hyperedges with unique, sorted index rows.
+        """
+        unique, inverse = np.unique(np.sort(self.indices, axis=1), axis=0, return_inverse=True)
+        weights = np.bincount(inverse.ravel(), weights=self.weights, minlength=len(unique))
+        keep = weights != 0
+        return HyperEdges(unique[keep], weights[keep])
+        
+    def energy(self, state: np.ndarray) -> float:
+        """
+        Energy contribution -sum_e K_e prod_{i in e} x_i of a single state.
+        """
+        return -float(self.weights @ np.prod(np.asarray(state)[self.indices], axis=1))
+        
+    def field_terms(self, state: np.ndarray, edges: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Local field contributions K_e * prod_{j in e, j != i} x_j of each hyperedge member.
+        
+        Uses prefix/suffix products, so zero-valued states are handled exactly.
+        
+        Args:
+            state (np.ndarray): State vector.
+            edges (Optional[np.ndarray]): Restrict to these hyperedge ids. Defaults to all.
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flattened (targets, values) to scatter-add.
+        """
+        indices = self.indices if edges is None else self.indices[edges]
+        weights = self.weights if edges is None else self.weights[edges]
+        values = np.asarray(state, dtype=float)[indices]
+        
+        k = indices.shape[1]
+        others = np.ones_like(values)
+        prefix = np.ones(values.shape[0])
+        for p in range(k):
+            others[:, p] = prefix
+            prefix = prefix * values[:, p]
+        suffix = np.ones(values.shape[0])
+        for p in range(k - 1, -1, -1):
+            others[:, p] *= suffix
+            suffix = suffix * values[:, p]
+            
+        return indices.ravel(), (others * weights[:, None]).ravel()
+
+class LowRankCoupling:
+    """
+    Coupling matrix stored as a sparse part plus low-rank factors.
+    
+    J = S + U V^T, with S an (n, n) scipy.sparse matrix and U, V of shape (n, r).
+    Penalty terms such as P (sum_i w_i x_i - C)^2 produce dense rank-1 blocks
+    that this form keeps in O(n) memory. Products with vectors and state
+    matrices cost O(nnz(S) + n * r) instead of O(n^2).
+    
+    Like J itself, S + U V^T is expected to be symmetric.
+    
+    Attributes:
+        sparse (sp.csr_matrix): Sparse part S.
+        U (np.ndarray): Left factors (n, r).
+        V (np.ndarray): Right factors (n, r).
+    """
+    
+    # Make numpy defer `ndarray @ J` to __rmatmul__ instead of building an object array
+    __array_ufunc__ = None
+    
+    def __init__(self, sparse: Any, U: np.ndarray, V: np.ndarray):
+        """
+        Initialize the coupling.
+        
+        Args:
+            sparse: Sparse part S (scipy.sparse, or None for an all-zero S).
+            U (np.ndarray): Left factors, shape (n,) or (n, r).
+            V (np.ndarray): Right factors, same shape as U.
+        """
+        U = np.asarray(U)
+        V = np.asarray(V)
+        self.U = U.reshape(U.shape[0], -1)
+        self.V = V.reshape(V.shape[0], -1)
+        n = self.U.shape[0]
+        if self.V.shape != self.U.shape:
+            raise ValueError("LowRankCoupling needs factors U and V of the same shape.")
+        if sparse is None:
+            sparse = sp.csr_matrix((n, n), dtype=self.U.dtype)
+        # CSC is kept as-is (fast column slices for DeltaKernel), anything else becomes CSR
+        self.sparse = sparse if sp.isspmatrix_csc(sparse) else sp.csr_matrix(sparse)
+        if self.sparse.shape != (n, n):
+            raise ValueError("Sparse part and factors of LowRankCoupling have mismatched sizes.")
+    
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Matrix shape (n, n)."""
+        return self.sparse.shape
+    
+    @property
+    def dtype(self) -> Any:
+        """Promoted dtype of the sparse part and factors."""
+        return np.result_type(self.sparse.dtype, self.U.dtype, self.V.dtype)
+    
+    @property
+    def rank(self) -> int:
+        """Number of low-rank terms (r)."""
+        return self.U.shape[1]
+    
+    @property
+    def nnz(self) -> int:
+        """Stored entries of the sparse part."""
+        return self.sparse.nnz
+    
+    def astype(self, dtype: Any) -> "LowRankCoupling":
+        """Copy with the sparse part and factors cast to dtype."""
+        return LowRankCoupling(self.sparse.astype(dtype), self.U.astype(dtype), self.V.astype(dtype))
+    
+    def diagonal(self) -> np.ndarray:
+        """Diagonal of J in O(nnz + n * r)."""
+        return self.sparse.diagonal() + np.einsum('ir,ir->i', self.U, self.V)
+    
+    def column(self, i: int) -> np.ndarray:
+        """
+        Dense column J[:, i] in O(nnz(S[:, i]) + n * r).
+        """
+        column = self.U @ self.V[i]
+        if sp.isspmatrix_csc(self.sparse):
+            start, end = self.sparse.indptr[i], self.sparse.indptr[i + 1]
+            column[self.sparse.indices[start:end]] += self.sparse.data[start:end]
+        else:
+            column += self.sparse[:, [i]].toarray().ravel()
+        return column
+    
+    def toarray(self) -> np.ndarray:
+        """Materialize the dense (n, n) matrix."""
+        return self.sparse.toarray() + self.U @ self.V.T
+    
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        # J x = S x + U (V^T x), for a vector or an (n, b) matrix
+        other = np.asarray(other)
+        return np.asarray(self.sparse @ other) + self.U @ (self.V.T @ other)
+    
+    def __rmatmul__(self, other: np.ndarray) -> np.ndarray:
+        # x J = x S + (x U) V^T, for a vector or a (b, n) matrix
+        other = np.asarray(other)
+        return np.asarray((self.sparse.T @ other.T).T) + (other @ self.U) @ self.V.T
+    
+    def __repr__(self):
+        return f"LowRankCoupling(n={self.shape[0]}, nnz={self.nnz}, rank={self.rank})"
+
+@dataclass
+class HamiltonianPatch:
+    """
+    Incremental change of a Hamiltonian (J, h, offset), small enough to ship to a running driver.
+    
+    Applying a patch first deletes the variables `removed` (indices before the
+    patch), then inserts new, uncoupled zero-bias variables at positions
+    `inserted` (indices after the patch; the remaining variables keep their
+    order), and finally adds the COO delta to J, the sparse delta to h and
+    `offset` to the offset. On a LowRankCoupling the inserted variables can
+    also bring their rows of the factors U and V, so that a new variable of a
+    rank-r constraint costs r factor entries instead of n explicit couplings.
+    
+    Attributes:
+        removed (np.ndarray): Deleted variables, numbered before the patch.
+        inserted (np.ndarray): New variables, numbered after the patch.
+        rows (np.ndarray): Row indices of the J delta (both (i, j) and (j, i) are listed).
+        cols (np.ndarray): Column indices of the J delta.
+        values (np.ndarray): Values of the J delta.
+        h_index (np.ndarray): Entries of h that change.
+        h_values (np.ndarray): Amounts added to those entries.
+        offset (float): Amount added to the energy offset.
+        U (Optional[np.ndarray]): (len(inserted), rank) rows of U for the inserted
+            variables, or None.
+        V (Optional[np.ndarray]): The matching rows of V, or None.
+    """
+    removed: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    inserted: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    rows: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    cols: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    values: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    h_index: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    h_values: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    offset: float = 0.0
+    U: Optional[np.ndarray] = None
+    V: Optional[np.ndarray] = None
+    
+    def __post_init__(self):
+        for name in ("removed", "inserted", "rows", "cols", "h_index"):
+            setattr(self, name, np.asarray(getattr(self, name), dtype=np.int64).ravel())
+        self.values = np.asarray(self.values, dtype=float).ravel()
+        self.h_values = np.asarray(self.h_values, dtype=float).ravel()
+        if (self.U is None) != (self.V is None):
+            raise ValueError("Factor rows need both U and V.")
+        if self.U is not None:
+            self.U = np.atleast_2d(np.asarray(self.U, dtype=float))
+            self.V = np.atleast_2d(np.asarray(self.V, dtype=float))
+            if self.U.shape != self.V.shape or self.U.shape[0] != len(self.inserted):
+                raise ValueError("U and V need one row per inserted variable.")
+        
+    @property
+    def nnz(self) -> int:
+        """Number of J, factor and h entries carried by the patch."""
+        factors = 0 if self.U is None else self.U.size + self.V.size
+        return len(self.values) + factors + len(self.h_values)
+        
+    def apply(self, J: Any, h: np.ndarray, offset: float = 0.0) -> Tuple[Any, np.ndarray, float]:
+        """
+        Apply the patch to a Hamiltonian.
+        
+        The inputs are never modified: the patched Hamiltonian is returned as
+        new arrays, so compiled programs and other holders of (J, h) keep
+        their values. h costs O(n); a sparse J or the sparse part of a
+        LowRankCoupling costs O(nnz(J)) and the factors are shared unless
+        variables are deleted or inserted; a dense J is copied, O(n^2).
+        The J delta of a LowRankCoupling goes into its sparse part.
+        
+        Args:
+            J: Coupling matrix (dense array, scipy.sparse matrix or LowRankCoupling).
+            h (np.ndarray): Bias vector.
+            offset (float): Energy offset. Defaults to 0.0.
+            
+        Returns:
+            Tuple[Any, np.ndarray, float]: The patched (J, h, offset).
+            
+        Raises:
+            ValueError: If the patch carries factor rows and J is not a LowRankCoupling
+                of the same rank.
+        """
+        h = np.asarray(h)
+        n = h.shape[0]
+        size = n - len(self.removed) + len(self.inserted)
+        if self.U is not None and (not isinstance(J, LowRankCoupling) or J.rank != self.U.shape[1]):
+            raise ValueError("Factor rows need a LowRankCoupling of the same rank.")
+        if len(self.removed) or len(self.inserted):
+            keep = np.setdiff1d(np.arange(n), self.removed)
+            position = np.setdiff1d(np.arange(size), self.inserted)
+            J = self._remap(J, keep, position, size)
+            h_new = np.zeros(size, dtype=h.dtype)
+            h_new[position] = h[keep]
+            h = h_new
+            if self.U is not None:
+                # _remap allocated fresh factors
+                J.U[self.inserted], J.V[self.inserted] = self.U, self.V
+        else:
+            h = h.copy()
+            if len(self.values) and not sp.issparse(J) and not isinstance(J, LowRankCoupling):
+                J = np.array(J)
+            
+        np.add.at(h, self.h_index, self.h_values)
+        if len(self.values):
+            if isinstance(J, LowRankCoupling):
+                J = LowRankCoupling(J.sparse + self._delta(size, J.sparse.dtype), J.U, J.V)
+            elif sp.issparse(J):
+                J = (J + self._delta(size, J.dtype)).tocsr()
+            else:
+                np.add.at(J, (self.rows, self.cols), self.values)
+        return J, h, offset + self.offset
+        
+    def _delta(self, size: int, dtype: Any) -> sp.csr_matrix:
+        """The J delta as a CSR matrix."""
+        return sp.csr_matrix((self.values.astype(dtype), (self.rows, self.cols)), shape=(size, size))
+        
+    @staticmethod
+    def _remap(J: Any, keep: np.ndarray, position: np.ndarray, size: int) -> Any:
+        """Move rows/columns keep of J to rows/columns position of a (size, size) matrix."""
+        if isinstance(J, LowRankCoupling):
+            U = np.zeros((size, J.rank), dtype=J.U.dtype)
+            V = np.zeros((size, J.rank), dtype=J.V.dtype)
+            U[position], V[position] = J.U[keep], J.V[keep]
+            return LowRankCoupling(HamiltonianPatch._remap(J.sparse, keep, position, size), U, V)
+        if sp.issparse(J):
+            # Old index -> new index (-1 for deleted variables), applied to the COO triplets
+            index = np.full(J.shape[0], -1, dtype=np.int64)
+            index[keep] = position
+            coo = sp.coo_matrix(J)
+            alive = (index[coo.row] >= 0) & (index[coo.col] >= 0)
+            return sp.csr_matrix((coo.data[alive], (index[coo.row[alive]], index[coo.col[alive]])), shape=(size, size))
+        J = np.asarray(J)
+        out = np.zeros((size, size), dtype=J.dtype)
+        out[np.ix_(position, position)] = J[np.ix_(keep, keep)]
+        return out
 
 class Kernel:
     """
@@ -13,22 +333,24 @@ class Kernel:
     """
     
     @staticmethod
-    def compute_energy(J: np.ndarray, h: np.ndarray, state: np.ndarray) -> float:
+    def compute_energy(J: np.ndarray, h: np.ndarray, state: np.ndarray, K: Optional[Sequence[HyperEdges]] = None) -> float:
         """
         Compute the energy of a given state for the Hamiltonian defined by J and h.
         
-        E = -0.5 * x^T J x - h^T x
+        E = -0.5 * x^T J x - h^T x - sum_e K_e prod_{i in e} x_i
         
         Args:
-            J (np.ndarray): Coupling matrix.
+            J (np.ndarray): Coupling matrix (dense, scipy.sparse or LowRankCoupling).
             h (np.ndarray): Bias vector.
             state (np.ndarray): State vector (binary or spin).
+            K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
             
         Returns:
             float: The energy value.
         """
-        # Ensure inputs are numpy arrays
-        J = np.asarray(J)
+        # Ensure inputs are numpy arrays (sparse and low-rank J are used as-is)
+        if not (sp.issparse(J) or isinstance(J, LowRankCoupling)):
+            J = np.asarray(J)
         h = np.asarray(h)
         state = np.asarray(state)
         
@@ -39,5 +361,308 @@ class Kernel:
         
         quadratic = 0.5 * state.T @ J @ state
         linear = h.T @ state
+        higher = sum(block.energy(state) for block in K) if K else 0.0
+        
+        return -(quadratic + linear) + higher
+        
+    @staticmethod
+    def local_field(J: np.ndarray, h: np.ndarray, state: np.ndarray, K: Optional[Sequence[HyperEdges]] = None) -> np.ndarray:
+        """
+        Compute the local field f = -dE/dx of a state.
+        
+        f_i = (J x)_i + h_i + sum_{e containing i} K_e prod_{j in e, j != i} x_j
         
-        return -(quadratic + linear)
+        Args:
+            J (np.ndarray): Coupling matrix (dense, scipy.sparse or LowRankCoupling).
+            h (np.ndarray): Bias vector.
+            state (np.ndarray): State vector (binary or continuous in [0, 1]).
+            K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+            
+        Returns:
+            np.ndarray: The local field vector.
+        """
+        state = np.asarray(state)
+        if not np.issubdtype(state.dtype, np.floating):
+            state = state.astype(float)
+        # Keeps the coefficient/state precision (e.g. float32 stays float32)
+        field = np.asarray(J @ state).ravel() + np.asarray(h)
+        for block in K or []:
+            targets, values = block.field_terms(state)
+            field += np.bincount(targets, weights=values, minlength=field.shape[0])
+        return field
+
+    @staticmethod
+    def compute_energy_batch(
+        J: np.ndarray,
+        h: np.ndarray,
+        states: np.ndarray,
+        offset: float = 0.0,
+        dtype: Optional[Any] = None,
+        chunk_size: int = 4096,
+        K: Optional[Sequence[HyperEdges]] = None,
+        scale: float = 1.0
+    ) -> np.ndarray:
+        """
+        Compute the energy of many states in one vectorized pass.
+        
+        E_b = (-0.5 * x_b^T J x_b - h^T x_b - sum_e K_e prod_{i in e} x_bi) / scale + offset
+        
+        States are processed in row chunks so that the intermediate (chunk, n)
+        product stays bounded regardless of the number of states.
+        
+        Args:
+            J (np.ndarray): Coupling matrix of shape (n, n), dense, scipy.sparse
+                or LowRankCoupling.
+            h (np.ndarray): Bias vector of shape (n,).
+            states (np.ndarray): State matrix of shape (B, n), one state per row.
+                A single 1-D state is treated as a batch of one.
+            offset (float): Constant energy offset of the problem. Defaults to 0.0.
+            dtype: Floating point type used for the computation (np.float32 or
+                np.float64). Defaults to the promoted type of the inputs (float32
+                for int16 coefficients).
+            chunk_size (int): Maximum number of states per GEMM. Defaults to 4096.
+            K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+            scale (float): Fixed-point scale of quantized coefficients. Defaults to 1.0.
+            
+        Returns:
+            np.ndarray: Vector of B energies.
+        """
+        states = np.atleast_2d(np.asarray(states))
+        low_rank = isinstance(J, LowRankCoupling)
+        sparse = sp.issparse(J) or low_rank
+        if dtype is None:
+            dtype = np.result_type(J.dtype if sparse else np.asarray(J).dtype, np.asarray(h).dtype, states.dtype, np.float32)
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.result_type(dtype, np.float32)
+        if low_rank:
+            J = J.astype(dtype)
+        else:
+            J = sp.csr_matrix(J, dtype=dtype) if sparse else np.asarray(J, dtype=dtype)
+        h = np.asarray(h, dtype=dtype)
+        
+        n_states = states.shape[0]
+        energies = np.empty(n_states, dtype=dtype)
+        chunk_size = max(1, int(chunk_size))
+        
+        for start in range(0, n_states, chunk_size):
+            X = states[start:start + chunk_size].astype(dtype, copy=False)
+            # Row-wise quadratic form x_b^T J x_b via one GEMM (SpMM, or SpMM + two
+            # thin GEMMs for low-rank J) + reduction
+            XJ = (J @ X.T).T if sparse else X @ J
+            quadratic = 0.5 * np.einsum('bi,bi->b', XJ, X)
+            linear = X @ h
+            higher = 0.0
+            for block in K or []:
+                # (chunk, m, k) gather -> product over each hyperedge
+                higher = higher + np.prod(X[:, block.indices], axis=2) @ block.weights.astype(dtype)
+            energies[start:start + chunk_size] = -(quadratic + linear + higher) / scale + offset
+            
+        return energies
+        
+    @staticmethod
+    def quantize(
+        J: Any,
+        h: np.ndarray,
+        precision: str,
+        K: Optional[Sequence[HyperEdges]] = None,
+        scale: float = 1.0
+    ) -> Tuple[Any, np.ndarray, List[HyperEdges], float]:
+        """
+        Convert Hamiltonian coefficients to the given precision.
+        
+        For int16 all coefficients (J, h and K) share a single fixed-point scale
+        chosen so that the largest magnitude maps to 32767. The factors of a
+        LowRankCoupling stay floating point (float32): only U absorbs the scale,
+        so U V^T keeps the common fixed-point scale without overflowing int16.
+        
+        Args:
+            J: Coupling matrix (dense, scipy.sparse or LowRankCoupling).
+            h (np.ndarray): Bias vector.
+            precision (str): One of "float64", "float32" or "int16".
+            K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+            scale (float): Fixed-point scale of the inputs, if already quantized. Defaults to 1.0.
+            
+        Returns:
+            Tuple: (J, h, K, scale) in the requested precision.
+            
+        Raises:
+            ValueError: If the precision is unknown.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        dtype = PRECISIONS[precision]
+        K = list(K or [])
+        
+        # Back to real-valued coefficients first (no-op for float inputs)
+        factors = None
+        if isinstance(J, LowRankCoupling):
+            factors = (J.U.astype(np.float64) / scale, J.V.astype(np.float64))
+            J = J.sparse
+        J = J.astype(np.float64) / scale if sp.issparse(J) else np.asarray(J, dtype=np.float64) / scale
+        h = np.asarray(h, dtype=np.float64) / scale
+        weights = [block.weights.astype(np.float64) / scale for block in K]
+        
+        if np.issubdtype(dtype, np.integer):
+            J_max = abs(J).max() if J.shape[0] > 0 and (not sp.issparse(J) or J.nnz > 0) else 0.0
+            max_abs = max([J_max, np.abs(h).max(initial=0.0)] + [np.abs(w).max(initial=0.0) for w in weights])
+            scale = float(np.iinfo(dtype).max) / max_abs if max_abs > 0 else 1.0
+            
+            def convert(values):
+                return np.rint(values * scale).astype(dtype)
+        else:
+            scale = 1.0
+            
+            def convert(values):
+                return values.astype(dtype)
+                
+        if sp.issparse(J):
+            J = J.tocsr()
+            J = sp.csr_matrix((convert(J.data), J.indices, J.indptr), shape=J.shape)
+        else:
+            J = convert(J)
+        if factors is not None:
+            factor_dtype = np.result_type(dtype, np.float32)
+            J = LowRankCoupling(J, (factors[0] * scale).astype(factor_dtype), factors[1].astype(factor_dtype))
+            
+        K = [HyperEdges(block.indices, convert(w)) for block, w in zip(K, weights)]
+        return J, convert(h), K, scale
+
+
+class DeltaKernel:
+    """
+    Incremental energy engine for single-bit flips of a binary state.
+    
+    Keeps the local field f = J x + h of the current state so that the energy
+    change of flipping bit i is available in O(1):
+    
+    dE_i = -d_i * f_i - 0.5 * J_ii, with d_i = 1 - 2 x_i
+    
+    Applying a flip updates the field in O(n), or O(degree) when J is sparse
+    (O(degree + n * r) for a rank-r LowRankCoupling).
+    Higher-order couplings (K) are supported through per-variable incidence
+    lists, so a flip only revisits the hyperedges that contain the bit.
+    
+    Attributes:
+        state (np.ndarray): Current binary state vector.
+        field (np.ndarray): Local field J @ state + h.
+        energy (float): Energy of the current state (including offset).
+    """
+    
+    def __init__(
+        self,
+        J: Any,
+        h: np.ndarray,
+        state: Optional[np.ndarray] = None,
+        offset: float = 0.0,
+        K: Optional[Sequence[HyperEdges]] = None,
+        scale: float = 1.0
+    ):
+        """
+        Initialize the engine.
+        
+        Args:
+            J: Symmetric coupling matrix (dense array, scipy.sparse matrix or LowRankCoupling).
+            h (np.ndarray): Bias vector.
+            state (Optional[np.ndarray]): Initial binary state. Defaults to all zeros.
+            offset (float): Constant energy offset (real units). Defaults to 0.0.
+            K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+            scale (float): Fixed-point scale of quantized coefficients; energies and
+                deltas are reported in real units. Defaults to 1.0.
+        """
+        if scale != 1.0:
+            J, h, K, _ = Kernel.quantize(J, h, "float64", K=K, scale=scale)
+        if isinstance(J, LowRankCoupling):
+            self.J = LowRankCoupling(sp.csc_matrix(J.sparse, dtype=float), J.U.astype(float), J.V.astype(float))
+            self._diag = self.J.diagonal()
+        elif sp.issparse(J):
+            # Column access is what a flip needs; CSC makes it a contiguous slice
+            self.J = sp.csc_matrix(J, dtype=float)
+            self._diag = self.J.diagonal()
+        else:
+            self.J = np.asarray(J, dtype=float)
+            self._diag = np.diag(self.J).copy()
+        self.h = np.asarray(h, dtype=float)
+        self.offset = offset
+        self.n = self.h.shape[0]
+        
+        # Variable -> incident hyperedge ids, one CSR incidence per block
+        self.K: List[HyperEdges] = list(K or [])
+        self._incidence = []
+        for block in self.K:
+            m, k = block.indices.shape
+            edge_ids = np.repeat(np.arange(m), k)
+            self._incidence.append(sp.csr_matrix((np.ones(m * k), (block.indices.ravel(), edge_ids)), shape=(self.n, m)))
+            
+        self.reset(np.zeros(self.n) if state is None else state)
+        
+    def reset(self, state: np.ndarray) -> None:
+        """
+        Recompute the local field and energy for a new state (O(n^2) dense, O(nnz) sparse).
+        
+        Args:
+            state (np.ndarray): Binary state vector.
+        """
+        self.state = (np.asarray(state) > 0.5).astype(float)
+        self.field = Kernel.local_field(self.J, self.h, self.state, self.K)
+        self.energy = float(Kernel.compute_energy(self.J, self.h, self.state, self.K) + self.offset)
+        
+    def delta(self, i: int) -> float:
+        """
+        Energy change of flipping bit i, without applying it.
+        
+        Args:
+            i (int): Variable index.
+            
+        Returns:
+            float: E(x with bit i flipped) - E(x).
+        """
+        d = 1.0 - 2.0 * self.state[i]
+        return float(-d * self.field[i] - 0.5 * self._diag[i])
+        
+    def deltas(self) -> np.ndarray:
+        """
+        Energy change of every possible single-bit flip.
+        
+        Returns:
+            np.ndarray: Vector of n flip deltas.
+        """
+        d = 1.0 - 2.0 * self.state
+        return -d * self.field - 0.5 * self._diag
+        
+    def flip(self, i: int) -> float:
+        """
+        Flip bit i and update the local field and energy.
+        
+        Args:
+            i (int): Variable index.
+            
+        Returns:
+            float: The energy change of the flip.
+        """
+        dE = self.delta(i)
+        d = 1.0 - 2.0 * self.state[i]
+        
+        # Hyperedge contributions through bit i change; swap old terms for new ones
+        touched = []
+        for block, incidence in zip(self.K, self._incidence):
+            edges = incidence.indices[incidence.indptr[i]:incidence.indptr[i + 1]]
+            targets, values = block.field_terms(self.state, edges)
+            np.subtract.at(self.field, targets, values)
+            touched.append((block, edges))
+            
+        self.state[i] += d
+        
+        for block, edges in touched:
+            targets, values = block.field_terms(self.state, edges)
+            np.add.at(self.field, targets, values)
+        
+        if isinstance(self.J, LowRankCoupling):
+            self.field += d * self.J.column(i)
+        elif sp.issparse(self.J):
+            start, end = self.J.indptr[i], self.J.indptr[i + 1]
+            self.field[self.J.indices[start:end]] += d * self.J.data[start:end]
+        else:
+            self.field += d * self.J[:, i]
+            
+        self.energy += dE
+        return dE
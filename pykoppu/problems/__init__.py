@@ -2,7 +2,9 @@
 Problems Package Initialization.
 """
 
-from .base import PUBOProblem
+from .base import PUBOProblem, ModelBuilder
+from .statistics import RunningMoments
+from .cache import BuildCache, set_cache, get_cache
 from . import math
 from . import energy
 from . import graph
@@ -16,4 +18,4 @@ from .graph import MaxCut
 from .logistics import Knapsack
 from .finance import PortfolioOptimization
 
-__all__ = ["PUBOProblem", "math", "energy", "graph", "logistics", "finance", "SAT3", "Factorization", "WellPlacement", "SeismicFeatureSelection", "MaxCut", "Knapsack", "PortfolioOptimization"]
+__all__ = ["PUBOProblem", "ModelBuilder", "RunningMoments", "BuildCache", "set_cache", "get_cache", "math", "energy", "graph", "logistics", "finance", "SAT3", "Factorization", "WellPlacement", "SeismicFeatureSelection", "MaxCut", "Knapsack", "PortfolioOptimization"]
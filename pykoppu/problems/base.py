@@ -5,23 +5,566 @@ Defines the interface for problems solvable by KOPPU.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple, Union
 import numpy as np
+import scipy.sparse as sp
+from ..opu.kernel import Kernel, HyperEdges, LowRankCoupling, HamiltonianPatch
+from .cache import get_cache, stable_hash
+
+# Automatic storage selection: below this size, or above this fill ratio,
+# a dense J is faster than a sparse one.
+SPARSE_MIN_VARIABLES = 256
+SPARSE_MAX_DENSITY = 0.05
+
+# Attributes that hold the built Hamiltonian, its precision or the build
+# state rather than inputs of the problem; they never enter the cache key
+HAMILTONIAN_ATTRIBUTES = ("_J", "_h", "_offset", "_K", "precision", "scale", "_built", "_stale", "_building")
+
+def assemble_coupling(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    values: np.ndarray,
+    n: int,
+    sparse: Optional[bool] = None,
+    factors: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    low_rank: Optional[bool] = None
+) -> Union[np.ndarray, sp.csr_matrix, LowRankCoupling]:
+    """
+    Assemble a coupling matrix from COO triplets and optional low-rank factors.
+    
+    Duplicate (row, col) entries are summed. Callers are responsible for
+    emitting both (i, j) and (j, i) to obtain a symmetric J.
+    
+    With factors (U, V) the matrix is J = COO + U V^T. It is returned as a
+    LowRankCoupling, or materialized when low-rank storage is not selected.
+    
+    Args:
+        rows (np.ndarray): Row indices.
+        cols (np.ndarray): Column indices.
+        values (np.ndarray): Entry values.
+        n (int): Number of variables.
+        sparse (Optional[bool]): Force sparse (True) or dense (False) output.
+            Defaults to None, which picks sparse only for large, low-density
+            matrices where it is actually faster.
+        factors (Optional[Tuple[np.ndarray, np.ndarray]]): Low-rank factors (U, V),
+            each of shape (n,) or (n, r). Defaults to None.
+        low_rank (Optional[bool]): Keep the factors unmaterialized (True) or add
+            U V^T into J (False). Defaults to None, which keeps them for problems
+            of at least SPARSE_MIN_VARIABLES variables.
+            
+    Returns:
+        Union[np.ndarray, sp.csr_matrix, LowRankCoupling]: The (n, n) coupling matrix.
+    """
+    rows = np.asarray(rows, dtype=np.int64).ravel()
+    cols = np.asarray(cols, dtype=np.int64).ravel()
+    values = np.asarray(values, dtype=float).ravel()
+    
+    if factors is not None:
+        U, V = (np.asarray(f, dtype=float).reshape(n, -1) for f in factors)
+        if low_rank is None:
+            low_rank = n >= SPARSE_MIN_VARIABLES
+        if low_rank:
+            return LowRankCoupling(assemble_coupling(rows, cols, values, n, sparse=True), U, V)
+        # U V^T is dense, so the materialized J is dense unless sparse is forced
+        J = assemble_coupling(rows, cols, values, n, sparse=False) + U @ V.T
+        return sp.csr_matrix(J) if sparse else J
+    
+    if sparse is None:
+        sparse = n >= SPARSE_MIN_VARIABLES and len(values) <= SPARSE_MAX_DENSITY * n * n
+        
+    if sparse:
+        # COO -> CSR conversion sums duplicates
+        J = sp.csr_matrix((values, (rows, cols)), shape=(n, n))
+        J.eliminate_zeros()
+        return J
+    
+    J = np.zeros((n, n))
+    np.add.at(J, (rows, cols), values)
+    return J
+
+class ModelBuilder:
+    """
+    Accumulate a quadratic binary model from index arrays and emit (J, h, offset).
+    
+    Terms are declared in the objective to be minimized,
+    
+    H = c + sum_i a_i x_i + sum_{i<j} b_ij x_i x_j,
+    
+    and mapped to E = -0.5 x^T J x - h^T x + offset with h = -a, J_ij = J_ji = -b_ij
+    and offset = c. Every add_* call takes whole arrays and only appends to COO
+    buffers; repeated pairs are summed once in emit with a single sort/reduce.
+    Dense rank-1 couplings from squared constraints can be kept as low-rank
+    factors instead of n^2 pairs.
+    
+    Args:
+        n (int): Initial number of variables.
+    """
+    
+    def __init__(self, n: int = 0):
+        self.n = int(n)
+        self.constant = 0.0
+        self._linear: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pairs: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._factors: List[Tuple[np.ndarray, np.ndarray]] = []
+        
+    def add_variables(self, count: int) -> np.ndarray:
+        """
+        Append variables to the model.
+        
+        Args:
+            count (int): Number of new variables.
+            
+        Returns:
+            np.ndarray: Indices of the new variables.
+        """
+        index = np.arange(self.n, self.n + count)
+        self.n += int(count)
+        return index
+        
+    def add_constant(self, value: float) -> "ModelBuilder":
+        """Add a constant to H."""
+        self.constant += float(value)
+        return self
+        
+    def add_linear(self, index: Any, coeffs: Any) -> "ModelBuilder":
+        """
+        Add sum_t a_t x_{index_t} to H.
+        
+        Args:
+            index (Any): Variable indices.
+            coeffs (Any): Coefficients, broadcast against index.
+            
+        Returns:
+            ModelBuilder: self, for chaining.
+        """
+        index = np.asarray(index, dtype=np.int64).ravel()
+        coeffs = np.broadcast_to(np.asarray(coeffs, dtype=float), index.shape)
+        self._linear.append((index, coeffs))
+        return self
+        
+    def add_quadratic(self, rows: Any, cols: Any, coeffs: Any) -> "ModelBuilder":
+        """
+        Add sum_t b_t x_{rows_t} x_{cols_t} to H.
+        
+        Each triplet is one term; (i, j) and (j, i) are the same monomial and
+        add up. Terms with i = j reduce to linear terms (x^2 = x).
+        
+        Args:
+            rows (Any): First variable of each term.
+            cols (Any): Second variable of each term.
+            coeffs (Any): Coefficients, broadcast against the indices.
+            
+        Returns:
+            ModelBuilder: self, for chaining.
+        """
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        cols = np.asarray(cols, dtype=np.int64).ravel()
+        coeffs = np.broadcast_to(np.asarray(coeffs, dtype=float), rows.shape)
+        
+        same = rows == cols
+        if np.any(same):
+            self.add_linear(rows[same], coeffs[same])
+            rows, cols, coeffs = rows[~same], cols[~same], coeffs[~same]
+        self._pairs.append((np.minimum(rows, cols), np.maximum(rows, cols), coeffs))
+        return self
+        
+    def add_squared_linear(
+        self,
+        index: Any,
+        weights: Any,
+        constant: float = 0.0,
+        penalty: float = 1.0,
+        factor: bool = True
+    ) -> "ModelBuilder":
+        """
+        Add the penalty P (sum_t w_t x_{index_t} + c)^2 to H.
+        
+        With x^2 = x this is P c^2 + P sum (w_t^2 + 2 c w_t) x_t + 2 P sum_{t<u} w_t w_u x_t x_u.
+        The quadratic part is the rank-1 matrix w w^T without its diagonal; it
+        is kept as low-rank factors unless factor is False, in which case all
+        pairs are emitted. Indices must be distinct.
+        
+        Args:
+            index (Any): Variable indices of the linear form.
+            weights (Any): Coefficients w, broadcast against index.
+            constant (float): Constant c of the linear form. Defaults to 0.0.
+            penalty (float): Penalty strength P. Defaults to 1.0.
+            factor (bool): Keep the coupling as factors. Defaults to True.
+            
+        Returns:
+            ModelBuilder: self, for chaining.
+        """
+        index = np.asarray(index, dtype=np.int64).ravel()
+        weights = np.broadcast_to(np.asarray(weights, dtype=float), index.shape)
+        P = float(penalty)
+        if P == 0.0 or len(index) == 0:
+            return self
+            
+        self.add_constant(P * constant**2)
+        self.add_linear(index, P * (weights**2 + 2 * constant * weights))
+        if factor:
+            self._factors.append((index, weights, -2 * P * weights))
+        else:
+            upper_t, upper_u = np.triu_indices(len(index), k=1)
+            self.add_quadratic(index[upper_t], index[upper_u], 2 * P * weights[upper_t] * weights[upper_u])
+        return self
+        
+    def add_one_hot(self, groups: Any, penalty: float) -> "ModelBuilder":
+        """
+        Add P (sum_{i in g} x_i - 1)^2 to H for every group g.
+        
+        Groups are usually small, so their pairs are emitted explicitly.
+        
+        Args:
+            groups (Any): A (g, m) index array, or a sequence of index arrays.
+            penalty (float): Penalty strength P.
+            
+        Returns:
+            ModelBuilder: self, for chaining.
+        """
+        if isinstance(groups, np.ndarray) and groups.ndim == 2:
+            batches = [groups.astype(np.int64)]
+        else:
+            # Ragged groups: batch the groups of equal size
+            sized: Dict[int, List[np.ndarray]] = {}
+            for group in groups:
+                group = np.asarray(group, dtype=np.int64).ravel()
+                sized.setdefault(len(group), []).append(group)
+            batches = [np.stack(batch) for batch in sized.values()]
+            
+        for batch in batches:
+            g, m = batch.shape
+            upper_t, upper_u = np.triu_indices(m, k=1)
+            self.add_constant(penalty * g)
+            self.add_linear(batch, -penalty)
+            self.add_quadratic(batch[:, upper_t], batch[:, upper_u], 2 * penalty)
+        return self
+        
+    def emit(
+        self,
+        sparse: Optional[bool] = None,
+        low_rank: Optional[bool] = None
+    ) -> Tuple[Union[np.ndarray, sp.csr_matrix, LowRankCoupling], np.ndarray, float]:
+        """
+        Reduce the buffers and assemble the Hamiltonian.
+        
+        Args:
+            sparse (Optional[bool]): Storage of J, as in assemble_coupling.
+            low_rank (Optional[bool]): Keep factors unmaterialized, as in assemble_coupling.
+            
+        Returns:
+            Tuple: (J, h, offset).
+        """
+        n = self.n
+        
+        h = np.zeros(n)
+        if self._linear:
+            index = np.concatenate([index for index, _ in self._linear])
+            coeffs = np.concatenate([coeffs for _, coeffs in self._linear])
+            h = -np.bincount(index, weights=coeffs, minlength=n)
+            
+        # Sum repeated pairs with one sort over the packed (i, j) keys
+        rows = cols = np.zeros(0, dtype=np.int64)
+        values = np.zeros(0)
+        if self._pairs:
+            keys = np.concatenate([lo * n + hi for lo, hi, _ in self._pairs])
+            coeffs = np.concatenate([coeffs for _, _, coeffs in self._pairs])
+            keys, inverse = np.unique(keys, return_inverse=True)
+            coeffs = np.bincount(inverse, weights=coeffs)
+            keep = coeffs != 0
+            lo, hi, b = keys[keep] // n, keys[keep] % n, coeffs[keep]
+            rows, cols, values = np.concatenate([lo, hi]), np.concatenate([hi, lo]), -np.concatenate([b, b])
+            
+        factors = None
+        if self._factors:
+            # One column per constraint; the diagonal of U V^T is cancelled
+            U = np.zeros((n, len(self._factors)))
+            V = np.zeros((n, len(self._factors)))
+            for r, (index, u, v) in enumerate(self._factors):
+                U[index, r] = u
+                V[index, r] = v
+            diag = np.arange(n)
+            rows = np.concatenate([rows, diag])
+            cols = np.concatenate([cols, diag])
+            values = np.concatenate([values, -np.einsum('ir,ir->i', U, V)])
+            factors = (U, V)
+            
+        J = assemble_coupling(rows, cols, values, n, sparse=sparse, factors=factors, low_rank=low_rank)
+        return J, h, self.constant
 
 class PUBOProblem(ABC):
     """
     Polynomial Unconstrained Binary Optimization (PUBO) Problem.
+    
+    The Hamiltonian is E = -0.5 x^T J x - h^T x - sum_e K_e prod_{i in e} x_i + offset.
+    The coupling matrix J may be a dense np.ndarray, a scipy.sparse matrix or a
+    LowRankCoupling (sparse + low-rank factors); K holds optional higher-order
+    hyperedge blocks (one per arity).
+    
+    J, h, offset and K are materialized lazily: to_hamiltonian runs on first
+    access and again only after one of the subclass's PARAMETERS (or the
+    storage settings) is reassigned, so constructing, evaluating and sweeping
+    parameters cost nothing until a Hamiltonian is actually needed. Data
+    derived by to_hamiltonian (the subclass's DERIVED names) is materialized
+    the same way; evaluation methods compute what they need from the
+    parameters through cheap helpers instead of building J.
+    
+    Builds go through build(), which reuses an entry of the on-disk
+    BuildCache when caching is enabled (see set_cache). Bump BUILDER_VERSION
+    whenever to_hamiltonian changes its output.
     """
     
-    def __init__(self):
-        self.J: np.ndarray = np.array([])
-        self.h: np.ndarray = np.array([])
-        self.offset: float = 0.0
+    BUILDER_VERSION = 1
+    
+    # Defining parameters: reassigning one invalidates the Hamiltonian
+    PARAMETERS: Tuple[str, ...] = ()
+    
+    # Data set by to_hamiltonian besides J, h, offset and K: reading one that
+    # is missing builds the problem, reassigning a parameter discards them
+    DERIVED: Tuple[str, ...] = ()
+    
+    def __init__(self, sparse: Optional[bool] = None, low_rank: Optional[bool] = None):
+        """
+        Initialize the problem.
+        
+        Args:
+            sparse (Optional[bool]): Storage format of J. True forces sparse,
+                False forces dense, None (default) selects automatically.
+            low_rank (Optional[bool]): Keep low-rank penalty terms as factors
+                (True) or materialize them (False). None (default) selects
+                automatically.
+        """
+        self._J: Union[np.ndarray, sp.spmatrix, LowRankCoupling] = np.array([])
+        self._h: np.ndarray = np.array([])
+        self._offset: float = 0.0
+        self._K: List[HyperEdges] = []
+        self._stale = True
+        self._building = False
+        self.sparse = sparse
+        self.low_rank = low_rank
+        self.precision: str = "float64"
+        self.scale: float = 1.0
+        
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self.PARAMETERS or name in ("sparse", "low_rank"):
+            super().__setattr__('_stale', True)
+            for derived in self.DERIVED:
+                vars(self).pop(derived, None)
+            
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for missing attributes: declared derived data of a pending build
+        state = vars(self)
+        if name not in self.DERIVED or not state.get('_stale', False) or state.get('_building', True):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        self.build()
+        return getattr(self, name)
+        
+    def _materialize(self) -> None:
+        """Build the Hamiltonian if it is missing or stale."""
+        if self._stale and not self._building:
+            self.build()
+            
+    def invalidate(self) -> None:
+        """
+        Mark the Hamiltonian as stale, e.g. after modifying an input array in place.
+        """
+        self._stale = True
+        for derived in self.DERIVED:
+            vars(self).pop(derived, None)
+        
+    @property
+    def J(self) -> Union[np.ndarray, sp.spmatrix, LowRankCoupling]:
+        """Coupling matrix (built on first access)."""
+        self._materialize()
+        return self._J
+        
+    @J.setter
+    def J(self, value: Union[np.ndarray, sp.spmatrix, LowRankCoupling]) -> None:
+        self._J = value
+        
+    @property
+    def h(self) -> np.ndarray:
+        """Bias vector (built on first access)."""
+        self._materialize()
+        return self._h
+        
+    @h.setter
+    def h(self, value: np.ndarray) -> None:
+        self._h = value
+        
+    @property
+    def offset(self) -> float:
+        """Constant energy offset (built on first access)."""
+        self._materialize()
+        return self._offset
+        
+    @offset.setter
+    def offset(self, value: float) -> None:
+        self._offset = value
+        
+    @property
+    def K(self) -> List[HyperEdges]:
+        """Higher-order hyperedge blocks (built on first access)."""
+        self._materialize()
+        return self._K
+        
+    @K.setter
+    def K(self, value: List[HyperEdges]) -> None:
+        self._K = value
+        
+    def _assemble_J(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        n: int,
+        factors: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Union[np.ndarray, sp.csr_matrix, LowRankCoupling]:
+        """
+        Assemble J from COO triplets (and low-rank factors) using the problem's storage settings.
+        """
+        return assemble_coupling(rows, cols, values, n, sparse=self.sparse, factors=factors, low_rank=self.low_rank)
+        
+    def _emit(self, model: ModelBuilder) -> None:
+        """
+        Set J, h and offset from a ModelBuilder using the problem's storage settings.
+        """
+        self.J, self.h, self.offset = model.emit(sparse=self.sparse, low_rank=self.low_rank)
+        
+    def precision_error(self, precision: str, num_samples: int = 256, seed: int = 0) -> float:
+        """
+        Estimate the relative energy error of storing the Hamiltonian at a given precision.
+        
+        Energies (without offset) of random binary states are compared between
+        the current coefficients and their conversion to `precision`.
+        
+        Args:
+            precision (str): One of "float64", "float32" or "int16".
+            num_samples (int): Number of random states. Defaults to 256.
+            seed (int): Random seed. Defaults to 0.
+            
+        Returns:
+            float: max |E_precision - E| / max |E| over the sampled states.
+        """
+        rng = np.random.default_rng(seed)
+        states = rng.integers(0, 2, size=(num_samples, self.h.shape[0]))
+        
+        reference = Kernel.compute_energy_batch(self.J, self.h, states, K=self.K, scale=self.scale, dtype=np.float64)
+        J, h, K, scale = Kernel.quantize(self.J, self.h, precision, K=self.K, scale=self.scale)
+        reduced = Kernel.compute_energy_batch(J, h, states, K=K, scale=scale, dtype=np.float64)
+        
+        magnitude = np.max(np.abs(reference)) if len(reference) > 0 else 0.0
+        if magnitude == 0.0:
+            return 0.0
+        return float(np.max(np.abs(reduced - reference)) / magnitude)
+        
+    def set_precision(self, precision: str, num_samples: int = 256) -> float:
+        """
+        Convert the Hamiltonian coefficients (J, h, K) to a given precision in place.
+        
+        Args:
+            precision (str): One of "float64", "float32" or "int16" (fixed point,
+                energies are divided by `self.scale`).
+            num_samples (int): Random states used to report the error. Defaults to 256.
+            
+        Returns:
+            float: The relative energy error introduced by the conversion.
+        """
+        error = self.precision_error(precision, num_samples=num_samples)
+        self.J, self.h, self.K, self.scale = Kernel.quantize(self.J, self.h, precision, K=self.K, scale=self.scale)
+        self.precision = precision
+        return error
+        
+    def cache_key(self) -> str:
+        """
+        Stable key of the problem's defining inputs and builder version.
+        
+        Every instance attribute except the built Hamiltonian and data derived
+        by to_hamiltonian enters the key, so two problems constructed from
+        equal inputs share it.
+        
+        Returns:
+            str: Hex digest.
+            
+        Raises:
+            TypeError: If an input cannot be hashed stably.
+        """
+        built = vars(self).get('_built', ())
+        inputs = {
+            name: value for name, value in vars(self).items()
+            if name not in HAMILTONIAN_ATTRIBUTES and name not in built and name not in self.DERIVED
+        }
+        cls = type(self)
+        return stable_hash(f"{cls.__module__}.{cls.__qualname__}", cls.BUILDER_VERSION, inputs)
+        
+    def build(self) -> None:
+        """
+        Build the Hamiltonian now, reusing the default BuildCache when one is set.
+        
+        On a hit J, h, offset, K and the attributes to_hamiltonian derives
+        are loaded memory-mapped instead of being recomputed. On a miss the
+        problem is built as usual (and stored). A reduced precision set with
+        set_precision is re-applied to the new coefficients.
+        """
+        cache = get_cache()
+        try:
+            key = None if cache is None else self.cache_key()
+        except TypeError:
+            # Inputs without a stable hash are simply not cached
+            key = None
+            
+        attributes = None if key is None else cache.load_hamiltonian(key)
+        if attributes is None:
+            previous = vars(self).get('_built', frozenset())
+            before = dict(vars(self))
+            self._building = True
+            try:
+                self.to_hamiltonian()
+            finally:
+                self._building = False
+            attributes = {
+                name: value for name, value in vars(self).items()
+                if name in ("_J", "_h", "_offset", "_K") or name in previous or name in self.DERIVED
+                or name not in before or value is not before[name]
+            }
+            attributes.pop('_building', None)
+            if key is not None:
+                cache.store_hamiltonian(key, attributes)
+        vars(self).update(attributes)
+        self._built = frozenset(attributes)
+        self._stale = False
+        
+        if self.precision != "float64":
+            self._J, self._h, self._K, self.scale = Kernel.quantize(self._J, self._h, self.precision, K=self._K)
+            
+    def _patch(self, patch: HamiltonianPatch, **inputs: Any) -> HamiltonianPatch:
+        """
+        Record new input values and apply a patch to the built Hamiltonian.
+        
+        Inputs are written without invalidating the Hamiltonian. At a reduced
+        precision the problem is rebuilt on next access instead of patched.
+        Mutation methods call _materialize first, so the patch is relative
+        to the Hamiltonian the caller has seen.
+        
+        Args:
+            patch (HamiltonianPatch): The change of (J, h, offset).
+            **inputs: Attribute name -> new value of the problem's inputs.
+            
+        Returns:
+            HamiltonianPatch: The patch, for forwarding to a running driver.
+        """
+        vars(self).update(inputs)
+        if self.precision != "float64":
+            self._stale = True
+        else:
+            self._J, self._h, self._offset = patch.apply(self._J, self._h, self._offset)
+        return patch
         
     @abstractmethod
     def to_hamiltonian(self) -> None:
         """
-        Convert the problem to Hamiltonian form (J, h).
+        Convert the problem to Hamiltonian form (J, h and optionally K).
         Must be implemented by subclasses.
         """
         raise NotImplementedError
@@ -38,6 +581,38 @@ class PUBOProblem(ABC):
         """
         # Default implementation returns empty metrics
         return {}
+        
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate many solutions at once.
+        
+        Metrics are columnar: one array of length B per metric. Problems report
+        at least "valid" (boolean mask), "objective" (the quantity the problem
+        optimizes, in its natural units) and "violation" (constraint violation,
+        0 for feasible states), using vectorized overrides.
+        
+        The base implementation falls back to stacking evaluate row by row.
+        
+        Args:
+            states (np.ndarray): (B, n) state matrix (a single state is a batch of one).
+            
+        Returns:
+            Dict[str, np.ndarray]: Metric name -> array of B values.
+        """
+        rows = [self.evaluate(state) for state in np.atleast_2d(np.asarray(states))]
+        if not rows or not rows[0]:
+            return {}
+        
+        columns = {}
+        for key in rows[0]:
+            values = [row[key] for row in rows]
+            try:
+                columns[key] = np.array(values)
+            except ValueError:
+                # Ragged per-row values (e.g. index lists) become object arrays
+                columns[key] = np.empty(len(values), dtype=object)
+                columns[key][:] = values
+        return columns
 
     @abstractmethod
     def plot(self, result: Any, threshold: float = 0.5) -> None:
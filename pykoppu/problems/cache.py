@@ -0,0 +1,307 @@
+"""
+Build Cache Module.
+
+Content-addressed on-disk cache for built Hamiltonians, compiled programs
+and channel embeddings.
+"""
+
+import os
+import shutil
+import pickle
+import hashlib
+import itertools
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+import networkx as nx
+from typing import Any, Dict, List, Optional
+from ..opu.kernel import HyperEdges, LowRankCoupling
+
+# Default size bound of a cache directory (1 GiB)
+DEFAULT_MAX_BYTES = 1 << 30
+
+_default_cache: Optional["BuildCache"] = None
+
+def set_cache(cache: Optional["BuildCache"]) -> None:
+    """
+    Enable (or, with None, disable) the cache used by problems and BioCompiler by default.
+
+    Args:
+        cache (Optional[BuildCache]): The cache to use.
+    """
+    global _default_cache
+    _default_cache = cache
+
+def get_cache() -> Optional["BuildCache"]:
+    """
+    The default cache, or None when caching is disabled (the default).
+    """
+    return _default_cache
+
+def stable_hash(*values: Any) -> str:
+    """
+    Hash arbitrary problem inputs into a stable hex digest.
+
+    Arrays are hashed by dtype, shape and contents, graphs by their nodes and
+    edges with attributes, containers and plain objects recursively. The
+    digest does not depend on object identity, so equal inputs built in
+    different processes share a key.
+
+    Args:
+        *values: Values to hash.
+
+    Returns:
+        str: Hex digest.
+
+    Raises:
+        TypeError: If a value cannot be hashed stably (e.g. a function).
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    for value in values:
+        _update(hasher, value)
+    return hasher.hexdigest()
+
+def _update(hasher: Any, value: Any) -> None:
+    """Feed one value into the hasher, tagged by its type."""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            hasher.update(b"object-array;")
+            _update(hasher, value.shape)
+            _update(hasher, value.tolist())
+        else:
+            hasher.update(f"ndarray:{value.dtype.str}:{value.shape};".encode())
+            hasher.update(np.ascontiguousarray(value).tobytes())
+    elif sp.issparse(value):
+        csr = sp.csr_matrix(value)
+        csr.sum_duplicates()
+        hasher.update(b"sparse;")
+        for part in (np.asarray(csr.shape), csr.indptr, csr.indices, csr.data):
+            _update(hasher, part)
+    elif isinstance(value, LowRankCoupling):
+        hasher.update(b"low-rank;")
+        for part in (value.sparse, value.U, value.V):
+            _update(hasher, part)
+    elif isinstance(value, nx.Graph):
+        hasher.update(f"{type(value).__name__};".encode())
+        _update(hasher, dict(value.graph))
+        _update(hasher, list(value.nodes(data=True)))
+        _update(hasher, list(value.edges(data=True)))
+    elif isinstance(value, dict):
+        hasher.update(f"dict:{len(value)};".encode())
+        for key, item in value.items():
+            _update(hasher, key)
+            _update(hasher, item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        hasher.update(f"{type(value).__name__}:{len(value)};".encode())
+        for item in items:
+            _update(hasher, item)
+    elif hasattr(value, '__dict__') and not callable(value):
+        hasher.update(f"{type(value).__module__}.{type(value).__qualname__};".encode())
+        _update(hasher, vars(value))
+    else:
+        raise TypeError(f"Cannot hash {type(value).__name__} stably.")
+
+class BuildCache:
+    """
+    Size-bounded LRU cache of built Hamiltonians, compiled BioASM programs
+    and channel embeddings.
+
+    Every entry is a directory named by its key. Arrays are written as plain
+    .npy files and opened memory-mapped (read-only, like the operands of a
+    freshly compiled program) when loaded, so a hit costs a few file opens
+    regardless of the problem size. Sparse matrices are
+    stored as their CSR arrays, low-rank couplings as sparse part plus factors.
+    Entries are written atomically and the least recently used ones are
+    evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Cache directory (created if missing).
+            max_bytes (int): Size bound of the directory. Defaults to 1 GiB.
+        """
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        os.makedirs(self.path, exist_ok=True)
+
+    def load_hamiltonian(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the attributes of a built problem.
+
+        Args:
+            key (str): Problem cache key (PUBOProblem.cache_key).
+
+        Returns:
+            Optional[Dict[str, Any]]: Attribute name -> value, or None on a miss.
+        """
+        return self._load(f"H-{key}")
+
+    def store_hamiltonian(self, key: str, attributes: Dict[str, Any]) -> None:
+        """
+        Store the attributes of a built problem (J, h, offset, K and derived data).
+
+        Args:
+            key (str): Problem cache key.
+            attributes (Dict[str, Any]): Attribute name -> value.
+        """
+        self._store(f"H-{key}", attributes)
+
+    def load_program(self, key: str) -> Optional[List[Any]]:
+        """
+        Load a compiled program.
+
+        Args:
+            key (str): Program cache key.
+
+        Returns:
+            Optional[List[Instruction]]: The instructions, with array operands
+            memory-mapped, or None on a miss.
+        """
+        from ..biocompiler.isa import OpCode, Instruction
+        entry = self._load(f"P-{key}")
+        if entry is None:
+            return None
+        return [Instruction(OpCode[name], list(operands)) for name, operands in entry["program"]]
+
+    def store_program(self, key: str, instructions: List[Any]) -> None:
+        """
+        Store a compiled program. List operands are stored as arrays.
+
+        Args:
+            key (str): Program cache key.
+            instructions (List[Instruction]): The program.
+        """
+        program = [
+            (instr.opcode.name, tuple(np.asarray(op) if isinstance(op, list) else op for op in instr.operands))
+            for instr in instructions
+        ]
+        self._store(f"P-{key}", {"program": program})
+
+    def load_embedding(self, key: str) -> Optional[np.ndarray]:
+        """
+        Load a channel placement.
+
+        Args:
+            key (str): Embedding cache key (Embedder.structure_key).
+
+        Returns:
+            Optional[np.ndarray]: Channel of every variable, or None on a miss.
+        """
+        entry = self._load(f"E-{key}")
+        return None if entry is None else entry["channels"]
+
+    def store_embedding(self, key: str, channels: np.ndarray) -> None:
+        """
+        Store a channel placement.
+
+        Args:
+            key (str): Embedding cache key.
+            channels (np.ndarray): Channel of every variable.
+        """
+        self._store(f"E-{key}", {"channels": np.asarray(channels)})
+
+    def size(self) -> int:
+        """Total size of all entries in bytes."""
+        return sum(size for _, _, size in self._entries())
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for entry, _, _ in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def _load(self, name: str) -> Optional[Dict[str, Any]]:
+        """Read an entry and mark it as recently used."""
+        entry = os.path.join(self.path, name)
+        manifest = os.path.join(entry, "manifest.pkl")
+        try:
+            with open(manifest, 'rb') as f:
+                layout = pickle.load(f)
+            values = {key: _decode(entry, item) for key, item in layout.items()}
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        os.utime(manifest)
+        return values
+
+    def _store(self, name: str, values: Dict[str, Any]) -> None:
+        """Write an entry into a temporary directory and move it into place."""
+        entry = os.path.join(self.path, name)
+        if os.path.isdir(entry):
+            os.utime(os.path.join(entry, "manifest.pkl"))
+            return
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.path)
+        try:
+            counter = itertools.count()
+            layout = {key: _encode(staging, value, counter) for key, value in values.items()}
+            with open(os.path.join(staging, "manifest.pkl"), 'wb') as f:
+                pickle.dump(layout, f)
+            os.rename(staging, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self._evict()
+
+    def _entries(self) -> List[Any]:
+        """(directory, last use, size) of every complete entry."""
+        entries = []
+        for name in os.listdir(self.path):
+            entry = os.path.join(self.path, name)
+            manifest = os.path.join(entry, "manifest.pkl")
+            if name.startswith(".") or not os.path.isfile(manifest):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((entry, os.path.getmtime(manifest), size))
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for entry, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+def _encode(directory: str, value: Any, counter: Any) -> Any:
+    """Write array parts of a value to .npy files; return a picklable layout."""
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        name = f"a{next(counter)}.npy"
+        np.save(os.path.join(directory, name), value)
+        return ("npy", name)
+    if sp.issparse(value):
+        csr = sp.csr_matrix(value)
+        return ("csr", csr.shape, _encode(directory, csr.data, counter),
+                _encode(directory, csr.indices, counter), _encode(directory, csr.indptr, counter))
+    if isinstance(value, LowRankCoupling):
+        return ("low_rank", _encode(directory, value.sparse, counter),
+                _encode(directory, value.U, counter), _encode(directory, value.V, counter))
+    if isinstance(value, HyperEdges):
+        return ("hyperedges", _encode(directory, value.indices, counter), _encode(directory, value.weights, counter))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, [_encode(directory, item, counter) for item in value])
+    return ("value", value)
+
+def _decode(directory: str, layout: Any) -> Any:
+    """Inverse of _encode; .npy files are opened memory-mapped, read-only."""
+    kind = layout[0]
+    if kind == "npy":
+        return np.load(os.path.join(directory, layout[1]), mmap_mode='r')
+    if kind == "csr":
+        data, indices, indptr = (_decode(directory, part) for part in layout[2:])
+        return sp.csr_matrix((data, indices, indptr), shape=layout[1])
+    if kind == "low_rank":
+        return LowRankCoupling(*(_decode(directory, part) for part in layout[1:]))
+    if kind == "hyperedges":
+        return HyperEdges(*(_decode(directory, part) for part in layout[1:]))
+    if kind == "list":
+        return [_decode(directory, item) for item in layout[1]]
+    if kind == "tuple":
+        return tuple(_decode(directory, item) for item in layout[1])
+    return layout[1]
@@ -4,9 +4,43 @@ Seismic Feature Selection Module.
 Implements the Seismic Feature Selection problem using mRMR approach.
 """
 
+import os
 import numpy as np
-from typing import Any, Dict, List, Optional, Union
-from ..base import PUBOProblem
+import scipy.sparse as sp
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from ..base import PUBOProblem, ModelBuilder
+from ...opu.kernel import HamiltonianPatch
+from ..statistics import RunningMoments
+
+def _load(source: Union[str, np.ndarray]) -> np.ndarray:
+    """Open an .npy path memory-mapped, or pass an array through."""
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode='r')
+    return source
+
+def _chunk_moments(
+    attributes: Union[str, np.ndarray],
+    target: Union[str, np.ndarray],
+    start: int,
+    stop: int
+) -> RunningMoments:
+    """
+    Moments of one row chunk of [attributes | target].
+    
+    Args:
+        attributes: (n_samples, n_features) array or .npy path.
+        target: (n_samples,) array or .npy path.
+        start (int): First row of the chunk.
+        stop (int): End row of the chunk (exclusive).
+        
+    Returns:
+        RunningMoments: Count, mean and co-moments of the chunk.
+    """
+    X = np.asarray(_load(attributes)[start:stop], dtype=np.float64)
+    y = np.asarray(_load(target)[start:stop], dtype=np.float64).reshape(-1, 1)
+    return RunningMoments.from_chunk(np.hstack([X, y]))
 
 class SeismicFeatureSelection(PUBOProblem):
     """
@@ -17,6 +51,8 @@ class SeismicFeatureSelection(PUBOProblem):
     Subject to a cardinality constraint (select exactly k attributes).
     """
     
+    PARAMETERS = ("relevance", "redundancy", "k", "alpha", "beta", "penalty_k")
+    
     def __init__(
         self, 
         relevance: Union[List[float], np.ndarray], 
@@ -24,7 +60,8 @@ class SeismicFeatureSelection(PUBOProblem):
         k: int, 
         alpha: float = 1.0, 
         beta: float = 1.0,
-        penalty_k: float = 10.0
+        penalty_k: float = 10.0,
+        low_rank: Optional[bool] = None
     ):
         """
         Initialize Seismic Feature Selection problem.
@@ -32,14 +69,17 @@ class SeismicFeatureSelection(PUBOProblem):
         Args:
             relevance (Array-like): Vector of relevance scores for each attribute (R).
             redundancy (Array-like): Matrix of redundancy/correlation between attributes (C).
+                May be scipy.sparse (e.g. thresholded correlations).
             k (int): Number of attributes to select.
             alpha (float): Weight for relevance term.
             beta (float): Weight for redundancy term.
             penalty_k (float): Penalty strength for cardinality constraint.
+            low_rank (Optional[bool]): Keep the all-pairs cardinality coupling as
+                rank-1 factors (None selects automatically).
         """
-        super().__init__()
+        super().__init__(low_rank=low_rank)
         self.relevance = np.array(relevance)
-        self.redundancy = np.array(redundancy)
+        self.redundancy = sp.csr_matrix(redundancy) if sp.issparse(redundancy) else np.array(redundancy)
         self.k = k
         self.alpha = alpha
         self.beta = beta
@@ -49,8 +89,96 @@ class SeismicFeatureSelection(PUBOProblem):
         if self.redundancy.shape != (self.n_features, self.n_features):
             raise ValueError("Redundancy matrix shape must match number of features.")
             
-        self.to_hamiltonian()
         
+    @classmethod
+    def from_attributes(
+        cls,
+        attributes: Union[str, np.ndarray],
+        target: Union[str, np.ndarray],
+        k: int,
+        chunk_size: int = 65536,
+        processes: Optional[int] = 1,
+        absolute: bool = True,
+        **kwargs: Any
+    ) -> "SeismicFeatureSelection":
+        """
+        Build the problem from raw attribute samples in a single streaming pass.
+        
+        Relevance is the correlation of each attribute with the target and
+        redundancy the attribute-attribute correlation. Both come from one
+        RunningMoments accumulator that is updated chunk by chunk, so memory
+        stays O(chunk_size * n_features + n_features^2) however many samples there are.
+        
+        Args:
+            attributes: (n_samples, n_features) array, np.memmap or .npy path
+                (opened memory-mapped).
+            target: (n_samples,) target values, array or .npy path.
+            k (int): Number of attributes to select.
+            chunk_size (int): Samples per chunk. Defaults to 65536.
+            processes (Optional[int]): Worker processes for the chunks. None uses
+                os.cpu_count(). Defaults to 1 (in-process).
+            absolute (bool): Use |correlation| as relevance and redundancy.
+                Defaults to True.
+            **kwargs: Further arguments for the constructor (alpha, beta, ...).
+            
+        Returns:
+            SeismicFeatureSelection: The problem instance.
+        """
+        n_samples = _load(attributes).shape[0]
+        chunk_size = max(1, int(chunk_size))
+        bounds = [(start, min(start + chunk_size, n_samples)) for start in range(0, n_samples, chunk_size)]
+        
+        processes = processes or os.cpu_count() or 1
+        if processes > 1 and len(bounds) > 1:
+            moments = cls._parallel_moments(attributes, target, bounds, processes)
+        else:
+            moments = (_chunk_moments(attributes, target, start, stop) for start, stop in bounds)
+            
+        accumulator = RunningMoments()
+        for chunk in moments:
+            accumulator.merge(chunk)
+            
+        # Co-moments -> correlations (constant columns correlate with nothing)
+        corr = accumulator.correlation()
+        if absolute:
+            corr = np.abs(corr)
+            
+        relevance = corr[:-1, -1]
+        redundancy = corr[:-1, :-1]
+        np.fill_diagonal(redundancy, 0.0)
+        return cls(relevance, redundancy, k, **kwargs)
+        
+    @staticmethod
+    def _parallel_moments(
+        attributes: Union[str, np.ndarray],
+        target: Union[str, np.ndarray],
+        bounds: List[Tuple[int, int]],
+        processes: int
+    ) -> Iterator[RunningMoments]:
+        """
+        Chunk moments from a process pool, in chunk order.
+        
+        Paths are reopened by each worker; arrays are shipped chunk by chunk,
+        with at most 2 * processes chunks in flight so that memory stays
+        bounded when the input is a large in-memory array or memmap.
+        """
+        by_path = isinstance(attributes, (str, os.PathLike)) and isinstance(target, (str, os.PathLike))
+        X, y = _load(attributes), _load(target)
+        
+        def submit(pool: ProcessPoolExecutor, start: int, stop: int) -> Future:
+            if by_path:
+                return pool.submit(_chunk_moments, attributes, target, start, stop)
+            return pool.submit(_chunk_moments, np.asarray(X[start:stop]), np.asarray(y[start:stop]), 0, stop - start)
+            
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            pending: Deque[Future] = deque()
+            for start, stop in bounds:
+                if len(pending) >= 2 * processes:
+                    yield pending.popleft().result()
+                pending.append(submit(pool, start, stop))
+            while pending:
+                yield pending.popleft().result()
+                
     def to_hamiltonian(self):
         """
         Convert to Hamiltonian.
@@ -72,69 +200,52 @@ class SeismicFeatureSelection(PUBOProblem):
                   = P * (sum (1-2k) x_i + sum_{i!=j} x_i x_j + k^2)
         """
         n = self.n_features
-        self.J = np.zeros((n, n))
-        self.h = np.zeros(n)
-        self.offset = 0.0
-        
-        P = self.penalty_k
-        k = self.k
-        
-        # 1. H_rel
-        # h_i_solver += alpha * R_i
-        # (Since H term is -alpha R_i x_i, and solver is -h x)
-        self.h += self.alpha * self.relevance
-        
-        # 2. H_red
-        # Term: beta * C_{ij} * x_i * x_j
-        # J_ij_solver = -2 * beta * C_{ij}
-        # Note: Usually redundancy matrix is symmetric. We iterate i!=j.
-        # If C_{ij} is stored for both i,j and j,i, we handle carefully.
-        # Let's iterate all pairs.
-        
-        # 3. H_card
-        # Constant: P * k^2
-        self.offset += P * (k**2)
-        
-        # Linear: P * (1 - 2k) * x_i
-        # h_i_solver -= P * (1 - 2k)
-        self.h -= P * (1 - 2 * k)
-        
-        # Quadratic: P * x_i * x_j (for i != j)
-        # J_ij_solver -= 2 * P
-        
-        # Combine Quadratic Terms
-        for i in range(n):
-            for j in range(i + 1, n):
-                # Redundancy term (beta * C_ij)
-                # We assume C is symmetric or we take average? Usually symmetric.
-                c_val = self.redundancy[i, j]
-                
-                # Cardinality term (P)
-                
-                # Total coeff in H for x_i x_j is (beta * c_val + P)
-                # Solver J_ij = -2 * (beta * c_val + P)
+        features = np.arange(n)
+        model = ModelBuilder(n)
+        
+        # 1. H_rel: -alpha * R_i * x_i
+        model.add_linear(features, -self.alpha * self.relevance)
+        
+        # 2. H_red: beta * C_ij * x_i * x_j over ordered pairs i != j. The upper
+        # triangle (i < j) is taken twice, so C is treated as symmetric
+        upper = sp.triu(self.redundancy, k=1).tocoo()
+        model.add_quadratic(upper.row, upper.col, 2 * self.beta * upper.data)
+        
+        # 3. H_card: P * (sum x_i - k)^2, whose all-pairs coupling is the
+        # rank-1 matrix -2P 1 1^T without its diagonal
+        model.add_squared_linear(features, 1.0, -self.k, self.penalty_k)
+        self._emit(model)
                 
-                val = -2 * (self.beta * c_val + P)
-                self.J[i, j] += val
-                self.J[j, i] += val
+    def update_relevance(self, relevance: np.ndarray, indices: Optional[np.ndarray] = None) -> HamiltonianPatch:
+        """
+        Change relevance scores; h moves by alpha times the change.
+        
+        Args:
+            relevance (np.ndarray): New relevance scores.
+            indices (Optional[np.ndarray]): Attributes to change. Defaults to all.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
+        """
+        self._materialize()
+        index = np.arange(self.n_features) if indices is None else np.asarray(indices, dtype=np.int64).ravel()
+        new = self.relevance.astype(float)
+        new[index] = relevance
+        patch = HamiltonianPatch(h_index=index, h_values=self.alpha * (new[index] - self.relevance[index]))
+        return self._patch(patch, relevance=new)
                 
     def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
         """
         Evaluate solution.
         """
-        x = (solution > 0.5).astype(int)
+        x = (np.asarray(solution) > 0.5).astype(float)
         
-        selected_indices = [i for i, val in enumerate(x) if val == 1]
+        selected_indices = [int(i) for i in np.flatnonzero(x)]
         count = len(selected_indices)
         
-        total_relevance = 0.0
-        total_redundancy = 0.0
-        
-        for i in selected_indices:
-            total_relevance += self.relevance[i]
-            for j in selected_indices:
-                if i != j:
-                    total_redundancy += self.redundancy[i, j]
+        total_relevance = float(self.relevance @ x)
+        # sum_{i != j selected} C_ij
+        total_redundancy = float(x @ (self.redundancy @ x) - self.redundancy.diagonal() @ x)
                     
         # Redundancy is usually summed over pairs, so if we double count (i,j) and (j,i), 
         # it matches the H formulation sum_{i,j}.
@@ -155,6 +266,32 @@ class SeismicFeatureSelection(PUBOProblem):
             "selected_indices": selected_indices
         }
 
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a batch of attribute selections.
+
+        The objective is the mRMR score and the violation |count - k|. Selected
+        indices are only reported by evaluate.
+        """
+        X = (np.atleast_2d(np.asarray(states)) > 0.5).astype(float)
+        count = X.sum(axis=1).astype(np.int64)
+
+        total_relevance = X @ self.relevance
+        # Row-wise x^T C x without the diagonal; C X^T keeps sparse C sparse
+        CX = np.asarray(self.redundancy @ X.T).T
+        total_redundancy = np.einsum('bi,bi->b', CX, X) - X @ self.redundancy.diagonal()
+        score = self.alpha * total_relevance - self.beta * total_redundancy
+
+        return {
+            "valid": count == self.k,
+            "objective": score,
+            "violation": np.abs(count - self.k),
+            "selected_count": count,
+            "total_relevance": total_relevance,
+            "total_redundancy": total_redundancy,
+            "mrmr_score": score
+        }
+
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
         Visualize Feature Selection.
@@ -167,7 +304,7 @@ class SeismicFeatureSelection(PUBOProblem):
         # Calculate average redundancy for each feature (to plot against relevance)
         # Avg redundancy with ALL other features? Or just general "redundancy score"?
         # Let's plot Relevance vs Avg Correlation with others.
-        avg_redundancy = np.mean(self.redundancy, axis=1)
+        avg_redundancy = np.asarray(self.redundancy.mean(axis=1)).ravel()
         
         plt.figure(figsize=(10, 6))
         
@@ -5,9 +5,10 @@ Implements the Well Placement problem for the Energy sector.
 """
 
 import numpy as np
-import math
-from typing import Any, Dict, List, Optional
-from ..base import PUBOProblem
+from scipy.spatial import cKDTree
+from typing import Any, Dict, List, Optional, Tuple
+from ..base import PUBOProblem, ModelBuilder
+from ...opu.kernel import HamiltonianPatch, LowRankCoupling
 
 class WellPlacement(PUBOProblem):
     """
@@ -17,13 +18,18 @@ class WellPlacement(PUBOProblem):
     while respecting budget and minimum distance constraints.
     """
     
+    PARAMETERS = ("locations", "budget", "min_dist", "penalty_budget", "penalty_dist")
+    DERIVED = ("coords", "conflicts")
+    
     def __init__(
         self, 
         locations: List[Dict[str, Any]], 
         budget: float, 
         min_dist: float, 
         penalty_budget: float = 10.0,
-        penalty_dist: float = 10.0
+        penalty_dist: float = 10.0,
+        sparse: Optional[bool] = None,
+        low_rank: Optional[bool] = None
     ):
         """
         Initialize Well Placement problem.
@@ -39,16 +45,17 @@ class WellPlacement(PUBOProblem):
             min_dist (float): Minimum required distance between any two wells.
             penalty_budget (float): Penalty strength for budget constraint.
             penalty_dist (float): Penalty strength for distance constraint.
+            sparse (Optional[bool]): Storage format of J (None selects automatically).
+            low_rank (Optional[bool]): Keep the rank-1 budget coupling as factors
+                (None selects automatically).
         """
-        super().__init__()
+        super().__init__(sparse=sparse, low_rank=low_rank)
         self.locations = locations
         self.budget = budget
         self.min_dist = min_dist
         self.penalty_budget = penalty_budget
         self.penalty_dist = penalty_dist
         
-        self.to_hamiltonian()
-        
     def to_hamiltonian(self):
         """
         Convert to Hamiltonian.
@@ -71,90 +78,181 @@ class WellPlacement(PUBOProblem):
            H_dist = sum_{i<j, incompatible} P_dist * x_i * x_j
         """
         n = len(self.locations)
-        self.J = np.zeros((n, n))
-        self.h = np.zeros(n)
-        self.offset = 0.0
-        
-        # Extract values and costs
-        values = np.array([loc['value'] for loc in self.locations])
-        costs = np.array([loc['cost'] for loc in self.locations])
-        
-        P_budget = self.penalty_budget
-        P_dist = self.penalty_dist
-        B = self.budget
-        
-        # 1. H_value
-        # h_i += -v_i
-        # Remember solver minimizes E = -0.5 x J x - h x
-        # We want H = ... + sum (-v_i) x_i
-        # So -h_i_solver = -v_i => h_i_solver = v_i
-        self.h += values
-        
-        # 2. H_budget
-        # Constant: P * B^2
-        self.offset += P_budget * (B**2)
-        
-        # Linear: P * (c_i^2 - 2B c_i)
-        # -h_i_solver += P * (c_i^2 - 2B c_i)
-        # h_i_solver -= P * (c_i^2 - 2B c_i)
-        self.h -= P_budget * (costs**2 - 2 * B * costs)
-        
-        # Quadratic: P * c_i c_j (for i != j)
-        # -0.5 J_ij_solver = P * c_i c_j
-        # J_ij_solver = -2 * P * c_i c_j
-        for i in range(n):
-            for j in range(i + 1, n):
-                val = -2 * P_budget * costs[i] * costs[j]
-                self.J[i, j] += val
-                self.J[j, i] += val
+        wells = np.arange(n)
+        
+        # Extract values, costs and coordinates
+        values = np.array([loc['value'] for loc in self.locations], dtype=float)
+        costs = np.array([loc['cost'] for loc in self.locations], dtype=float)
+        _, conflicts = self._geometry()
+        
+        model = ModelBuilder(n)
+        
+        # 1. H_value: -v_i * x_i
+        model.add_linear(wells, -values)
+        
+        # 2. H_budget: P * (sum c_i x_i - B)^2, coupling every pair through
+        # rank-1 factors (c, -2P c)
+        if np.any(costs != 0):
+            model.add_squared_linear(wells, costs, -self.budget, self.penalty_budget)
+        else:
+            model.add_constant(self.penalty_budget * self.budget**2)
+        
+        # 3. H_dist: P_dist * x_i * x_j for incompatible pairs
+        model.add_quadratic(conflicts[:, 0], conflicts[:, 1], 2 * self.penalty_dist)
+        self._emit(model)
+        
+    def _geometry(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Coordinates and conflicting pairs of the candidates, without building J.
+        
+        Only pairs closer than min_dist conflict, so they come from a spatial
+        index. The result is kept as the derived coords and conflicts.
+        """
+        if 'conflicts' not in vars(self):
+            n = len(self.locations)
+            self.coords = np.array([(loc['x'], loc['y']) for loc in self.locations], dtype=float).reshape(n, 2)
+            self.conflicts = self._close_pairs(self.coords, self.min_dist)
+        return self.coords, self.conflicts
                 
-        # 3. H_dist
-        # For incompatible pairs (i, j): + P_dist * x_i * x_j
-        # -0.5 J_ij_solver = P_dist
-        # J_ij_solver = -2 * P_dist
-        
-        # Precompute distances
-        coords = [(loc['x'], loc['y']) for loc in self.locations]
-        
-        for i in range(n):
-            for j in range(i + 1, n):
-                dist = math.sqrt((coords[i][0] - coords[j][0])**2 + (coords[i][1] - coords[j][1])**2)
-                if dist < self.min_dist:
-                    # Violation if both selected
-                    val = -2 * P_dist
-                    self.J[i, j] += val
-                    self.J[j, i] += val
+    @staticmethod
+    def _close_pairs(coords: np.ndarray, min_dist: float) -> np.ndarray:
+        """
+        Find all pairs of points closer than min_dist with a KD-tree.
+        
+        Args:
+            coords (np.ndarray): (n, 2) point coordinates.
+            min_dist (float): Distance threshold (exclusive).
+            
+        Returns:
+            np.ndarray: (p, 2) array of index pairs (i < j).
+        """
+        if len(coords) < 2 or min_dist <= 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        pairs = cKDTree(coords).query_pairs(min_dist, output_type='ndarray').astype(np.int64)
+        # query_pairs includes pairs at exactly min_dist; the constraint is strict
+        dist = np.linalg.norm(coords[pairs[:, 0]] - coords[pairs[:, 1]], axis=1)
+        return pairs[dist < min_dist].reshape(-1, 2)
+                    
+    def add_location(self, location: Dict[str, Any]) -> HamiltonianPatch:
+        """
+        Append a candidate location.
+        
+        The new well couples to every candidate through the budget term and to
+        the candidates closer than min_dist through the distance penalty. With
+        a low-rank J the budget coupling is one factor row, so the patch only
+        lists the close candidates; otherwise it lists every coupling, and
+        applying it reallocates a dense J (O(n^2)).
+        
+        Args:
+            location (Dict): Candidate with 'id', 'x', 'y', 'value' and 'cost'.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
+        """
+        self._materialize()
+        k = len(self.locations)
+        point = np.array([location['x'], location['y']], dtype=float)
+        c, v = float(location['cost']), float(location['value'])
+        costs = np.array([loc['cost'] for loc in self.locations], dtype=float)
+        P = self.penalty_budget
+        
+        close = np.flatnonzero(np.linalg.norm(self.coords - point, axis=1) < self.min_dist)
+        factors = {}
+        if isinstance(self._J, LowRankCoupling):
+            # Budget factors (c, -2P c); the diagonal -2P c^2 is cancelled
+            coupling = np.zeros(len(costs))
+            factors = dict(U=[[c]], V=[[-2 * P * c]])
+        else:
+            coupling = -2 * P * c * costs
+        coupling[close] -= 2 * self.penalty_dist
+        others = np.flatnonzero(coupling)
+        coupling = coupling[others]
+        rows = np.concatenate([np.full(len(others), k), others])
+        cols = np.concatenate([others, np.full(len(others), k)])
+        values = np.concatenate([coupling, coupling])
+        if factors:
+            rows, cols, values = np.append(rows, k), np.append(cols, k), np.append(values, 2 * P * c**2)
+        
+        patch = HamiltonianPatch(
+            inserted=[k],
+            rows=rows,
+            cols=cols,
+            values=values,
+            h_index=[k],
+            h_values=[v - P * (c**2 - 2 * self.budget * c)],
+            **factors
+        )
+        return self._patch(
+            patch,
+            locations=list(self.locations) + [location],
+            coords=np.vstack([self.coords, point]),
+            conflicts=np.vstack([self.conflicts, np.stack([close, np.full(len(close), k)], axis=1)])
+        )
+        
+    def remove_location(self, index: int) -> HamiltonianPatch:
+        """
+        Remove a candidate location. Its variable disappears; no other coefficient changes.
+        
+        Args:
+            index (int): Location index.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
+        """
+        self._materialize()
+        conflicts = self.conflicts[~np.any(self.conflicts == index, axis=1)]
+        return self._patch(
+            HamiltonianPatch(removed=[index]),
+            locations=[loc for i, loc in enumerate(self.locations) if i != index],
+            coords=np.delete(self.coords, index, axis=0),
+            conflicts=conflicts - (conflicts > index)
+        )
+        
+    def update_values(self, values: np.ndarray, indices: Optional[np.ndarray] = None) -> HamiltonianPatch:
+        """
+        Change estimated production values; only the matching biases move.
+        
+        Args:
+            values (np.ndarray): New values.
+            indices (Optional[np.ndarray]): Locations to change. Defaults to all.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
+        """
+        self._materialize()
+        index = np.arange(len(self.locations)) if indices is None else np.asarray(indices, dtype=np.int64).ravel()
+        values = np.broadcast_to(np.asarray(values, dtype=float), index.shape)
+        locations = list(self.locations)
+        old = np.array([locations[i]['value'] for i in index], dtype=float)
+        for i, value in zip(index, values):
+            locations[i] = {**locations[i], 'value': float(value)}
+        return self._patch(HamiltonianPatch(h_index=index, h_values=values - old), locations=locations)
                     
     def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
         """
         Evaluate solution.
         """
-        x = (solution > 0.5).astype(int)
-        
-        total_value = 0.0
-        total_cost = 0.0
-        selected_indices = []
+        x = (np.asarray(solution) > 0.5)
+        selected_indices = np.flatnonzero(x)
         
-        for i, val in enumerate(x):
-            if val == 1:
-                total_value += self.locations[i]['value']
-                total_cost += self.locations[i]['cost']
-                selected_indices.append(i)
+        values = np.array([loc['value'] for loc in self.locations], dtype=float)
+        costs = np.array([loc['cost'] for loc in self.locations], dtype=float)
+        total_value = float(values[x].sum())
+        total_cost = float(costs[x].sum())
                 
         # Check constraints
         budget_ok = (total_cost <= self.budget) # Relaxed check (inequality)
+        coords, conflicts = self._geometry()
+        
+        # A violation is a conflicting pair with both wells selected
+        dist_ok = not np.any(x[conflicts[:, 0]] & x[conflicts[:, 1]])
         
-        dist_ok = True
-        min_dist_found = float('inf')
-        coords = [(self.locations[i]['x'], self.locations[i]['y']) for i in selected_indices]
-        
-        for i in range(len(coords)):
-            for j in range(i + 1, len(coords)):
-                d = math.sqrt((coords[i][0] - coords[j][0])**2 + (coords[i][1] - coords[j][1])**2)
-                if d < min_dist_found:
-                    min_dist_found = d
-                if d < self.min_dist:
-                    dist_ok = False
+        # Closest pair among the selected wells via nearest neighbours
+        min_dist_found = None
+        if len(selected_indices) > 1:
+            selected = coords[selected_indices]
+            nearest, _ = cKDTree(selected).query(selected, k=2)
+            min_dist_found = float(nearest[:, 1].min())
                     
         valid = budget_ok and dist_ok
         
@@ -165,10 +263,40 @@ class WellPlacement(PUBOProblem):
             "budget": self.budget,
             "budget_ok": budget_ok,
             "dist_ok": dist_ok,
-            "min_dist_found": min_dist_found if len(coords) > 1 else None,
+            "min_dist_found": min_dist_found,
             "selected_count": len(selected_indices)
         }
 
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a batch of well selections.
+
+        The objective is the production value; the violation is the budget
+        overrun plus the number of selected pairs closer than min_dist.
+        The closest-pair distance is only reported by evaluate.
+        """
+        X = np.atleast_2d(np.asarray(states)) > 0.5
+        values = np.array([loc['value'] for loc in self.locations], dtype=float)
+        costs = np.array([loc['cost'] for loc in self.locations], dtype=float)
+        total_value = X @ values
+        total_cost = X @ costs
+
+        budget_ok = total_cost <= self.budget
+        _, pairs = self._geometry()
+        conflicts = (X[:, pairs[:, 0]] & X[:, pairs[:, 1]]).sum(axis=1)
+        dist_ok = conflicts == 0
+
+        return {
+            "valid": budget_ok & dist_ok,
+            "objective": total_value,
+            "violation": np.maximum(total_cost - self.budget, 0.0) + conflicts,
+            "total_value": total_value,
+            "total_cost": total_cost,
+            "budget_ok": budget_ok,
+            "dist_ok": dist_ok,
+            "selected_count": X.sum(axis=1)
+        }
+
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
         Visualize Well Placement.
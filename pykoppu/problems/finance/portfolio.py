@@ -4,9 +4,20 @@ Portfolio Optimization Module.
 Implements Portfolio Optimization as a QUBO.
 """
 
+import os
+import copy
 import numpy as np
-from typing import Any
+import scipy.sparse as sp
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
 from ..base import PUBOProblem
+from ..statistics import RunningMoments
+from ...opu.kernel import LowRankCoupling
+
+def _scale_coupling(J: Any, factor: float) -> Any:
+    """Multiply a dense, sparse or low-rank coupling by a scalar."""
+    if isinstance(J, LowRankCoupling):
+        return LowRankCoupling(J.sparse * factor, J.U, J.V * factor)
+    return J * factor
 
 class PortfolioOptimization(PUBOProblem):
     """
@@ -14,22 +25,130 @@ class PortfolioOptimization(PUBOProblem):
     
     Minimize risk and maximize return.
     H = q * sum sigma_ij x_i x_j - sum mu_i x_i
+    
+    The covariance can be given densely, as a factor model
+    Sigma = B F B^T + diag(d) (kept in low-rank form), or estimated from a
+    stream of returns with from_returns.
+    
+    J is linear in q, so the coupling for q = 1 is cached and any other risk
+    aversion (set_risk_aversion, sweep) only rescales it.
     """
     
-    def __init__(self, expected_returns: list, covariance_matrix: np.ndarray, risk_aversion: float):
+    PARAMETERS = ("mu", "sigma")
+    DERIVED = ("_unit_J",)
+    
+    def __init__(
+        self,
+        expected_returns: list,
+        covariance_matrix: Optional[np.ndarray] = None,
+        risk_aversion: float = 1.0,
+        factor_loadings: Optional[np.ndarray] = None,
+        factor_covariance: Optional[np.ndarray] = None,
+        specific_variance: Optional[np.ndarray] = None,
+        low_rank: Optional[bool] = None
+    ):
         """
         Initialize Portfolio Optimization.
         
         Args:
             expected_returns (list): List of expected returns (mu).
-            covariance_matrix (np.ndarray): Covariance matrix (sigma).
+            covariance_matrix (np.ndarray): Covariance matrix (sigma). Omit when a
+                factor model is given.
             risk_aversion (float): Risk aversion coefficient (q).
+            factor_loadings (Optional[np.ndarray]): Factor exposures B, shape (n, k).
+            factor_covariance (Optional[np.ndarray]): Factor covariance F, shape (k, k).
+                Defaults to the identity.
+            specific_variance (Optional[np.ndarray]): Idiosyncratic variances d,
+                shape (n,). Defaults to zero.
+            low_rank (Optional[bool]): Keep a factor-model covariance as factors
+                (None selects automatically).
         """
-        super().__init__()
+        super().__init__(low_rank=low_rank)
         self.mu = np.array(expected_returns)
-        self.sigma = np.array(covariance_matrix)
+        n = len(self.mu)
+        
+        if factor_loadings is not None:
+            B = np.asarray(factor_loadings, dtype=float).reshape(n, -1)
+            F = np.eye(B.shape[1]) if factor_covariance is None else np.asarray(factor_covariance, dtype=float)
+            d = np.zeros(n) if specific_variance is None else np.asarray(specific_variance, dtype=float)
+            self.sigma = LowRankCoupling(sp.diags(d, format='csr'), B, B @ F)
+        elif covariance_matrix is not None:
+            self.sigma = np.array(covariance_matrix)
+        else:
+            raise ValueError("Either covariance_matrix or factor_loadings is required.")
+            
         self.q = risk_aversion
-        self.to_hamiltonian()
+        self.moments: Optional[RunningMoments] = None
+        self.shrinkage: Optional[Union[float, str]] = None
+        
+    @classmethod
+    def from_returns(
+        cls,
+        returns: Union[str, np.ndarray, Iterable[np.ndarray]],
+        risk_aversion: float = 1.0,
+        chunk_size: int = 65536,
+        shrinkage: Optional[Union[float, str]] = None,
+        **kwargs: Any
+    ) -> "PortfolioOptimization":
+        """
+        Estimate mu and Sigma from asset returns in a single streaming pass.
+        
+        Args:
+            returns: (n_periods, n_assets) array, np.memmap, .npy path (opened
+                memory-mapped) or an iterable of (rows, n_assets) chunks.
+            risk_aversion (float): Risk aversion coefficient (q). Defaults to 1.0.
+            chunk_size (int): Rows per chunk for array inputs. Defaults to 65536.
+            shrinkage (Optional[Union[float, str]]): Covariance shrinkage towards a
+                scaled identity: an intensity in [0, 1], "oas" or None. Defaults to None.
+            **kwargs: Further constructor arguments (e.g. low_rank).
+            
+        Returns:
+            PortfolioOptimization: The problem; its moments can be extended later
+            with update_returns.
+        """
+        moments = RunningMoments()
+        for chunk in cls._chunks(returns, chunk_size):
+            moments.update(chunk)
+            
+        problem = cls(moments.mean, moments.covariance(shrinkage=shrinkage), risk_aversion=risk_aversion, **kwargs)
+        problem.moments = moments
+        problem.shrinkage = shrinkage
+        return problem
+        
+    @staticmethod
+    def _chunks(returns: Union[str, np.ndarray, Iterable[np.ndarray]], chunk_size: int) -> Iterator[np.ndarray]:
+        """Row chunks of an array/.npy path, or the items of a chunk iterable."""
+        if isinstance(returns, (str, os.PathLike)):
+            returns = np.load(returns, mmap_mode='r')
+        if isinstance(returns, np.ndarray):
+            chunk_size = max(1, int(chunk_size))
+            for start in range(0, returns.shape[0], chunk_size):
+                yield np.asarray(returns[start:start + chunk_size])
+        else:
+            for chunk in returns:
+                yield np.asarray(chunk)
+                
+    def update_returns(self, returns: Union[str, np.ndarray, Iterable[np.ndarray]], chunk_size: int = 65536) -> None:
+        """
+        Fold new return observations into mu and Sigma and rebuild the Hamiltonian.
+        
+        Only the new rows are processed, so a rebalance costs O(rows * n^2)
+        instead of a full covariance rebuild. The Hamiltonian is rebuilt on
+        its next access.
+        
+        Args:
+            returns: New (rows, n_assets) returns, in any form accepted by from_returns.
+            chunk_size (int): Rows per chunk for array inputs. Defaults to 65536.
+            
+        Raises:
+            ValueError: If the problem was not built with from_returns.
+        """
+        if self.moments is None:
+            raise ValueError("update_returns needs a problem built with from_returns.")
+        for chunk in self._chunks(returns, chunk_size):
+            self.moments.update(chunk)
+        self.mu = self.moments.mean.copy()
+        self.sigma = self.moments.covariance(shrinkage=self.shrinkage)
         
     def to_hamiltonian(self):
         """
@@ -41,9 +160,99 @@ class PortfolioOptimization(PUBOProblem):
         
         -0.5 J = q * Sigma  => J = -2 * q * Sigma
         -h = -mu            => h = mu
+        
+        For a factor model, J = -2q diag(d) + B (-2q F B^T)^T.
         """
-        self.J = -2 * self.q * self.sigma
+        # Coupling for q = 1, reused by set_risk_aversion and sweep
+        if isinstance(self.sigma, LowRankCoupling):
+            d = self.sigma.sparse.diagonal()
+            diag = np.arange(len(d))
+            self._unit_J = self._assemble_J(diag, diag, -2 * d, len(d), factors=(self.sigma.U, -2 * self.sigma.V))
+        else:
+            self._unit_J = -2 * self.sigma
+        self.J = _scale_coupling(self._unit_J, self.q)
         self.h = self.mu
+        
+    @property
+    def q(self) -> float:
+        """
+        Risk aversion coefficient; assigning it rescales a built coupling.
+        
+        At a reduced precision the problem is rebuilt (and re-quantized) on
+        next access instead, as for patches.
+        """
+        return self._q
+        
+    @q.setter
+    def q(self, risk_aversion: float) -> None:
+        self._q = risk_aversion
+        if self._stale:
+            return
+        if self.precision != "float64":
+            self._stale = True
+        else:
+            self.J = _scale_coupling(self._unit_J, risk_aversion)
+            
+    def set_risk_aversion(self, risk_aversion: float) -> None:
+        """
+        Change q in place by rescaling the cached coupling (no covariance work).
+        
+        Args:
+            risk_aversion (float): New risk aversion coefficient (q).
+        """
+        self.q = risk_aversion
+        
+    def sweep(self, risk_aversions: Iterable[float]) -> Iterator["PortfolioOptimization"]:
+        """
+        Problems for a range of risk aversions, e.g. to trace the efficient frontier.
+        
+        Each yielded problem is a shallow copy sharing mu, Sigma and the cached
+        coupling; only J is rescaled. The return moments are copied, so
+        update_returns on a yielded problem leaves the others untouched.
+        
+        Args:
+            risk_aversions (Iterable[float]): Values of q.
+            
+        Yields:
+            PortfolioOptimization: The problem at each q.
+        """
+        # Build once here, so the copies share the unit coupling
+        self._materialize()
+        for q in risk_aversions:
+            problem = copy.copy(self)
+            if self.moments is not None:
+                problem.moments = copy.deepcopy(self.moments)
+            problem.set_risk_aversion(q)
+            yield problem
+            
+    def risk_return(self, solutions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Portfolio variance x^T Sigma x and expected return mu^T x of a batch of selections.
+        
+        Args:
+            solutions (np.ndarray): (B, n) or single solution vector.
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (risk, expected return), each of length B.
+        """
+        X = (np.atleast_2d(np.asarray(solutions)) > 0.5).astype(float)
+        risk = np.einsum('bi,bi->b', X @ self.sigma, X)
+        return risk, X @ self.mu
+        
+    def sweep_energies(self, solutions: np.ndarray, risk_aversions: Iterable[float]) -> np.ndarray:
+        """
+        Energies q * risk - return of a batch of selections for every q at once.
+        
+        Args:
+            solutions (np.ndarray): (B, n) or single solution vector.
+            risk_aversions (Iterable[float]): Values of q.
+            
+        Returns:
+            np.ndarray: (len(risk_aversions), B) energy matrix.
+        """
+        risk, expected = self.risk_return(solutions)
+        q = np.asarray(list(risk_aversions), dtype=float)
+        return q[:, None] * risk[None, :] - expected[None, :]
 
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
@@ -67,10 +276,10 @@ class PortfolioOptimization(PUBOProblem):
         plt.figure(figsize=(10, 6))
         
         # Plot Risk vs Return for all assets
-        plt.scatter(np.diag(self.sigma), self.mu, c='gray', label='Not Selected', alpha=0.5)
+        plt.scatter(self.sigma.diagonal(), self.mu, c='gray', label='Not Selected', alpha=0.5)
         
         # Highlight selected assets
-        selected_risks = np.diag(self.sigma)[selected_indices]
+        selected_risks = self.sigma.diagonal()[selected_indices]
         selected_returns = self.mu[selected_indices]
         plt.scatter(selected_risks, selected_returns, c='green', label='Selected', s=100)
         
@@ -4,9 +4,10 @@ MaxCut Problem Module.
 Implements the MaxCut problem and its conversion to Hamiltonian.
 """
 
+import os
 import networkx as nx
 import numpy as np
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple, Union
 from ..base import PUBOProblem
 
 class MaxCut(PUBOProblem):
@@ -14,18 +15,65 @@ class MaxCut(PUBOProblem):
     MaxCut Problem.
     
     Finds a cut that maximizes the sum of weights of edges crossing the cut.
+    
+    Edges are kept as integer index arrays (edges, weights), so building J and
+    scoring cuts are single vectorized expressions.
     """
     
-    def __init__(self, graph: nx.Graph):
+    PARAMETERS = ("graph", "weight")
+    DERIVED = ("nodes", "edges", "weights", "weighted")
+    
+    def __init__(self, graph: nx.Graph, sparse: Optional[bool] = None, weight: Optional[str] = "weight"):
         """
         Initialize MaxCut problem.
         
         Args:
             graph (nx.Graph): The input graph.
+            sparse (Optional[bool]): Storage format of J (None selects automatically).
+            weight (Optional[str]): Edge attribute holding the weight (missing
+                attributes count as 1). None treats the graph as unweighted.
+                Defaults to "weight".
         """
-        super().__init__()
+        super().__init__(sparse=sparse)
         self.graph = graph
-        self.to_hamiltonian()
+        self.weight = weight
+        
+    @classmethod
+    def from_edge_list(cls, path: Union[str, os.PathLike], sparse: Optional[bool] = None) -> "MaxCut":
+        """
+        Load a graph from a text edge list.
+        
+        Accepts the Gset format (a header line "n m" followed by exactly m
+        1-based "u v w" lines) and plain 0-based "u v" or "u v w" lists. A
+        file is read as Gset only when the header's edge count matches.
+        
+        Args:
+            path: Edge list file.
+            sparse (Optional[bool]): Storage format of J (None selects automatically).
+            
+        Returns:
+            MaxCut: The problem instance, with nodes 0..n-1.
+        """
+        with open(path) as f:
+            first = f.readline().split()
+            
+        n = None
+        if len(first) == 2 and all(token.isdigit() for token in first):
+            # Gset header "n m", then m 1-based weighted edges
+            data = np.loadtxt(path, ndmin=2, skiprows=1, comments=('#', '%'))
+            if data.shape == (int(first[1]), 3):
+                n = int(first[0])
+        if n is not None:
+            u, v = data[:, 0].astype(np.int64) - 1, data[:, 1].astype(np.int64) - 1
+        else:
+            data = np.loadtxt(path, ndmin=2, comments=('#', '%'))
+            u, v = data[:, 0].astype(np.int64), data[:, 1].astype(np.int64)
+        w = data[:, 2] if data.shape[1] > 2 else np.ones(len(u))
+        
+        graph = nx.Graph()
+        graph.add_nodes_from(range(n if n is not None else int(max(u.max(initial=-1), v.max(initial=-1))) + 1))
+        graph.add_weighted_edges_from(zip(u.tolist(), v.tolist(), w.tolist()))
+        return cls(graph, sparse=sparse)
         
     def to_hamiltonian(self):
         """
@@ -39,21 +87,14 @@ class MaxCut(PUBOProblem):
         If J_{ij} > 0 (antiferromagnetic), minimizing H favors s_i != s_j.
         
         So we set J_{uv} = 1.0 for all edges (u, v).
+        
+        Weighted edges scale the coupling: J_{uv} = -w_{uv} in the solver
+        convention below. Self-loops can never be cut and are dropped.
         """
         n = len(self.graph.nodes)
-        self.J = np.zeros((n, n))
         self.h = np.zeros(n)
+        edges, weights = self._edge_arrays()
         
-        # Map nodes to indices
-        nodes = list(self.graph.nodes)
-        node_to_idx = {node: i for i, node in enumerate(nodes)}
-        
-        for u, v in self.graph.edges:
-            i, j = node_to_idx[u], node_to_idx[v]
-            # Antiferromagnetic coupling
-            self.J[i, j] = 1.0
-            self.J[j, i] = 1.0
-            
         # Note: The OPU kernel expects to minimize E = -0.5 * s^T J s - h^T s
         # If we want to minimize H = sum s_i s_j, then J_matrix should be -2 * J_coupling?
         # Wait, let's look at kernel.py:
@@ -146,29 +187,85 @@ class MaxCut(PUBOProblem):
         
         # I will set self.J[i,j] = -1.0 and document it as "Antiferromagnetic coupling (inhibitory)".
         
-        for u, v in self.graph.edges:
-            i, j = node_to_idx[u], node_to_idx[v]
-            self.J[i, j] = -1.0
-            self.J[j, i] = -1.0
+        rows = np.concatenate([edges[:, 0], edges[:, 1]])
+        cols = np.concatenate([edges[:, 1], edges[:, 0]])
+        self.J = self._assemble_J(rows, cols, -np.concatenate([weights, weights]), n)
+        
+    def _edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Integer edge arrays (edges, weights) of the graph, indexed without building J.
+        
+        Nodes are mapped to indices through the graph's sparse adjacency; the
+        result is kept as the derived nodes, edges, weights and weighted.
+        Directed edges are symmetrized, so u->v and v->u add up to one edge.
+        """
+        if 'edges' not in vars(self):
+            self.nodes = list(self.graph.nodes)
+            self.weighted = self.weight is not None and nx.is_weighted(self.graph, weight=self.weight)
+            adjacency = nx.to_scipy_sparse_array(self.graph, nodelist=self.nodes, weight=self.weight, format='csr')
+            if self.graph.is_directed():
+                adjacency = adjacency + adjacency.T
+            adjacency = adjacency.tocoo()
+            upper = adjacency.row < adjacency.col
+            self.edges = np.stack([adjacency.row[upper], adjacency.col[upper]], axis=1).astype(np.int64)
+            self.weights = adjacency.data[upper].astype(float)
+        return self.edges, self.weights
+        
+    def _cut_weight(self, cut: np.ndarray) -> Union[np.ndarray, np.generic]:
+        """Weight of cut edge masks; an edge count (int) for unweighted graphs."""
+        _, weights = self._edge_arrays()
+        sizes = cut @ weights
+        return sizes if self.weighted else np.rint(sizes).astype(np.int64)
+        
+    def cut_size(self, solutions: np.ndarray, threshold: float = 0.5) -> Union[int, float, np.ndarray]:
+        """
+        Total weight of the edges crossing the cut, for one or many states.
+        
+        Unweighted graphs (no edge carries the weight attribute) report the
+        number of cut edges as an int.
+        
+        Args:
+            solutions (np.ndarray): State vector (n,) or state matrix (B, n).
+            threshold (float): Binarization threshold. Defaults to 0.5.
+            
+        Returns:
+            Union[int, float, np.ndarray]: Cut weight, or a vector of B cut weights.
+        """
+        X = np.asarray(solutions) > threshold
+        edges, _ = self._edge_arrays()
+        cut = X[..., edges[:, 0]] != X[..., edges[:, 1]]
+        sizes = self._cut_weight(cut)
+        return sizes.item() if X.ndim == 1 else sizes
             
     def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
         """
-        Calculate MaxCut quality (percentage of edges cut).
+        Calculate MaxCut quality (weight and number of edges cut).
+        
+        cut_size is the cut weight, an int edge count for unweighted graphs.
         """
         # Binarize solution (threshold at 0.5)
-        x = (solution > 0.5).astype(int)
+        x = np.asarray(solution) > 0.5
+        edges, _ = self._edge_arrays()
+        cut = x[edges[:, 0]] != x[edges[:, 1]]
         
-        cut_edges = 0
-        total_edges = self.graph.number_of_edges()
-        node_list = list(self.graph.nodes)
-        
-        for u, v in self.graph.edges:
-            i = node_list.index(u)
-            j = node_list.index(v)
-            if x[i] != x[j]:
-                cut_edges += 1
-                
-        return {"cut_size": cut_edges}
+        return {"cut_size": self._cut_weight(cut).item(), "cut_edges": int(cut.sum())}
+
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a batch of cuts. Every cut is feasible; the objective is the cut weight.
+        """
+        X = np.atleast_2d(np.asarray(states)) > 0.5
+        edges, _ = self._edge_arrays()
+        cut = X[:, edges[:, 0]] != X[:, edges[:, 1]]
+        cut_size = self._cut_weight(cut)
+
+        return {
+            "valid": np.ones(len(X), dtype=bool),
+            "objective": cut_size,
+            "violation": np.zeros(len(X)),
+            "cut_size": cut_size,
+            "cut_edges": cut.sum(axis=1)
+        }
 
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
@@ -195,15 +292,7 @@ class MaxCut(PUBOProblem):
         )
         
         # Recalculate metrics based on threshold
-        cut_edges = 0
-        total_edges = self.graph.number_of_edges()
-        node_list = list(self.graph.nodes)
-        
-        for u, v in self.graph.edges:
-            i = node_list.index(u)
-            j = node_list.index(v)
-            if x[i] != x[j]:
-                cut_edges += 1
+        cut_size = self.cut_size(x)
                 
-        plt.title(f"MaxCut Solution (Red vs Blue)\nThreshold: {threshold} | Cut Size: {cut_edges}")
+        plt.title(f"MaxCut Solution (Red vs Blue)\nThreshold: {threshold} | Cut Size: {cut_size:g}")
         plt.show()
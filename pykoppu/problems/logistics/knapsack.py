@@ -4,9 +4,13 @@ Knapsack Problem Module.
 Implements the Knapsack problem as a QUBO.
 """
 
-from typing import List, Dict, Any
+import warnings
+from typing import List, Dict, Any, Optional
 import numpy as np
-from ..base import PUBOProblem
+from ..base import PUBOProblem, ModelBuilder
+from ...opu.kernel import HamiltonianPatch, LowRankCoupling
+
+CONSTRAINTS = ("equality", "inequality")
 
 class Knapsack(PUBOProblem):
     """
@@ -17,9 +21,26 @@ class Knapsack(PUBOProblem):
     or assuming exact capacity match if that's the prompt's implication, 
     but usually Knapsack is inequality. The prompt formula uses (sum w_i x_i - C)^2 
     which enforces equality sum w_i x_i = C).
+    
+    The "inequality" constraint mode adds binary slack variables s with
+    log-scaled coefficients so that sum w_i x_i + sum a_b s_b = floor(C) can
+    be met by any packing with sum w_i x_i <= C. The slack only represents
+    the integers 0..floor(C), so this holds for integer weights; packings of
+    fractional weights pay a residual penalty (a warning is issued), and such
+    weights should be scaled to integers first.
     """
     
-    def __init__(self, items: List[Dict[str, float]], capacity: float, penalty: float):
+    PARAMETERS = ("capacity", "penalty", "constraint", "weights", "values")
+    DERIVED = ("slack_coeffs",)
+    
+    def __init__(
+        self,
+        items: List[Dict[str, float]],
+        capacity: float,
+        penalty: float,
+        low_rank: Optional[bool] = None,
+        constraint: str = "equality"
+    ):
         """
         Initialize Knapsack problem.
         
@@ -27,12 +48,54 @@ class Knapsack(PUBOProblem):
             items (List[Dict]): List of items with 'value' and 'weight'.
             capacity (float): Target capacity.
             penalty (float): Penalty coefficient (P).
+            low_rank (Optional[bool]): Keep the rank-1 capacity coupling as factors
+                (None selects automatically).
+            constraint (str): "equality" penalizes (sum w_i x_i - C)^2, "inequality"
+                adds ceil(log2(floor(C) + 1)) slack bits for sum w_i x_i <= C
+                (exact for integer weights). Defaults to "equality".
         """
-        super().__init__()
+        super().__init__(low_rank=low_rank)
+        if constraint not in CONSTRAINTS:
+            raise ValueError(f"Unknown constraint: {constraint}")
         self.items = items
         self.capacity = capacity
         self.penalty = penalty
-        self.to_hamiltonian()
+        self.constraint = constraint
+        
+    @property
+    def items(self) -> List[Dict[str, float]]:
+        """Items with 'value' and 'weight'; assigning them resets weights and values."""
+        return self._items
+        
+    @items.setter
+    def items(self, items: List[Dict[str, float]]) -> None:
+        self._items = items
+        self.weights = np.array([item['weight'] for item in items], dtype=float)
+        self.values = np.array([item['value'] for item in items], dtype=float)
+        self.n_items = len(items)
+        
+    @staticmethod
+    def _slack_coefficients(capacity: float) -> np.ndarray:
+        """
+        Log-scaled slack coefficients covering every integer in [0, floor(C)].
+        
+        Uses 1, 2, ..., 2^(B-2) and a last coefficient floor(C) - (2^(B-1) - 1),
+        so B = ceil(log2(floor(C) + 1)) bits reach exactly floor(C) and never
+        exceed it. Only integer slack values exist, so a packing with a
+        fractional total weight cannot meet the equality exactly.
+        
+        Args:
+            capacity (float): Knapsack capacity C.
+            
+        Returns:
+            np.ndarray: Slack coefficients a_b.
+        """
+        C = int(np.floor(capacity))
+        if C <= 0:
+            return np.zeros(0)
+        B = C.bit_length()
+        coeffs = np.ldexp(1.0, np.arange(B - 1))
+        return np.append(coeffs, C - (2 ** (B - 1) - 1))
         
     def to_hamiltonian(self):
         """
@@ -62,46 +125,164 @@ class Knapsack(PUBOProblem):
         Map to E:
         -0.5 * J_ij = P w_i w_j  => J_ij = -2 P w_i w_j
         -h_i = -v_i + P(w_i^2 - 2C w_i) => h_i = v_i - P(w_i^2 - 2C w_i)
+        
+        J is the rank-1 matrix -2P w w^T with its diagonal removed, i.e.
+        factors (w, -2P w) plus a diagonal correction of +2P w_i^2.
+        
+        In inequality mode the slack bits simply extend the constraint vector:
+        w <- [w, a] and v <- [v, 0], and the target becomes floor(C), the
+        largest load the slack can complete.
+        """
+        # Constraint coefficients and values over items followed by slack bits
+        slack = self._slack()
+        weights = np.concatenate([self.weights, slack])
+        values = np.concatenate([self.values, np.zeros(len(slack))])
+        n = len(weights)
+        
+        model = ModelBuilder(n)
+        model.add_linear(np.arange(n), -values)
+        # P (sum w_i x_i - C)^2 (floor(C) with slack), coupling kept as rank-1 factors (w, -2P w)
+        model.add_squared_linear(np.arange(n), weights, -self._target(), self.penalty)
+        self._emit(model)
+
+    def _target(self) -> float:
+        """
+        Right-hand side of the penalized equality.
+        
+        In inequality mode the slack bits complete any integer load to
+        floor(C), so a fractional part of the capacity cannot be reached and
+        would let floor(C) + 1 pay the same penalty as floor(C).
+        """
+        return float(np.floor(self.capacity)) if self.constraint == "inequality" else self.capacity
+        
+    @staticmethod
+    def _check_integral(weights: np.ndarray) -> None:
+        """Warn when integer slack bits cannot absorb the weights exactly."""
+        weights = np.asarray(weights, dtype=float)
+        if not np.allclose(weights, np.round(weights)):
+            warnings.warn(
+                "Knapsack inequality slack only represents integer loads 0..floor(C); "
+                "packings with fractional weights cannot meet the constraint exactly. "
+                "Scale the weights to integers."
+            )
+            
+    def _slack(self) -> np.ndarray:
+        """
+        Slack coefficients of the current capacity and constraint, without building J.
+        
+        The result is kept as the derived slack_coeffs.
+        """
+        if 'slack_coeffs' not in vars(self):
+            if self.constraint == "inequality":
+                self._check_integral(self.weights)
+            # Slack bits follow the capacity
+            self.slack_coeffs = self._slack_coefficients(self.capacity) if self.constraint == "inequality" else np.zeros(0)
+        return self.slack_coeffs
+        
+    def update_values(self, values: np.ndarray, indices: Optional[np.ndarray] = None) -> HamiltonianPatch:
+        """
+        Change item values without a rebuild.
+        
+        Only h_i = v_i - P w_i^2 + 2 P C w_i depends on the value, so the patch
+        touches one bias per changed item.
+        
+        Args:
+            values (np.ndarray): New values.
+            indices (Optional[np.ndarray]): Items to change. Defaults to all.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
+        """
+        self._materialize()
+        index = np.arange(self.n_items) if indices is None else np.asarray(indices, dtype=np.int64).ravel()
+        new = self.values.copy()
+        new[index] = values
+        items = list(self.items)
+        for i in index:
+            items[i] = {**items[i], 'value': float(new[i])}
+        patch = HamiltonianPatch(h_index=index, h_values=new[index] - self.values[index])
+        return self._patch(patch, _items=items, values=new)
+        
+    def add_item(self, item: Dict[str, float]) -> HamiltonianPatch:
+        """
+        Append an item.
+        
+        The new variable goes after the existing items (before any slack bits)
+        and couples to every variable through -2P w w_j. With a low-rank J that
+        coupling is the existing rank-1 term, so the patch carries one factor
+        row and the diagonal cancellation (O(1) entries). Otherwise it carries
+        the 2n explicit couplings, and applying it reallocates a dense J (O(n^2)).
+        
+        Args:
+            item (Dict): Item with 'value' and 'weight'.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
+        """
+        self._materialize()
+        w, v = float(item['weight']), float(item['value'])
+        if self.constraint == "inequality":
+            self._check_integral([w])
+        P, C = self.penalty, self._target()
+        k = self.n_items
+        bias = dict(h_index=[k], h_values=[v - P * w**2 + 2 * P * C * w])
+        
+        if isinstance(self._J, LowRankCoupling):
+            # Factors (w, -2P w): U V^T gains row and column k; its diagonal
+            # entry -2P w^2 is cancelled in the sparse part
+            patch = HamiltonianPatch(
+                inserted=[k], rows=[k], cols=[k], values=[2 * P * w**2],
+                U=[[w]], V=[[-2 * P * w]], **bias
+            )
+        else:
+            # Existing variables (items, then slack bits) in their post-insertion numbering
+            weights = np.concatenate([self.weights, self.slack_coeffs])
+            others = np.arange(len(weights))
+            others = np.where(others >= k, others + 1, others)
+            coupling = -2 * P * w * weights
+            patch = HamiltonianPatch(
+                inserted=[k],
+                rows=np.concatenate([np.full(len(others), k), others]),
+                cols=np.concatenate([others, np.full(len(others), k)]),
+                values=np.concatenate([coupling, coupling]),
+                **bias
+            )
+        return self._patch(
+            patch,
+            _items=list(self.items) + [item],
+            weights=np.append(self.weights, w),
+            values=np.append(self.values, v),
+            n_items=k + 1
+        )
+        
+    def remove_item(self, index: int) -> HamiltonianPatch:
+        """
+        Remove an item. Its variable disappears; no other coefficient changes.
+        
+        Args:
+            index (int): Item index.
+            
+        Returns:
+            HamiltonianPatch: The change of the Hamiltonian.
         """
-        n = len(self.items)
-        weights = np.array([item['weight'] for item in self.items])
-        values = np.array([item['value'] for item in self.items])
-        P = self.penalty
-        C = self.capacity
-        
-        self.J = np.zeros((n, n))
-        self.h = np.zeros(n)
-        
-        # Linear terms
-        # h_i = v_i - P * w_i^2 + 2 * P * C * w_i
-        self.h = values - P * (weights**2) + 2 * P * C * weights
-        
-        # Constant term (offset)
-        # H_const = P * C^2
-        self.offset = P * (C**2)
-        
-        # Quadratic terms
-        # J_ij = -2 * P * w_i * w_j
-        for i in range(n):
-            for j in range(i + 1, n):
-                val = -2 * P * weights[i] * weights[j]
-                self.J[i, j] = val
-                self.J[j, i] = val
+        self._materialize()
+        return self._patch(
+            HamiltonianPatch(removed=[index]),
+            _items=[item for i, item in enumerate(self.items) if i != index],
+            weights=np.delete(self.weights, index),
+            values=np.delete(self.values, index),
+            n_items=self.n_items - 1
+        )
 
     def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
         """
         Evaluate Knapsack solution.
         """
-        # Binarize solution
-        x = (solution > 0.5).astype(int)
+        # Binarize solution (slack bits, if any, are ignored)
+        x = (np.asarray(solution)[:self.n_items] > 0.5)
         
-        total_weight = 0.0
-        total_value = 0.0
-        
-        for i, item in enumerate(self.items):
-            if x[i] == 1:
-                total_weight += item['weight']
-                total_value += item['value']
+        total_weight = float(self.weights[x].sum())
+        total_value = float(self.values[x].sum())
                 
         valid = total_weight <= self.capacity
         
@@ -112,6 +293,91 @@ class Knapsack(PUBOProblem):
             "capacity": self.capacity
         }
 
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a batch of Knapsack solutions.
+
+        The objective is the packed value and the violation the weight above capacity.
+        """
+        X = (np.atleast_2d(np.asarray(states))[:, :self.n_items] > 0.5).astype(float)
+        total_weight = X @ self.weights
+        total_value = X @ self.values
+
+        return {
+            "valid": total_weight <= self.capacity,
+            "objective": total_value,
+            "violation": np.maximum(total_weight - self.capacity, 0.0),
+            "total_value": total_value,
+            "total_weight": total_weight
+        }
+
+    def feasible(self, solutions: np.ndarray) -> np.ndarray:
+        """
+        Check the capacity constraint for a batch of solutions.
+        
+        Args:
+            solutions (np.ndarray): (B, n) or single solution vector; only the
+                first n_items entries of each row are used.
+                
+        Returns:
+            np.ndarray: Boolean vector of B feasibility flags.
+        """
+        X = np.atleast_2d(np.asarray(solutions))[:, :self.n_items] > 0.5
+        return X @ self.weights <= self.capacity
+        
+    def repair(self, solutions: np.ndarray) -> np.ndarray:
+        """
+        Greedy repair and fill of a batch of solutions.
+        
+        Overweight packings drop their lowest value/weight items until they fit;
+        then every packing adds the best-ratio items that still fit. Slack bits
+        (inequality mode) are re-encoded to the remaining capacity, so repaired
+        states also sit at a low energy.
+        
+        Args:
+            solutions (np.ndarray): (B, n) or single solution vector.
+            
+        Returns:
+            np.ndarray: Repaired binary solutions with the input shape.
+        """
+        solutions = np.asarray(solutions)
+        X = np.atleast_2d(solutions) > 0.5
+        items = X[:, :self.n_items].copy()
+        w = self.weights
+        ratio = self.values / np.where(w > 0, w, np.finfo(float).tiny)
+        
+        # 1. Drop: walk items by ascending ratio, removing selected ones while overweight.
+        # Item k goes iff the weight removed before it is still short of the excess.
+        order = np.argsort(ratio, kind='stable')
+        excess = items @ w - self.capacity
+        removed = np.cumsum(items[:, order] * w[order], axis=1)
+        before = removed - items[:, order] * w[order]
+        drop = np.zeros_like(items)
+        drop[:, order] = items[:, order] & (before < excess[:, None])
+        items &= ~drop
+        
+        # 2. Fill: walk items by descending ratio, adding those that still fit
+        remaining = self.capacity - items @ w
+        for k in order[::-1]:
+            add = ~items[:, k] & (w[k] <= remaining + 1e-12)
+            items[:, k] |= add
+            remaining -= add * w[k]
+            
+        X = X.astype(float)
+        X[:, :self.n_items] = items
+        
+        # 3. Slack bits encode the unused (integer) capacity
+        slack = self._slack()
+        n_slack = len(slack)
+        if n_slack > 0 and X.shape[1] >= self.n_items + n_slack:
+            leftover = np.floor(np.maximum(remaining, 0.0) + 1e-9).astype(np.int64)
+            use_last = leftover > 2 ** (n_slack - 1) - 1
+            rest = leftover - use_last * int(slack[-1])
+            bits = (rest[:, None] >> np.arange(n_slack - 1)) & 1
+            X[:, self.n_items:self.n_items + n_slack] = np.column_stack([bits, use_last])
+            
+        return X if solutions.ndim > 1 else X[0]
+
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
         Visualize Knapsack solution.
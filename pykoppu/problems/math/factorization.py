@@ -6,7 +6,46 @@ Implements the Integer Factorization problem as a QUBO.
 
 import numpy as np
 from typing import Any, Dict, List, Tuple, Optional
-from ..base import PUBOProblem
+from ..base import PUBOProblem, ModelBuilder
+from ...opu.kernel import HyperEdges
+
+ENCODINGS = ("product", "carry")
+
+def _square_linear_form(monomials: np.ndarray, weights: np.ndarray, constant: float) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Expand (constant + sum_t w_t prod(monomial_t))^2 over binary variables.
+    
+    Args:
+        monomials (np.ndarray): (T, w) variable indices per monomial, padded with -1.
+        weights (np.ndarray): Coefficient of each monomial.
+        constant (float): Constant term of the linear form.
+        
+    Returns:
+        Dict[int, Tuple[np.ndarray, np.ndarray]]: arity -> (indices (r, arity), coefficients),
+        with x^2 = x applied and arity 0 holding the constant.
+    """
+    T, width = monomials.shape
+    # Cross terms w_t w_u (monomial_t * monomial_u) for all ordered pairs, plus 2 c w_t monomial_t
+    left, right = np.repeat(np.arange(T), T), np.tile(np.arange(T), T)
+    idx = np.concatenate([
+        np.hstack([monomials[left], monomials[right]]),
+        np.hstack([monomials, np.full((T, width), -1)]),
+    ])
+    val = np.concatenate([weights[left] * weights[right], 2 * constant * weights])
+    
+    # Collapse repeated variables: sort rows and keep the first occurrence of each index
+    idx = np.sort(idx, axis=1)
+    first = np.concatenate([np.ones((len(idx), 1), dtype=bool), idx[:, 1:] != idx[:, :-1]], axis=1) & (idx >= 0)
+    arity = first.sum(axis=1)
+    
+    terms = {0: (np.zeros((1, 0), dtype=np.int64), np.array([constant**2]))}
+    for a in np.unique(arity):
+        rows = arity == a
+        if a == 0:
+            terms[0] = (terms[0][0], terms[0][1] + val[rows].sum())
+        else:
+            terms[int(a)] = (idx[rows][first[rows]].reshape(-1, a), val[rows])
+    return terms
 
 class Factorization(PUBOProblem):
     """
@@ -16,7 +55,18 @@ class Factorization(PUBOProblem):
     Uses a multiplication circuit reduction to QUBO.
     """
     
-    def __init__(self, target: int, p_bits: Optional[int] = None, q_bits: Optional[int] = None, penalty: float = 10.0):
+    PARAMETERS = ("target", "n", "m", "penalty", "encoding")
+    DERIVED = ("n_carry",)
+    
+    def __init__(
+        self,
+        target: int,
+        p_bits: Optional[int] = None,
+        q_bits: Optional[int] = None,
+        penalty: float = 10.0,
+        sparse: Optional[bool] = None,
+        encoding: str = "product"
+    ):
         """
         Initialize Factorization problem.
         
@@ -24,10 +74,19 @@ class Factorization(PUBOProblem):
             target (int): The number to factor (N).
             p_bits (int): Number of bits for the first factor p.
             q_bits (int): Number of bits for the second factor q.
-            penalty (float): Penalty strength for consistency constraints.
+            penalty (float): Penalty strength for the z = x*y consistency constraints
+                of the "product" encoding. The "carry" encoding has no auxiliary
+                products to enforce and ignores it.
+            sparse (Optional[bool]): Storage format of J (None selects automatically).
+            encoding (str): "product" (single (N - p*q)^2 equation with z = x*y
+                auxiliaries) or "carry" (column-wise multiplication with carry bits
+                and native higher-order terms). Defaults to "product".
         """
-        super().__init__()
+        super().__init__(sparse=sparse)
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
         self.target = target
+        self.encoding = encoding
         
         # Estimate bits if not provided
         # For N, we roughly need log2(N) bits total.
@@ -42,11 +101,20 @@ class Factorization(PUBOProblem):
         self.m = q_bits
         self.penalty = penalty
         
-        self.to_hamiltonian()
-        
     def to_hamiltonian(self):
         """
-        Convert Factorization to Hamiltonian.
+        Convert Factorization to Hamiltonian using the selected encoding.
+        """
+        self.K = []
+        self.n_carry = 0
+        if self.encoding == "product":
+            self._product_hamiltonian()
+        else:
+            self._carry_hamiltonian()
+            
+    def _product_hamiltonian(self):
+        """
+        Convert Factorization to Hamiltonian (single product equation).
         
         Variables:
         - x_i: bits of p (0..n-1)
@@ -60,6 +128,10 @@ class Factorization(PUBOProblem):
         
         H_cons = sum_{i,j} P_penalty * (3 z_{ij} + x_i y_j - 2 x_i z_{ij} - 2 y_j z_{ij})
         This penalty enforces z_{ij} = x_i AND y_j.
+        
+        With C_{ij} = 2^{i+j} and z^2 = z, H_fact expands to
+        N^2 + sum (C^2 - 2 N C) z + sum_{k != l} C_k C_l z_k z_l,
+        whose quadratic block is the outer product C C^T.
         """
         n = self.n
         m = self.m
@@ -69,186 +141,108 @@ class Factorization(PUBOProblem):
         # Total variables: n (x) + m (y) + n*m (z)
         num_vars = n + m + n * m
         
-        self.J = np.zeros((num_vars, num_vars))
-        self.h = np.zeros(num_vars)
-        self.offset = 0.0
+        # Index grids: x_i, y_j and z_{ij} = n + m + i * m + j
+        ii, jj = np.meshgrid(np.arange(n), np.arange(m), indexing='ij')
+        x_idx = ii.ravel()
+        y_idx = n + jj.ravel()
+        z_idx = n + m + np.arange(n * m)
+        coeffs = np.ldexp(1.0, ii.ravel() + jj.ravel())
         
-        # Helper to get index
-        def idx_x(i): return i
-        def idx_y(j): return n + j
-        def idx_z(i, j): return n + m + i * m + j
+        model = ModelBuilder(num_vars)
         
-        # 1. Consistency Hamiltonian (H_cons)
-        # P * (3 z - 2 x z - 2 y z + x y)
-        # Linear parts: 3 P z
-        # Quadratic parts: -2 P x z, -2 P y z, + P x y
+        # 1. Consistency: 3 z + x y - 2 x z - 2 y z
+        model.add_linear(z_idx, 3 * P_penalty)
+        model.add_quadratic(x_idx, y_idx, P_penalty)
+        model.add_quadratic(x_idx, z_idx, -2 * P_penalty)
+        model.add_quadratic(y_idx, z_idx, -2 * P_penalty)
         
-        for i in range(n):
-            for j in range(m):
-                u = idx_x(i)
-                v = idx_y(j)
-                w = idx_z(i, j)
-                
-                # Linear term for z
-                self.h[w] += 3 * P_penalty
-                
-                # Quadratic terms
-                # x * y
-                self.J[u, v] += P_penalty
-                self.J[v, u] += P_penalty
-                
-                # x * z
-                self.J[u, w] -= 2 * P_penalty
-                self.J[w, u] -= 2 * P_penalty
-                
-                # y * z
-                self.J[v, w] -= 2 * P_penalty
-                self.J[w, v] -= 2 * P_penalty
-                
-        # 2. Factorization Hamiltonian (H_fact)
-        # (N - S)^2 where S = sum_{i,j} C_{ij} z_{ij} with C_{ij} = 2^{i+j}
-        # = N^2 - 2 N S + S^2
-        # S^2 = (sum C z)^2 = sum C^2 z^2 + sum_{k!=l} C_k C_l z_k z_l
-        # Since z is binary, z^2 = z.
-        # S^2 = sum C^2 z + sum_{k!=l} C_k C_l z_k z_l
+        # 2. Factorization: (sum C z - N)^2, expanded into all pairs k < l
+        model.add_squared_linear(z_idx, coeffs, -float(N), factor=False)
+        self._emit(model)
         
-        # Constant term
-        self.offset += N**2
+    def _carry_hamiltonian(self):
+        """
+        Convert Factorization to Hamiltonian (column-wise schoolbook multiplication).
         
-        coeffs = {} # Map z_idx -> coefficient 2^{i+j}
-        for i in range(n):
-            for j in range(m):
-                coeffs[idx_z(i, j)] = 2**(i + j)
-                
-        # Linear term from -2 N S
-        for w, coeff in coeffs.items():
-            self.h[w] -= 2 * N * coeff
-            
-        # Quadratic term from S^2
-        # Diagonal part (z^2 = z)
-        for w, coeff in coeffs.items():
-            self.h[w] += coeff**2
-            
-        # Off-diagonal part
-        z_indices = list(coeffs.keys())
-        for idx1 in range(len(z_indices)):
-            for idx2 in range(idx1 + 1, len(z_indices)):
-                w1 = z_indices[idx1]
-                w2 = z_indices[idx2]
-                c1 = coeffs[w1]
-                c2 = coeffs[w2]
-                
-                val = 2 * c1 * c2 # 2 because J_ij and J_ji
-                self.J[w1, w2] += val/2 # Symmetric matrix, add half to each?
-                self.J[w2, w1] += val/2 # Wait, my convention in other files:
-                # Knapsack: J[i,j] = val; J[j,i] = val where val = -2 P w_i w_j
-                # The formula was -0.5 x J x.
-                # Here I am constructing H directly.
-                # Let's stick to the convention: E = -0.5 x^T J x - h^T x
-                # So if H has term +A x_i x_j, then -0.5 J_ij = A/2 (if J symmetric) => J_ij = -A.
-                # Wait, let's check Knapsack again.
-                # H_quad = P w_i w_j x_i x_j
-                # J_ij = -2 P w_i w_j.
-                # -0.5 * (-2 P) = P. Correct.
-                
-                # So if I have term +C x_i x_j in H, I need J_ij = -2 * C.
-                
-        # Let's re-apply the mapping to J and h
-        # Current self.J and self.h are accumulating coefficients of H.
-        # We need to negate them and multiply J by 2 for the solver format?
-        # Solver expects: E = -0.5 x J x - h x
-        # My H = 0.5 x J_H x + h_H x + offset
-        # So J_solver = - J_H
-        # h_solver = - h_H
-        # But wait, J_H usually has 2*coeff for off-diagonal if we sum over i<j.
-        # Let's just build H coefficients first, then convert.
+        Variables:
+        - x_i: bits of p (0..n-1)
+        - y_j: bits of q (0..m-1)
+        - c_{k,b}: binary-weighted carry bits leaving column k
         
-        pass # Logic continues below
+        Every column k of the long multiplication must balance:
         
-        # Let's restart the J/h population with the correct sign for the solver.
-        # We want to MINIMIZE H.
-        # Solver MINIMIZES E = -0.5 x J x - h x.
-        # So we want E ~ H.
-        # H = sum Q_{ij} x_i x_j + sum L_i x_i
-        # J_{ij} = -2 * Q_{ij} (for i != j)
-        # h_i = -L_i - Q_{ii} (if we treat x^2 as x in Q) -- wait.
-        # Usually Q matrix format: x^T Q x.
-        # x_i^2 = x_i. So diagonal Q_{ii} adds to linear term.
-        # H = sum_{i<j} 2 Q_{ij} x_i x_j + sum (L_i + Q_{ii}) x_i
-        # Match with -0.5 sum J_{ij} x_i x_j - sum h_i x_i
-        # -0.5 J_{ij} = Q_{ij} (for symmetric J, i!=j, effectively sum over all i!=j is sum_{i<j} 2...)
-        # Actually: sum_{i!=j} (-0.5 J_{ij}) x_i x_j = sum_{i<j} (- J_{ij}) x_i x_j
-        # We want this to equal sum_{i<j} 2 Q_{ij} x_i x_j (if Q is symmetric? No, usually Q is upper triangular in QUBO).
-        # Let's assume H terms are accumulated.
+        sum_{i+j=k} x_i y_j + C_k = N_k + 2 C_{k+1},   C_k = sum_b 2^b c_{k,b}
         
-        # Let's reset and do it cleanly.
-        self.J.fill(0)
-        self.h.fill(0)
+        H = sum_k (sum_{i+j=k} x_i y_j + C_k - N_k - 2 C_{k+1})^2
         
-        # We will accumulate terms into a temporary Q matrix (upper triangular) and linear L vector.
-        Q = {} # (i, j) -> val with i < j
-        L = np.zeros(num_vars)
+        Products stay native (no z variables): squaring yields cubic and quartic
+        terms, emitted as higher-order hyperedges (K). Coefficients are bounded
+        by the column heights instead of growing like 4^(n+m).
+        """
+        n = self.n
+        m = self.m
+        N = self.target
         
-        def add_quad(i, j, val):
-            if i == j:
-                L[i] += val
-            else:
-                if i > j: i, j = j, i
-                Q[(i, j)] = Q.get((i, j), 0.0) + val
-                
-        def add_linear(i, val):
-            L[i] += val
-            
-        # 1. Consistency
-        # P * (3 z - 2 x z - 2 y z + x y)
-        for i in range(n):
-            for j in range(m):
-                u = idx_x(i)
-                v = idx_y(j)
-                w = idx_z(i, j)
-                
-                add_linear(w, 3 * P_penalty)
-                add_quad(u, v, P_penalty)     # + x y
-                add_quad(u, w, -2 * P_penalty) # -2 x z
-                add_quad(v, w, -2 * P_penalty) # -2 y z
-                
-        # 2. Factorization
-        # (N - S)^2 = N^2 - 2 N S + S^2
-        # S = sum C_{ij} z_{ij}
+        next_var = n + m
+        carry_in = np.zeros(0, dtype=np.int64)
+        carry_in_weights = np.zeros(0)
+        carry_in_max = 0
         
-        # Linear: -2 N C_{ij} z_{ij}
-        for i in range(n):
-            for j in range(m):
-                w = idx_z(i, j)
-                c = 2**(i + j)
-                add_linear(w, -2 * N * c)
-                
-        # Quadratic: S^2 = (sum C z)^2 = sum C_k C_l z_k z_l
-        z_vars = []
-        for i in range(n):
-            for j in range(m):
-                z_vars.append((idx_z(i, j), 2**(i + j)))
-                
-        for idx1 in range(len(z_vars)):
-            for idx2 in range(len(z_vars)):
-                u, c1 = z_vars[idx1]
-                v, c2 = z_vars[idx2]
-                # Term c1 * c2 * z_u * z_v
-                add_quad(u, v, c1 * c2)
-                
-        # Convert Q and L to J and h for the solver
-        # Solver E = -0.5 x J x - h x
-        # We want H = x Q x + L x
-        # Terms match:
-        # x_i x_j (i<j): H has Q_{ij}. Solver has -J_{ij} (since symmetric J contributes twice -0.5).
-        # So -J_{ij} = Q_{ij} => J_{ij} = -Q_{ij}.
-        # x_i: H has L_i. Solver has -h_i.
-        # So h_i = -L_i.
+        blocks = []
+        k = 0
+        while k <= n + m - 2 or k < N.bit_length() or carry_in_max > 0:
+            N_k = (N >> k) & 1
+            i = np.arange(max(0, k - m + 1), min(k, n - 1) + 1)
+            j = k - i
+            
+            # Carry leaving this column: at most floor((column max - N_k) / 2)
+            carry_out_max = max(0, (len(i) + carry_in_max - N_k) // 2)
+            n_bits = carry_out_max.bit_length()
+            carry_out = next_var + np.arange(n_bits)
+            carry_out_weights = np.ldexp(1.0, np.arange(n_bits))
+            next_var += n_bits
+            
+            # Linear form of the column as monomials (index pairs, -1 = unused slot)
+            monomials = np.concatenate([
+                np.stack([i, n + j], axis=1),
+                np.stack([carry_in, np.full(len(carry_in), -1)], axis=1),
+                np.stack([carry_out, np.full(n_bits, -1)], axis=1),
+            ]).astype(np.int64)
+            weights = np.concatenate([np.ones(len(i)), carry_in_weights, -2 * carry_out_weights])
+            blocks.append(_square_linear_form(monomials, weights, -float(N_k)))
+            
+            carry_in, carry_in_weights, carry_in_max = carry_out, carry_out_weights, carry_out_max
+            k += 1
+            
+        num_vars = next_var
+        self.n_carry = num_vars - n - m
         
-        self.h = -L
-        for (u, v), val in Q.items():
-            self.J[u, v] = -val
-            self.J[v, u] = -val
+        # Merge the expanded columns by arity
+        self.offset = float(sum(block[0][1].sum() for block in blocks if 0 in block))
+        self.h = np.zeros(num_vars)
+        rows, cols, vals = [], [], []
+        higher = {}
+        for block in blocks:
+            for arity, (idx, val) in block.items():
+                if arity == 1:
+                    self.h -= np.bincount(idx[:, 0], weights=val, minlength=num_vars)
+                elif arity == 2:
+                    rows += [idx[:, 0], idx[:, 1]]
+                    cols += [idx[:, 1], idx[:, 0]]
+                    vals += [-val, -val]
+                elif arity > 2:
+                    higher.setdefault(arity, []).append((idx, val))
+                    
+        self.J = self._assemble_J(
+            np.concatenate(rows) if rows else np.zeros(0),
+            np.concatenate(cols) if cols else np.zeros(0),
+            np.concatenate(vals) if vals else np.zeros(0),
+            num_vars
+        )
+        for arity in sorted(higher):
+            idx = np.concatenate([b[0] for b in higher[arity]])
+            val = np.concatenate([b[1] for b in higher[arity]])
+            self.K.append(HyperEdges(idx, -val).canonical())
             
     def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
         """
@@ -283,6 +277,33 @@ class Factorization(PUBOProblem):
             "diff": abs(product - self.target)
         }
 
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a batch of Factorization solutions.
+
+        The objective and violation are both |N - p q|. Factors are decoded with
+        int64 arithmetic, or exact Python integers when p q could overflow it.
+        """
+        X = np.atleast_2d(np.asarray(states)) > 0.5
+        exact = self.n + self.m > 62 or self.target.bit_length() > 62
+        dtype = object if exact else np.int64
+
+        # p = sum_i 2^i x_i and q = sum_j 2^j y_j
+        p = X[:, :self.n].astype(dtype) @ np.array([1 << i for i in range(self.n)], dtype=dtype)
+        q = X[:, self.n:self.n + self.m].astype(dtype) @ np.array([1 << j for j in range(self.m)], dtype=dtype)
+        product = p * q
+        diff = np.abs(product - self.target)
+
+        return {
+            "valid": diff == 0,
+            "objective": diff,
+            "violation": diff,
+            "p": p,
+            "q": q,
+            "product": product,
+            "diff": diff
+        }
+
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
         Visualize Factorization result.
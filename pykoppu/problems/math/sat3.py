@@ -4,20 +4,40 @@
 Implements the 3-Satisfiability (3-SAT) problem and its conversion to Hamiltonian.
 """
 
+import warnings
 import numpy as np
 import matplotlib.pyplot as plt
 import networkx as nx
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from ..base import PUBOProblem
+from ...opu.kernel import HyperEdges
+
+ENCODINGS = ("mis", "cubic", "quadratic")
 
 class SAT3(PUBOProblem):
     """
     3-SAT Problem.
     
     Determines if there exists an interpretation that satisfies a given Boolean formula.
+    
+    Encodings:
+    - "mis": Maximum Independent Set reduction, 3 pobits per clause (default).
+    - "cubic": native k-PUBO clause penalties over the n original variables.
+    - "quadratic": the cubic form with x_a x_b products replaced by auxiliary
+      variables shared by all clauses containing the pair (a, b).
     """
     
-    def __init__(self, clauses: List[Tuple[int, int, int]], n_vars: int, penalty: float = 2.0):
+    PARAMETERS = ("literals", "n_vars", "penalty", "encoding")
+    DERIVED = ("edges", "n_aux", "_graph")
+    
+    def __init__(
+        self,
+        clauses: List[Tuple[int, int, int]],
+        n_vars: int,
+        penalty: float = 2.0,
+        sparse: Optional[bool] = None,
+        encoding: str = "mis"
+    ):
         """
         Initialize 3-SAT problem.
         
@@ -29,14 +49,41 @@ class SAT3(PUBOProblem):
                 Variables are 1-indexed (1 to n_vars).
             n_vars (int): Number of variables.
             penalty (float): Penalty strength for constraints.
+            sparse (Optional[bool]): Storage format of J (None selects automatically).
+            encoding (str): "mis", "cubic" or "quadratic". Defaults to "mis".
         """
-        super().__init__()
+        super().__init__(sparse=sparse)
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
         self.clauses = clauses
         self.n_vars = n_vars
         self.penalty = penalty
-        self.to_hamiltonian()
+        self.encoding = encoding
+        
+    @property
+    def clauses(self) -> List[Tuple[int, int, int]]:
+        """Clauses of three literals; assigning them resets the literal array."""
+        return self._clauses
+        
+    @clauses.setter
+    def clauses(self, clauses: List[Tuple[int, int, int]]) -> None:
+        self._clauses = clauses
+        self.literals = np.asarray(clauses, dtype=np.int64).reshape(-1, 3)
         
     def to_hamiltonian(self):
+        """
+        Convert 3-SAT to Hamiltonian using the selected encoding.
+        """
+        self.offset = 0.0
+        self.K = []
+        self.n_aux = 0
+        self._graph = None
+        if self.encoding == "mis":
+            self._mis_hamiltonian()
+        else:
+            self._clause_hamiltonian()
+            
+    def _mis_hamiltonian(self):
         """
         Convert 3-SAT to Hamiltonian via Maximum Independent Set (MIS).
         
@@ -54,79 +101,209 @@ class SAT3(PUBOProblem):
         Hamiltonian for MIS:
         Maximize size of independent set: Minimize H = - sum y_i + P * sum_{(i,j) in E} y_i y_j
         Where y_i is binary variable for node i.
+        
+        Conflict edges come from a literal -> node index: positive and negative
+        occurrences are grouped per variable and paired group-wise, so the
+        construction is O(M + conflicts) instead of comparing all node pairs.
         """
         M = len(self.clauses)
         n_nodes = 3 * M
         
-        self.J = np.zeros((n_nodes, n_nodes))
-        self.h = np.zeros(n_nodes)
+        # Literal info per node: node 3*m + k holds literal k of clause m
+        node_var, node_neg = self.node_var, self.node_neg
         
-        # Build the graph
-        self.graph = nx.Graph()
-        self.graph.add_nodes_from(range(n_nodes))
+        # 1. Edges within clauses (Cliques)
+        base = 3 * np.arange(M)
+        clique = np.stack([
+            np.concatenate([base, base + 1, base + 2]),
+            np.concatenate([base + 1, base + 2, base]),
+        ], axis=1)
         
-        # Store literal info for each node: (variable_index, is_negated)
-        self.node_info = {}
+        # 2. Edges between conflicting literals (same variable, opposite sign)
+        pos_nodes = np.flatnonzero(~node_neg)
+        neg_nodes = np.flatnonzero(node_neg)
+        neg_nodes = neg_nodes[np.argsort(node_var[neg_nodes], kind='stable')]
+        
+        n_var_ids = int(node_var.max(initial=0)) + 1
+        neg_count = np.bincount(node_var[neg_nodes], minlength=n_var_ids)
+        neg_start = np.cumsum(neg_count) - neg_count
+        
+        # Pair every positive occurrence with each negative occurrence of its variable
+        count = neg_count[node_var[pos_nodes]]
+        left = np.repeat(pos_nodes, count)
+        within = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        right = neg_nodes[np.repeat(neg_start[node_var[pos_nodes]], count) + within]
+        conflicts = np.stack([left, right], axis=1)
+        
+        # A clause containing both x and NOT x yields the same edge twice
+        edges = np.sort(np.concatenate([clique, conflicts]), axis=1)
+        self.edges = np.unique(edges, axis=0) if len(edges) > 0 else edges.reshape(0, 2)
         
-        # 1. Edges within clauses (Cliques)
-        for m, clause in enumerate(self.clauses):
-            # Nodes for this clause are 3*m, 3*m+1, 3*m+2
-            nodes = [3*m, 3*m+1, 3*m+2]
-            
-            for k in range(3):
-                lit = clause[k]
-                var_idx = abs(lit)
-                is_negated = (lit < 0)
-                self.node_info[nodes[k]] = (var_idx, is_negated)
-            
-            # Add edges between them
-            self.graph.add_edge(nodes[0], nodes[1])
-            self.graph.add_edge(nodes[1], nodes[2])
-            self.graph.add_edge(nodes[2], nodes[0])
-            
-        # 2. Edges between conflicting literals
-        for i in range(n_nodes):
-            var_i, neg_i = self.node_info[i]
-            for j in range(i + 1, n_nodes):
-                var_j, neg_j = self.node_info[j]
-                
-                # Conflict if same variable but opposite sign
-                if var_i == var_j and neg_i != neg_j:
-                    self.graph.add_edge(i, j)
-                    
         # Construct Hamiltonian
         # H = - sum y_i + P * sum_{(i,j) in E} y_i y_j
         P = self.penalty
         
         # Linear term: -1 for each node in Hamiltonian => +1 in Bias
-        self.h[:] = 1.0
+        self.h = np.ones(n_nodes)
         
         # Quadratic term: P for each edge (penalty for selecting connected nodes)
-        for u, v in self.graph.edges:
-            self.J[u, v] = P
-            self.J[v, u] = P
+        rows = np.concatenate([self.edges[:, 0], self.edges[:, 1]])
+        cols = np.concatenate([self.edges[:, 1], self.edges[:, 0]])
+        self.J = self._assemble_J(rows, cols, np.full(len(rows), P), n_nodes)
+        
+    def _clause_hamiltonian(self):
+        """
+        Convert 3-SAT to Hamiltonian with one native penalty per clause.
+        
+        A clause (l_1 v l_2 v l_3) is violated iff every literal is false:
+        
+        H_clause = P * prod_k (1 - l_k),  with 1 - l_k = 1 - x_v (l_k = x_v) or x_v (l_k = NOT x_v)
+        
+        Writing each factor as c_k + s_k x_{v_k}, the product expands over the 8
+        subsets S of {1, 2, 3} into monomials prod_{k not in S} c_k prod_{k in S} s_k x_{v_k}.
+        H = P * (number of violated clauses), so H = 0 iff the formula is satisfied.
+        
+        Repeated variables in a clause collapse (x^2 = x) to lower arity terms.
+        In "quadratic" mode every cubic monomial c * x_a x_b x_c becomes c * w_ab x_c,
+        with one auxiliary w_ab per distinct pair enforced by the Rosenberg penalty
+        M_ab * (x_a x_b - 2 x_a w_ab - 2 x_b w_ab + 3 w_ab), M_ab = P + sum |c|.
+        """
+        P = self.penalty
+        n = self.n_vars
+        var = np.abs(self.literals) - 1
+        neg = self.literals < 0
+        c = np.where(neg, 0.0, 1.0)
+        s = np.where(neg, 1.0, -1.0)
+        
+        linear_idx, linear_val = [], []
+        pair_idx, pair_val = [], []
+        cubic_idx, cubic_val = [], []
+        
+        for mask in range(8):
+            members = [k for k in range(3) if mask >> k & 1]
+            coeff = P * np.prod([s[:, k] if k in members else c[:, k] for k in range(3)], axis=0)
+            keep = coeff != 0
+            if not members:
+                self.offset += float(coeff.sum())
+                continue
+                
+            # Collapse repeated variables within the monomial (rows are sorted,
+            # so the first occurrence of each variable marks a distinct one)
+            idx = np.sort(var[keep][:, members], axis=1)
+            coeff = coeff[keep]
+            first = np.concatenate([np.ones((len(idx), 1), dtype=bool), idx[:, 1:] != idx[:, :-1]], axis=1)
+            distinct = first.sum(axis=1)
+            for arity, target_idx, target_val in ((1, linear_idx, linear_val), (2, pair_idx, pair_val), (3, cubic_idx, cubic_val)):
+                rows = distinct == arity
+                if np.any(rows):
+                    target_idx.append(idx[rows][first[rows]].reshape(-1, arity))
+                    target_val.append(coeff[rows])
+                
+        def stack(idx_list, val_list, arity):
+            if not idx_list:
+                return np.zeros((0, arity), dtype=np.int64), np.zeros(0)
+            return np.concatenate(idx_list), np.concatenate(val_list)
+            
+        linear_idx, linear_val = stack(linear_idx, linear_val, 1)
+        pair_idx, pair_val = stack(pair_idx, pair_val, 2)
+        cubic_idx, cubic_val = stack(cubic_idx, cubic_val, 3)
+        
+        # Merge duplicate cubic monomials across clauses (weights in H units)
+        cubic = HyperEdges(cubic_idx, cubic_val).canonical()
+        
+        n_aux = 0
+        if self.encoding == "quadratic" and len(cubic.weights) > 0:
+            pairs, aux_of = np.unique(cubic.indices[:, :2], axis=0, return_inverse=True)
+            aux_of = aux_of.ravel()
+            n_aux = len(pairs)
+            aux = n + np.arange(n_aux)
+            M_ab = P + np.bincount(aux_of, weights=np.abs(cubic.weights), minlength=n_aux)
+            
+            # c * w_ab * x_c
+            pair_idx = np.concatenate([pair_idx, np.stack([aux[aux_of], cubic.indices[:, 2]], axis=1)])
+            pair_val = np.concatenate([pair_val, cubic.weights])
+            # Rosenberg penalty: M x_a x_b - 2M x_a w - 2M x_b w + 3M w
+            pair_idx = np.concatenate([pair_idx, pairs, np.stack([pairs[:, 0], aux], axis=1), np.stack([pairs[:, 1], aux], axis=1)])
+            pair_val = np.concatenate([pair_val, M_ab, -2 * M_ab, -2 * M_ab])
+            linear_idx = np.concatenate([linear_idx, aux[:, None]])
+            linear_val = np.concatenate([linear_val, 3 * M_ab])
+            cubic = HyperEdges(np.zeros((0, 3)), np.zeros(0))
+            
+        self.n_aux = n_aux
+        n_total = n + n_aux
+        
+        # Map H coefficients to the solver convention E = -0.5 x J x - h x - K prod x
+        self.h = -np.bincount(linear_idx.ravel(), weights=linear_val, minlength=n_total)
+        rows = np.concatenate([pair_idx[:, 0], pair_idx[:, 1]])
+        cols = np.concatenate([pair_idx[:, 1], pair_idx[:, 0]])
+        self.J = self._assemble_J(rows, cols, -np.concatenate([pair_val, pair_val]), n_total)
+        if len(cubic.weights) > 0:
+            self.K = [HyperEdges(cubic.indices, -cubic.weights)]
+            
+        # Primal graph (variables sharing a clause) for plotting
+        primal = np.concatenate([var[:, [0, 1]], var[:, [1, 2]], var[:, [0, 2]]])
+        primal = np.sort(primal[primal[:, 0] != primal[:, 1]], axis=1)
+        self.edges = np.unique(primal, axis=0) if len(primal) > 0 else primal.reshape(0, 2)
+        
+    @property
+    def graph(self) -> nx.Graph:
+        """
+        Literal conflict graph of the MIS reduction, or the variable primal graph
+        of the clause encodings (built on first access).
+        """
+        if self._graph is None:
+            self._graph = nx.Graph()
+            self._graph.add_nodes_from(range(3 * len(self.clauses) if self.encoding == "mis" else self.n_vars))
+            self._graph.add_edges_from(map(tuple, self.edges))
+        return self._graph
+        
+    @property
+    def node_var(self) -> np.ndarray:
+        """
+        Variable of each literal node of the MIS reduction (node 3*m + k holds
+        literal k of clause m).
+        """
+        return np.abs(self.literals.ravel())
+        
+    @property
+    def node_neg(self) -> np.ndarray:
+        """
+        Whether each literal node of the MIS reduction is negated.
+        """
+        return self.literals.ravel() < 0
+        
+    @property
+    def node_info(self) -> Dict[int, Tuple[int, bool]]:
+        """
+        Literal of each node as (variable_index, is_negated).
+        """
+        return {i: (int(v), bool(neg)) for i, (v, neg) in enumerate(zip(self.node_var, self.node_neg))}
             
     def decode_solution(self, result: Any, threshold: float = 0.5) -> Dict[int, bool]:
         """
         Decode solution from MIS to Truth Assignment.
         """
         y = (result.solution >= threshold).astype(int)
+        if self.encoding != "mis":
+            # Clause encodings carry the variables directly (auxiliaries follow)
+            return {v: bool(y[v - 1]) for v in range(1, self.n_vars + 1)}
+            
         assignment = {}
+        node_var, node_neg = self.node_var, self.node_neg
         
-        for i in range(len(y)):
-            if y[i] == 1:
-                var_idx, is_negated = self.node_info[i]
-                # If node is selected, the literal is TRUE.
-                # If literal is x, then x=True.
-                # If literal is NOT x, then x=False.
-                val = not is_negated
-                
-                # Check for consistency
-                if var_idx in assignment and assignment[var_idx] != val:
-                    # Conflict in solution (should be prevented by P)
-                    print(f"Warning: Inconsistent assignment for variable {var_idx}")
-                assignment[var_idx] = val
-                
+        for i in np.flatnonzero(y):
+            var_idx, is_negated = int(node_var[i]), bool(node_neg[i])
+            # If node is selected, the literal is TRUE.
+            # If literal is x, then x=True.
+            # If literal is NOT x, then x=False.
+            val = not is_negated
+            
+            # Check for consistency
+            if var_idx in assignment and assignment[var_idx] != val:
+                # Conflict in solution (should be prevented by P)
+                warnings.warn(f"Inconsistent assignment for variable {var_idx}")
+            assignment[var_idx] = val
+            
         # Fill missing variables with False (default)
         for v in range(1, self.n_vars + 1):
             if v not in assignment:
@@ -134,6 +311,93 @@ class SAT3(PUBOProblem):
                 
         return assignment
 
+    def count_satisfied(self, assignments: np.ndarray) -> np.ndarray:
+        """
+        Count satisfied clauses for one or many truth assignments.
+        
+        Args:
+            assignments (np.ndarray): Binary (n_vars,) vector or (B, n_vars) matrix,
+                column v-1 holding variable x_v.
+                
+        Returns:
+            np.ndarray: Number of satisfied clauses per assignment (length B).
+        """
+        X = np.atleast_2d(np.asarray(assignments) > 0.5)
+        # (B, M, 3) literal truth table: x_v for positive, NOT x_v for negative literals
+        literal_true = X[:, np.abs(self.literals) - 1] != (self.literals < 0)
+        return literal_true.any(axis=2).sum(axis=1)
+        
+    def _assignment(self, solution: np.ndarray) -> np.ndarray:
+        """
+        Truth assignment (n_vars,) encoded by a binarized solution vector.
+        """
+        y = np.asarray(solution) > 0.5
+        if self.encoding != "mis":
+            return y[:self.n_vars]
+            
+        # Selected literal nodes set their variable (NOT x sets it to False)
+        assignment = np.zeros(self.n_vars, dtype=bool)
+        selected = np.flatnonzero(y)
+        assignment[self.node_var[selected] - 1] = ~self.node_neg[selected]
+        return assignment
+        
+    def _assignments(self, states: np.ndarray) -> np.ndarray:
+        """
+        Truth assignments (B, n_vars) encoded by a batch of solution vectors.
+        
+        For the MIS encoding the highest selected literal node of a variable
+        decides its value, matching _assignment.
+        """
+        Y = np.atleast_2d(np.asarray(states)) > 0.5
+        if self.encoding != "mis":
+            return Y[:, :self.n_vars]
+            
+        assignment = np.zeros((len(Y), self.n_vars), dtype=bool)
+        node_var, node_neg = self.node_var, self.node_neg
+        if len(node_var) == 0:
+            return assignment
+        # Per variable, the last selected node (1-based, 0 = none) via a segmented max
+        order = np.argsort(node_var, kind='stable')
+        variables, starts = np.unique(node_var[order], return_index=True)
+        ranks = np.where(Y[:, order], order + 1, 0)
+        last = np.maximum.reduceat(ranks, starts, axis=1)
+        assignment[:, variables - 1] = (last > 0) & ~node_neg[np.maximum(last, 1) - 1]
+        return assignment
+        
+    def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
+        """
+        Evaluate 3-SAT solution.
+        """
+        assignment = self._assignment(solution)
+        satisfied = int(self.count_satisfied(assignment)[0])
+        total = len(self.clauses)
+        
+        return {
+            "valid": satisfied == total,
+            "satisfied_clauses": satisfied,
+            "total_clauses": total,
+            "assignment": assignment.astype(int)
+        }
+        
+    def evaluate_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a batch of 3-SAT solutions.
+        
+        The objective is the number of satisfied clauses and the violation the
+        number of unsatisfied ones.
+        """
+        assignments = self._assignments(states)
+        satisfied = self.count_satisfied(assignments)
+        total = len(self.clauses)
+        
+        return {
+            "valid": satisfied == total,
+            "objective": satisfied,
+            "violation": total - satisfied,
+            "satisfied_clauses": satisfied,
+            "assignment": assignments.astype(int)
+        }
+        
     def plot(self, result: Any, threshold: float = 0.5) -> None:
         """
         Visualize SAT graph and solution.
@@ -143,12 +407,31 @@ class SAT3(PUBOProblem):
         plt.figure(figsize=(10, 8))
         pos = nx.spring_layout(self.graph, seed=42)
         
+        if self.encoding != "mis":
+            # Primal graph: variables colored by truth value
+            x = y[:self.n_vars]
+            satisfied = int(self.count_satisfied(x)[0])
+            nx.draw(
+                self.graph,
+                pos,
+                with_labels=True,
+                labels={i: f"x{i + 1}" for i in range(self.n_vars)},
+                node_color=['green' if val == 1 else 'lightgray' for val in x],
+                edge_color='gray',
+                node_size=600,
+                font_color='black'
+            )
+            plt.title(f"SAT3 Solution (Green = True, {self.encoding} encoding)\nSatisfied Clauses: {satisfied}/{len(self.clauses)}")
+            plt.show()
+            return
+        
         node_colors = ['green' if val == 1 else 'lightgray' for val in y]
         
         # Labels: Show literal (e.g., "x1", "-x2")
         labels = {}
+        node_var, node_neg = self.node_var, self.node_neg
         for i in range(len(y)):
-            var_idx, is_negated = self.node_info[i]
+            var_idx, is_negated = node_var[i], node_neg[i]
             sign = "-" if is_negated else ""
             labels[i] = f"{sign}x{var_idx}"
             
@@ -164,11 +447,7 @@ class SAT3(PUBOProblem):
         )
         
         # Check if solution is valid (Independent Set)
-        is_independent = True
-        for u, v in self.graph.edges:
-            if y[u] == 1 and y[v] == 1:
-                is_independent = False
-                break
+        is_independent = not np.any((y[self.edges[:, 0]] == 1) & (y[self.edges[:, 1]] == 1))
                 
         # Check clause satisfaction
         satisfied_clauses = 0
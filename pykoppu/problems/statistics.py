@@ -0,0 +1,117 @@
+"""
+Statistics Module.
+
+Streaming estimators used to build problem matrices from raw data.
+"""
+
+import numpy as np
+from typing import Optional, Union
+
+class RunningMoments:
+    """
+    One-pass mean and co-moment accumulator (parallel Welford / Chan update).
+
+    Chunks of samples can be added in any order, and accumulators built on
+    separate workers can be merged, with the same numerical stability as a
+    two-pass computation.
+
+    Attributes:
+        count (int): Number of samples seen.
+        mean (Optional[np.ndarray]): Feature means.
+        M2 (Optional[np.ndarray]): Co-moment matrix sum (z - mean)(z - mean)^T.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean: Optional[np.ndarray] = None
+        self.M2: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_chunk(cls, chunk: np.ndarray) -> "RunningMoments":
+        """
+        Moments of a single (n_samples, n_features) chunk.
+        """
+        Z = np.atleast_2d(np.asarray(chunk, dtype=np.float64))
+        moments = cls()
+        if Z.shape[0] == 0:
+            return moments
+        moments.count = Z.shape[0]
+        moments.mean = Z.mean(axis=0)
+        centered = Z - moments.mean
+        moments.M2 = centered.T @ centered
+        return moments
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """
+        Fold another accumulator into this one.
+
+        Args:
+            other (RunningMoments): Moments of a disjoint set of samples.
+
+        Returns:
+            RunningMoments: self, for chaining.
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.M2 = other.count, other.mean.copy(), other.M2.copy()
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / n)
+        self.M2 = self.M2 + other.M2 + np.outer(delta, delta) * (self.count * other.count / n)
+        self.count = n
+        return self
+
+    def update(self, chunk: np.ndarray) -> "RunningMoments":
+        """
+        Add a chunk of samples.
+
+        Args:
+            chunk (np.ndarray): (n_samples, n_features) block.
+
+        Returns:
+            RunningMoments: self, for chaining.
+        """
+        return self.merge(RunningMoments.from_chunk(chunk))
+
+    def covariance(self, ddof: int = 1, shrinkage: Optional[Union[float, str]] = None) -> np.ndarray:
+        """
+        Sample covariance matrix, optionally shrunk towards a scaled identity.
+
+        The shrunk estimate is (1 - d) S + d (tr(S) / p) I. The intensity d is
+        either given or "oas", the Oracle Approximating Shrinkage estimate
+        (Chen et al., 2010), which needs nothing beyond S and the sample count.
+
+        Args:
+            ddof (int): Delta degrees of freedom. Defaults to 1.
+            shrinkage (Optional[Union[float, str]]): Intensity in [0, 1], "oas" or
+                None (no shrinkage). Defaults to None.
+
+        Returns:
+            np.ndarray: (n_features, n_features) covariance.
+        """
+        if self.count <= ddof:
+            raise ValueError("Not enough samples for a covariance estimate.")
+        S = self.M2 / (self.count - ddof)
+        if shrinkage is None:
+            return S
+        p = S.shape[0]
+        mu = np.trace(S) / p
+        if shrinkage == "oas":
+            alpha = np.mean(S**2)
+            denominator = (self.count + 1) * (alpha - mu**2 / p)
+            shrinkage = 1.0 if denominator == 0 else min((alpha + mu**2) / denominator, 1.0)
+        elif isinstance(shrinkage, str):
+            raise ValueError(f"Unknown shrinkage: {shrinkage}")
+        elif not 0.0 <= shrinkage <= 1.0:
+            raise ValueError("Shrinkage intensity must lie in [0, 1].")
+        return (1.0 - shrinkage) * S + shrinkage * mu * np.eye(p)
+
+    def correlation(self) -> np.ndarray:
+        """
+        Pearson correlation matrix (constant features correlate with nothing).
+        """
+        std = np.sqrt(np.diag(self.M2))
+        inv = np.divide(1.0, std, out=np.zeros_like(std), where=std > 0)
+        return self.M2 * inv[:, None] * inv[None, :]
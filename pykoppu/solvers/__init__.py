@@ -0,0 +1,9 @@
+"""
+Solvers Package Initialization.
+"""
+
+from .exact import ExactSolver, ExactResult
+from .decomposition import DecompositionSolver, DecompositionResult, SubProblem, partition, clamp
+from .presolve import Presolved, presolve
+
+__all__ = ["ExactSolver", "ExactResult", "DecompositionSolver", "DecompositionResult", "SubProblem", "partition", "clamp", "Presolved", "presolve"]
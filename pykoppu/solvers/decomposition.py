@@ -0,0 +1,502 @@
+"""
+Decomposition Solver Module.
+
+Splits problems larger than the OPU capacity into sub-problems that fit,
+solves them against the rest of the current state and stitches the results.
+"""
+
+import os
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import eigsh
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from ..opu.device import OPU
+from ..opu.kernel import Kernel, DeltaKernel, HyperEdges, LowRankCoupling
+from ..problems.base import PUBOProblem
+
+PARTITION_METHODS = ("spectral", "modularity")
+
+# Below this size the Fiedler vector comes from a dense eigendecomposition
+DENSE_EIGEN_MAX = 2000
+
+class SubProblem(PUBOProblem):
+    """
+    A fixed Hamiltonian over a subset of the variables of a larger problem.
+
+    The remaining variables are clamped: their couplings to the subset are
+    folded into the bias and everything that does not involve the subset
+    into the offset, so energies of the sub-problem equal energies of the
+    full problem with the clamped state.
+    """
+
+    PARAMETERS = ("coupling", "bias", "constant", "hyperedges")
+
+    def __init__(
+        self,
+        coupling: Union[np.ndarray, sp.spmatrix, LowRankCoupling],
+        bias: np.ndarray,
+        constant: float = 0.0,
+        hyperedges: Optional[Sequence[HyperEdges]] = None,
+        variables: Optional[np.ndarray] = None
+    ):
+        """
+        Initialize the sub-problem.
+
+        Args:
+            coupling: Coupling matrix over the subset.
+            bias (np.ndarray): Bias vector including the clamped fields.
+            constant (float): Energy of the clamped variables alone. Defaults to 0.0.
+            hyperedges (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+            variables (Optional[np.ndarray]): Indices of the subset in the parent problem.
+        """
+        super().__init__()
+        self.coupling = coupling
+        self.bias = np.asarray(bias, dtype=float)
+        self.constant = float(constant)
+        self.hyperedges = list(hyperedges or [])
+        self.variables = np.arange(len(self.bias)) if variables is None else np.asarray(variables)
+
+    def to_hamiltonian(self):
+        self.J = self.coupling
+        self.h = self.bias
+        self.offset = self.constant
+        self.K = list(self.hyperedges)
+
+    def evaluate(self, solution: np.ndarray) -> Dict[str, Any]:
+        """
+        Evaluate solution.
+        """
+        state = (np.asarray(solution) > 0.5).astype(float)
+        energy = Kernel.compute_energy_batch(self.J, self.h, state, offset=self.offset, K=self.K, scale=self.scale)
+        return {"energy": float(energy[0])}
+
+    def plot(self, result: Any, threshold: float = 0.5) -> None:
+        """
+        Visualize the sub-problem state.
+        """
+        import matplotlib.pyplot as plt
+
+        state = (np.asarray(result.solution) >= threshold).astype(int)
+        plt.figure(figsize=(10, 2))
+        plt.bar(np.arange(len(state)), state)
+        plt.xticks(np.arange(len(state)), self.variables)
+        plt.title("Sub-problem State")
+        plt.show()
+
+@dataclass
+class DecompositionResult:
+    """
+    Result of a decomposed solve.
+
+    Attributes:
+        solution (np.ndarray): Best binary state found.
+        energy (float): Its energy (including the problem offset).
+        energy_history (np.ndarray): Energy after every sweep, starting with the initial state.
+        parts (List[np.ndarray]): Variable indices of every sub-problem.
+        iterations (int): Number of sweeps performed.
+        metrics (Dict[str, Any]): problem.evaluate of the solution.
+    """
+    solution: np.ndarray
+    energy: float
+    energy_history: np.ndarray
+    parts: List[np.ndarray]
+    iterations: int
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    def __repr__(self):
+        return f"DecompositionResult(energy={self.energy}, parts={len(self.parts)}, iterations={self.iterations})"
+
+def solve_on_opu(problem: PUBOProblem, backend: str = "cpu", t: float = 1000.0) -> np.ndarray:
+    """
+    Solve a sub-problem with a Process on its own driver connection.
+
+    Args:
+        problem (PUBOProblem): The sub-problem.
+        backend (str): The backend driver to use. Defaults to "cpu".
+        t (float): Total simulation duration in milliseconds. Defaults to 1000.0.
+
+    Returns:
+        np.ndarray: The binary solution.
+    """
+    from ..oos.process import Process
+    return (np.asarray(Process(problem, backend=backend, t=t).run().solution) > 0.5).astype(float)
+
+def solve_exact(problem: PUBOProblem) -> np.ndarray:
+    """
+    Solve a sub-problem by exhaustive enumeration (small capacities only).
+
+    Args:
+        problem (PUBOProblem): The sub-problem.
+
+    Returns:
+        np.ndarray: A ground state.
+    """
+    from .exact import ExactSolver
+    return ExactSolver(processes=1).solve(problem).solution
+
+def interaction_graph(J: Any, K: Optional[Sequence[HyperEdges]] = None) -> sp.csr_matrix:
+    """
+    Build the weighted interaction graph of a Hamiltonian.
+
+    Edge weights are |J_ij|, plus |K_e| between every pair of variables of a
+    hyperedge. For a LowRankCoupling only the sparse part is used: the dense
+    low-rank term couples all pairs and carries no partition structure.
+
+    Args:
+        J: Coupling matrix (dense, scipy.sparse or LowRankCoupling).
+        K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+
+    Returns:
+        sp.csr_matrix: Symmetric adjacency matrix with an empty diagonal.
+    """
+    if isinstance(J, LowRankCoupling):
+        J = J.sparse
+    graph = sp.coo_matrix(abs(J).astype(float) if sp.issparse(J) else np.abs(np.asarray(J, dtype=float)))
+    n = graph.shape[0]
+    rows, cols, values = [graph.row], [graph.col], [graph.data]
+    for block in K or []:
+        a, b = np.triu_indices(block.arity, k=1)
+        weights = np.repeat(np.abs(block.weights.astype(float)), len(a))
+        rows += [block.indices[:, a].ravel(), block.indices[:, b].ravel()]
+        cols += [block.indices[:, b].ravel(), block.indices[:, a].ravel()]
+        values += [weights, weights]
+    graph = sp.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n))
+    graph.setdiag(0)
+    graph.eliminate_zeros()
+    return graph
+
+def _fiedler(graph: sp.csr_matrix, seed: int) -> np.ndarray:
+    """Eigenvector of the second-smallest eigenvalue of the graph Laplacian."""
+    laplacian = csgraph.laplacian(graph)
+    if graph.shape[0] <= DENSE_EIGEN_MAX:
+        return np.linalg.eigh(laplacian.toarray())[1][:, 1]
+    v0 = np.random.default_rng(seed).normal(size=graph.shape[0])
+    values, vectors = eigsh(laplacian.astype(float), k=2, which='SA', v0=v0, tol=1e-6)
+    return vectors[:, np.argsort(values)[1]]
+
+def _bisect(graph: sp.csr_matrix, nodes: np.ndarray, capacity: int, seed: int) -> List[np.ndarray]:
+    """Split nodes by connected components, then by recursive spectral bisection."""
+    if len(nodes) <= capacity:
+        return [nodes]
+    sub = graph[nodes][:, nodes]
+    count, labels = csgraph.connected_components(sub, directed=False)
+    if count > 1:
+        return [part for c in range(count) for part in _bisect(graph, nodes[labels == c], capacity, seed)]
+    # Sweep cut along the Fiedler order: cut(S + v) = cut(S) + deg(v) - 2 w(v, S).
+    # The minimum ratio cut keeps dense clusters together without tiny slivers
+    order = np.argsort(_fiedler(sub, seed), kind='stable')
+    rank = np.empty(len(nodes), dtype=np.int64)
+    rank[order] = np.arange(len(nodes))
+    edges = sub.tocoo()
+    before = rank[edges.col] < rank[edges.row]
+    degree = np.asarray(sub.sum(axis=1)).ravel()
+    backward = np.bincount(rank[edges.row[before]], weights=edges.data[before], minlength=len(nodes))
+    cut = np.cumsum(degree[order] - 2 * backward)[:-1]
+    size = np.arange(1, len(nodes))
+    split = int(np.argmin(cut / (size * (len(nodes) - size)))) + 1
+    return _bisect(graph, nodes[order[:split]], capacity, seed) + _bisect(graph, nodes[order[split:]], capacity, seed)
+
+def _pack(parts: List[np.ndarray], capacity: int) -> List[np.ndarray]:
+    """Merge small parts into bins of at most capacity variables (first-fit decreasing)."""
+    bins: List[List[np.ndarray]] = []
+    sizes: List[int] = []
+    for part in sorted(parts, key=len, reverse=True):
+        for b, size in enumerate(sizes):
+            if size + len(part) <= capacity:
+                bins[b].append(part)
+                sizes[b] += len(part)
+                break
+        else:
+            bins.append([part])
+            sizes.append(len(part))
+    return [np.sort(np.concatenate(b)) for b in bins]
+
+def partition(graph: sp.csr_matrix, capacity: int, method: str = "spectral", seed: int = 0) -> List[np.ndarray]:
+    """
+    Partition the variables of an interaction graph into parts of at most capacity.
+
+    "spectral" bisects recursively along the Fiedler vector; "modularity" starts
+    from greedy modularity communities and bisects only those that are too
+    large. Small parts are then packed together up to the capacity.
+
+    Args:
+        graph (sp.csr_matrix): Symmetric weighted adjacency matrix.
+        capacity (int): Maximum number of variables per part.
+        method (str): "spectral" or "modularity". Defaults to "spectral".
+        seed (int): Seed for iterative eigensolvers. Defaults to 0.
+
+    Returns:
+        List[np.ndarray]: Sorted variable indices of every part.
+
+    Raises:
+        ValueError: If the method is unknown or the capacity is not positive.
+    """
+    if method not in PARTITION_METHODS:
+        raise ValueError(f"Unknown partition method: {method}")
+    if capacity < 1:
+        raise ValueError(f"Capacity must be positive, got {capacity}")
+
+    nodes = np.arange(graph.shape[0])
+    if method == "spectral":
+        parts = _bisect(graph, nodes, capacity, seed)
+    else:
+        G = nx.from_scipy_sparse_array(graph)
+        communities = nx.algorithms.community.greedy_modularity_communities(G, weight='weight')
+        parts = [p for c in communities for p in _bisect(graph, np.sort(np.fromiter(c, dtype=np.int64)), capacity, seed)]
+    return _pack(parts, capacity)
+
+def clamp(
+    J: Any,
+    h: np.ndarray,
+    state: np.ndarray,
+    part: np.ndarray,
+    offset: float = 0.0,
+    K: Optional[Sequence[HyperEdges]] = None
+) -> SubProblem:
+    """
+    Restrict a Hamiltonian to part with all other variables clamped to state.
+
+    h_P <- h_P + J_{P,rest} x_rest, and hyperedges lose their clamped members:
+    those with a clamped 0 vanish, the rest drop to the arity of their free
+    members (bias, coupling or a smaller hyperedge).
+
+    Args:
+        J: Coupling matrix (dense, scipy.sparse or LowRankCoupling).
+        h (np.ndarray): Bias vector.
+        state (np.ndarray): Current binary state of all variables.
+        part (np.ndarray): Indices of the free variables.
+        offset (float): Constant energy offset. Defaults to 0.0.
+        K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+
+    Returns:
+        SubProblem: The clamped sub-problem.
+    """
+    n = len(h)
+    part = np.asarray(part, dtype=np.int64)
+    position = np.full(n, -1)
+    position[part] = np.arange(len(part))
+    rest = np.asarray(state, dtype=float).copy()
+    rest[part] = 0.0
+
+    if isinstance(J, LowRankCoupling):
+        coupling = LowRankCoupling(sp.csr_matrix(J.sparse)[part][:, part], J.U[part], J.V[part])
+    elif sp.issparse(J):
+        coupling = sp.csr_matrix(J)[part][:, part]
+    else:
+        coupling = np.asarray(J)[np.ix_(part, part)]
+    bias = (np.asarray(J @ rest).ravel() + h)[part]
+    constant = float(Kernel.compute_energy_batch(J, h, rest, offset=offset, K=K, dtype=np.float64)[0])
+
+    # Hyperedges: energy term -w prod x over free members times the clamped product
+    rows, cols, values = [], [], []
+    hyperedges = []
+    for block in K or []:
+        free = position[block.indices] >= 0
+        weights = block.weights * np.prod(np.where(free, 1.0, rest[block.indices]), axis=1)
+        arity = free.sum(axis=1)
+        for a in np.unique(arity[(weights != 0) & (arity > 0)]):
+            rows_a = (arity == a) & (weights != 0)
+            members = position[block.indices[rows_a]][free[rows_a]].reshape(-1, a)
+            if a == 1:
+                bias += np.bincount(members[:, 0], weights=weights[rows_a], minlength=len(part))
+            elif a == 2:
+                rows += [members[:, 0], members[:, 1]]
+                cols += [members[:, 1], members[:, 0]]
+                values += [weights[rows_a], weights[rows_a]]
+            else:
+                hyperedges.append(HyperEdges(members, weights[rows_a]))
+    if values:
+        delta = sp.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(len(part), len(part)))
+        if isinstance(coupling, LowRankCoupling):
+            coupling = LowRankCoupling(coupling.sparse + delta, coupling.U, coupling.V)
+        elif sp.issparse(coupling):
+            coupling = coupling + delta
+        else:
+            coupling = coupling + delta.toarray()
+    return SubProblem(coupling, bias, constant, hyperedges, variables=part)
+
+class DecompositionSolver:
+    """
+    Capacity-aware solver for problems larger than one OPU.
+
+    The interaction graph of J is partitioned into parts that fit the OPU
+    capacity. Each sweep solves every part with all other variables clamped
+    to the current state and keeps a sub-solution only if it lowers the full
+    energy (QBSolv-style). When a sweep stalls, windows of the variables with
+    the cheapest single flips are tried as extra parts; sweeps repeat until
+    the energy stops improving.
+    Parts that share no coupling (apart from the low-rank term of a
+    LowRankCoupling) are solved concurrently across a process pool, each
+    worker driving its own OPU connection.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        sub_solver: Union[str, Callable[[PUBOProblem], np.ndarray]] = "opu",
+        method: str = "spectral",
+        max_iterations: int = 20,
+        tol: float = 1e-9,
+        processes: Optional[int] = None,
+        backend: str = "cpu",
+        t: float = 1000.0,
+        seed: int = 0
+    ):
+        """
+        Initialize the solver.
+
+        Args:
+            capacity (Optional[int]): Maximum variables per sub-problem. Defaults
+                to the capacity of a default OPU.
+            sub_solver (Union[str, Callable]): "opu" (a Process per sub-problem),
+                "exact" (ExactSolver, for small capacities) or a picklable
+                callable mapping a SubProblem to a binary state. Defaults to "opu".
+            method (str): Partition method, "spectral" or "modularity". Defaults to "spectral".
+            max_iterations (int): Maximum number of sweeps. Defaults to 20.
+            tol (float): Minimum energy improvement per sweep. Defaults to 1e-9.
+            processes (Optional[int]): Worker processes. None uses os.cpu_count(),
+                1 runs in the calling process. Defaults to None.
+            backend (str): Backend driver for the "opu" sub-solver. Defaults to "cpu".
+            t (float): Simulation duration in milliseconds for the "opu" sub-solver.
+                Defaults to 1000.0.
+            seed (int): Seed of the random initial state and the partitioner. Defaults to 0.
+        """
+        if method not in PARTITION_METHODS:
+            raise ValueError(f"Unknown partition method: {method}")
+        self.capacity = capacity if capacity is not None else OPU().capacity
+        if sub_solver == "opu":
+            sub_solver = partial(solve_on_opu, backend=backend, t=t)
+        elif sub_solver == "exact":
+            sub_solver = solve_exact
+        elif isinstance(sub_solver, str):
+            raise ValueError(f"Unknown sub-solver: {sub_solver}")
+        self.sub_solver = sub_solver
+        self.method = method
+        self.max_iterations = max_iterations
+        self.tol = tol
+        self.processes = processes
+        self.seed = seed
+
+    def solve(self, problem: Any, initial_state: Optional[np.ndarray] = None) -> DecompositionResult:
+        """
+        Solve a problem of any size.
+
+        Args:
+            problem: The problem instance (must have J, h and offset attributes;
+                higher-order K blocks are honoured).
+            initial_state (Optional[np.ndarray]): Starting state. Defaults to a
+                random state.
+
+        Returns:
+            DecompositionResult: The stitched solution.
+        """
+        # Partition and clamp on real-valued coefficients
+        J, h, K, _ = Kernel.quantize(problem.J, problem.h, "float64", K=getattr(problem, 'K', []), scale=getattr(problem, 'scale', 1.0))
+        offset = float(getattr(problem, 'offset', 0.0))
+        n = h.shape[0]
+
+        graph = interaction_graph(J, K)
+        parts = partition(graph, self.capacity, self.method, self.seed) if n > self.capacity else [np.arange(n)]
+        colors = self._color(graph, parts)
+
+        rng = np.random.default_rng(self.seed)
+        x = rng.integers(0, 2, n).astype(float) if initial_state is None else (np.asarray(initial_state) > 0.5).astype(float)
+        energy = self._energy(J, h, K, offset, x)
+        history = [energy]
+
+        processes = min(self.processes or os.cpu_count() or 1, max(len(c) for c in colors))
+        pool = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+        iteration = 0
+        try:
+            while iteration < self.max_iterations:
+                iteration += 1
+                x, energy = self._sweep(J, h, K, offset, x, energy, parts, colors, pool)
+                if history[-1] - energy <= self.tol and len(parts) > 1 and iteration < self.max_iterations:
+                    # Stalled on the structural parts: retry on windows of the
+                    # variables whose single flips cost least (QBSolv-style)
+                    iteration += 1
+                    windows = self._impact_windows(J, h, K, x)
+                    x, energy = self._sweep(J, h, K, offset, x, energy, windows, self._color(graph, windows), pool)
+                history.append(energy)
+                if history[-2] - energy <= self.tol:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        metrics = problem.evaluate(x) if hasattr(problem, 'evaluate') else {}
+        return DecompositionResult(
+            solution=x,
+            energy=energy,
+            energy_history=np.array(history),
+            parts=parts,
+            iterations=iteration,
+            metrics=metrics
+        )
+
+    def _sweep(
+        self,
+        J: Any,
+        h: np.ndarray,
+        K: List[HyperEdges],
+        offset: float,
+        x: np.ndarray,
+        energy: float,
+        parts: List[np.ndarray],
+        colors: List[List[int]],
+        pool: Optional[ProcessPoolExecutor]
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Solve every part once, color by color, keeping only improvements.
+
+        Returns:
+            Tuple[np.ndarray, float]: The new state and its energy.
+        """
+        for color in colors:
+            subs = [clamp(J, h, x, parts[p], offset, K) for p in color]
+            states = list(pool.map(self.sub_solver, subs)) if pool else [self.sub_solver(sub) for sub in subs]
+            for p, state in zip(color, states):
+                # Accept only improvements, so the energy never rises
+                candidate = x.copy()
+                candidate[parts[p]] = np.asarray(state, dtype=float) > 0.5
+                candidate_energy = self._energy(J, h, K, offset, candidate)
+                if candidate_energy < energy:
+                    x, energy = candidate, candidate_energy
+        return x, energy
+
+    def _impact_windows(self, J: Any, h: np.ndarray, K: List[HyperEdges], x: np.ndarray) -> List[np.ndarray]:
+        """Chunks of capacity variables, ordered by their single-flip energy change."""
+        order = np.argsort(DeltaKernel(J, h, state=x, K=K).deltas(), kind='stable')
+        return [np.sort(order[i:i + self.capacity]) for i in range(0, len(order), self.capacity)]
+
+    @staticmethod
+    def _energy(J: Any, h: np.ndarray, K: List[HyperEdges], offset: float, x: np.ndarray) -> float:
+        """Energy of a single state."""
+        return float(Kernel.compute_energy_batch(J, h, x, offset=offset, K=K, dtype=np.float64)[0])
+
+    @staticmethod
+    def _color(graph: sp.csr_matrix, parts: List[np.ndarray]) -> List[List[int]]:
+        """
+        Group parts that share no coupling, so they can be solved at the same time.
+
+        Returns:
+            List[List[int]]: Part ids per color, largest color first.
+        """
+        label = np.empty(graph.shape[0], dtype=np.int64)
+        for p, part in enumerate(parts):
+            label[part] = p
+        edges = graph.tocoo()
+        a, b = label[edges.row], label[edges.col]
+        quotient = nx.Graph()
+        quotient.add_nodes_from(range(len(parts)))
+        quotient.add_edges_from(zip(a[a != b].tolist(), b[a != b].tolist()))
+        coloring = nx.greedy_color(quotient, strategy='largest_first')
+        colors: Dict[int, List[int]] = {}
+        for p in range(len(parts)):
+            colors.setdefault(coloring[p], []).append(p)
+        return [colors[c] for c in sorted(colors)]
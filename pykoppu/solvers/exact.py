@@ -0,0 +1,234 @@
+"""
+Exact Solver Module.
+
+Brute-force ground-truth solver for small PUBO instances.
+"""
+
+import os
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+from ..opu.kernel import Kernel, DeltaKernel, HyperEdges, LowRankCoupling
+
+@dataclass
+class ExactResult:
+    """
+    Result of an exhaustive search.
+
+    Attributes:
+        energy (float): Ground state energy (including the problem offset).
+        ground_states (np.ndarray): (g, n) binary matrix of ground states found
+            (capped at the solver's max_ground_states).
+        degeneracy (int): Total number of states with the ground energy.
+        spectrum (np.ndarray): The lowest state energies in ascending order,
+            counted with multiplicity.
+        num_variables (int): Number of enumerated variables.
+    """
+    energy: float
+    ground_states: np.ndarray
+    degeneracy: int
+    spectrum: np.ndarray
+    num_variables: int
+
+    @property
+    def solution(self) -> np.ndarray:
+        """First ground state, so the result can be passed to problem.evaluate/plot."""
+        return self.ground_states[0].astype(float)
+
+    def __repr__(self):
+        return f"ExactResult(energy={self.energy}, degeneracy={self.degeneracy}, num_variables={self.num_variables})"
+
+def _low_block(n_low: int) -> np.ndarray:
+    """All 2^n_low binary states of the low block, row r encoding integer r (LSB first)."""
+    codes = np.arange(2 ** n_low, dtype=np.int64)
+    return ((codes[:, None] >> np.arange(n_low)) & 1).astype(float)
+
+def _solve_chunk(
+    J: np.ndarray,
+    h: np.ndarray,
+    K: Sequence[HyperEdges],
+    offset: float,
+    n_low: int,
+    n_mid: int,
+    prefix: int,
+    num_lowest: int,
+    max_ground_states: int,
+    atol: float
+) -> Tuple[float, List[np.ndarray], int, np.ndarray]:
+    """
+    Enumerate one chunk of the state space (fixed prefix bits).
+
+    Variables are split into low | mid | prefix. The low block is scored for
+    all its 2^n_low configurations at once, the mid block is walked in
+    Gray-code order and the prefix is fixed by the chunk id.
+
+    For a purely quadratic Hamiltonian the energy of the whole low block is
+
+    E(x_low) = Q_low(x_low) - x_low . f_low(x_high) + E_high(x_high)
+
+    where only f_low and E_high depend on the high bits. A Gray step flips a
+    single high bit, so both are updated incrementally in O(n).
+    """
+    n = h.shape[0]
+    low = slice(0, n_low)
+    XL = _low_block(n_low)
+
+    # Current high state: Gray walk starts at mid = 0, prefix bits from chunk id
+    x = np.zeros(n)
+    n_prefix = n - n_low - n_mid
+    for b in range(n_prefix):
+        x[n_low + n_mid + b] = (prefix >> b) & 1
+
+    if not K:
+        Jll = J[low, low]
+        q_low = -0.5 * np.einsum('bi,bi->b', XL @ Jll, XL)
+        high_idx = np.arange(n_low, n)
+        f_low = h[low] + J[low][:, high_idx] @ x[high_idx]
+        high = DeltaKernel(J[np.ix_(high_idx, high_idx)], h[high_idx], state=x[high_idx])
+
+    best = np.inf
+    ground: List[np.ndarray] = []
+    degeneracy = 0
+    lowest = np.empty(0)
+
+    for step in range(2 ** n_mid):
+        if step > 0:
+            # Gray code: flip the bit at the position of the lowest set bit of step
+            bit = (step & -step).bit_length() - 1
+            g = n_low + bit
+            if not K:
+                d = 1.0 - 2.0 * x[g]
+                f_low += d * J[low, g]
+                high.flip(g - n_low)
+            x[g] = 1.0 - x[g]
+
+        if not K:
+            energies = q_low - XL @ f_low + high.energy + offset
+        else:
+            X = np.tile(x, (XL.shape[0], 1))
+            X[:, low] = XL
+            energies = Kernel.compute_energy_batch(J, h, X, offset=offset, K=K)
+
+        block_min = energies.min()
+        if block_min < best - atol:
+            best = block_min
+            ground = []
+            degeneracy = 0
+        if block_min <= best + atol:
+            hits = np.flatnonzero(energies <= best + atol)
+            degeneracy += len(hits)
+            for r in hits[:max(0, max_ground_states - len(ground))]:
+                state = x.copy()
+                state[low] = XL[r]
+                ground.append(state.astype(np.int8))
+
+        if num_lowest > 1:
+            if len(lowest) < num_lowest or block_min < lowest[-1]:
+                k = min(num_lowest, len(energies))
+                candidates = np.partition(energies, k - 1)[:k]
+                lowest = np.sort(np.concatenate([lowest, candidates]))[:num_lowest]
+        else:
+            lowest = np.array([best])
+
+    return best, ground, degeneracy, lowest
+
+class ExactSolver:
+    """
+    Exact ground-state solver by exhaustive Gray-code enumeration.
+
+    Intended as a reference for validating OPU runs on instances of up to
+    about 30-34 variables. The state space is split into chunks that are
+    solved in parallel across a process pool.
+    """
+
+    def __init__(
+        self,
+        max_variables: int = 34,
+        processes: Optional[int] = None,
+        low_bits: int = 14,
+        max_ground_states: int = 1024,
+        atol: float = 1e-9
+    ):
+        """
+        Initialize the solver.
+
+        Args:
+            max_variables (int): Refuse problems larger than this. Defaults to 34.
+            processes (Optional[int]): Worker processes. None uses os.cpu_count(),
+                1 runs in the calling process. Defaults to None.
+            low_bits (int): Variables scored as one vectorized block per Gray step.
+                Defaults to 14.
+            max_ground_states (int): Maximum number of ground states returned
+                (the degeneracy is always counted exactly). Defaults to 1024.
+            atol (float): Absolute tolerance for energy ties. Defaults to 1e-9.
+        """
+        self.max_variables = max_variables
+        self.processes = processes
+        self.low_bits = low_bits
+        self.max_ground_states = max_ground_states
+        self.atol = atol
+
+    def solve(self, problem: Any, num_lowest: int = 1) -> ExactResult:
+        """
+        Enumerate all 2^n states of a problem.
+
+        Args:
+            problem: The problem instance (must have J, h and offset attributes;
+                higher-order K blocks are honoured).
+            num_lowest (int): Length of the returned low-energy spectrum. Defaults to 1.
+
+        Returns:
+            ExactResult: Ground state(s), degeneracy and spectrum.
+
+        Raises:
+            ValueError: If the problem exceeds max_variables.
+        """
+        # Refuse oversized problems before anything is converted or densified
+        n = len(problem.h)
+        if n > self.max_variables:
+            raise ValueError(f"Problem has {n} variables; exact enumeration is limited to {self.max_variables}.")
+
+        # Quantized (fixed-point) problems are scored in real units
+        J, h, K, _ = Kernel.quantize(
+            problem.J, problem.h, "float64", K=getattr(problem, 'K', []), scale=getattr(problem, 'scale', 1.0)
+        )
+        if sp.issparse(J) or isinstance(J, LowRankCoupling):
+            J = J.toarray()
+        offset = float(getattr(problem, 'offset', 0.0))
+
+        processes = self.processes or os.cpu_count() or 1
+        n_low = min(n, self.low_bits)
+        # Enough chunks to keep every worker busy, but never more than the high bits allow
+        n_prefix = min(n - n_low, int(np.ceil(np.log2(4 * processes))) if processes > 1 else 0)
+        n_mid = n - n_low - n_prefix
+
+        args = [
+            (J, h, K, offset, n_low, n_mid, prefix, num_lowest, self.max_ground_states, self.atol)
+            for prefix in range(2 ** n_prefix)
+        ]
+
+        if processes > 1 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                chunks = list(pool.map(_solve_chunk, *zip(*args)))
+        else:
+            chunks = [_solve_chunk(*a) for a in args]
+
+        best = min(c[0] for c in chunks)
+        ground: List[np.ndarray] = []
+        degeneracy = 0
+        for energy, states, count, _ in chunks:
+            if energy <= best + self.atol:
+                degeneracy += count
+                ground.extend(states[:self.max_ground_states - len(ground)])
+
+        spectrum = np.sort(np.concatenate([c[3] for c in chunks]))[:num_lowest]
+
+        return ExactResult(
+            energy=float(best),
+            ground_states=np.array(ground),
+            degeneracy=degeneracy,
+            spectrum=spectrum,
+            num_variables=n
+        )
@@ -0,0 +1,248 @@
+"""
+Presolve Module.
+
+Fixes variables whose optimal value is implied by bounds before a problem
+is sent to the OPU, and maps reduced solutions back to the full problem.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+from ..opu.kernel import Kernel, HyperEdges, LowRankCoupling
+from .decomposition import SubProblem, clamp
+
+# Roof duality materializes low-rank couplings only up to this size
+ROOF_DUALITY_MAX_DENSE = 2000
+
+# Largest power-of-two scale tried to make the coefficients integral
+ROOF_DUALITY_MAX_SHIFT = 24
+
+def _coupling_bounds(J: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row sums of the negative and of the positive off-diagonal couplings.
+
+    For a LowRankCoupling the sparse part and every factor column are bounded
+    separately, which is looser but stays O(nnz + n * r).
+    """
+    if isinstance(J, LowRankCoupling):
+        low, high = _coupling_bounds(J.sparse)
+        for u, v in zip(J.U.T.astype(float), J.V.T.astype(float)):
+            # sum_j min(0, u_i v_j) is u_i times the sum of the v_j of opposite sign
+            negative = np.where(u > 0, u * np.minimum(v, 0).sum(), u * np.maximum(v, 0).sum())
+            positive = np.where(u > 0, u * np.maximum(v, 0).sum(), u * np.minimum(v, 0).sum())
+            low += negative - np.minimum(u * v, 0)
+            high += positive - np.maximum(u * v, 0)
+        return low, high
+    if sp.issparse(J):
+        off = sp.csr_matrix(J, dtype=float)
+        off = off - sp.diags(off.diagonal())
+        return np.asarray(off.minimum(0).sum(axis=1)).ravel(), np.asarray(off.maximum(0).sum(axis=1)).ravel()
+    off = np.array(J, dtype=float)
+    np.fill_diagonal(off, 0.0)
+    return np.minimum(off, 0).sum(axis=1), np.maximum(off, 0).sum(axis=1)
+
+def local_bounds(J: Any, h: np.ndarray, K: Optional[Sequence[HyperEdges]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bound the gain of setting each variable to 1 over all other states.
+
+    The gain g_i = E(x_i = 0) - E(x_i = 1) = h_i + 0.5 J_ii + sum_j J_ij x_j
+    + sum_{e containing i} K_e prod_{j in e, j != i} x_j is bounded by
+    summing only its negative (or only its positive) terms.
+
+    Args:
+        J: Coupling matrix (dense, scipy.sparse or LowRankCoupling).
+        h (np.ndarray): Bias vector.
+        K (Optional[Sequence[HyperEdges]]): Higher-order couplings. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (lower, upper) bounds of g.
+    """
+    n = len(h)
+    base = np.asarray(h, dtype=float) + 0.5 * np.asarray(J.diagonal(), dtype=float)
+    low, high = _coupling_bounds(J)
+    low, high = low + base, high + base
+    for block in K or []:
+        weights = np.repeat(block.weights.astype(float), block.arity)
+        low += np.bincount(block.indices.ravel(), weights=np.minimum(weights, 0), minlength=n)
+        high += np.bincount(block.indices.ravel(), weights=np.maximum(weights, 0), minlength=n)
+    return low, high
+
+def roof_duality(J: Any, h: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Strong persistencies of a quadratic Hamiltonian by roof duality.
+
+    E is written as a posiform over literals x_i and 1 - x_i and turned into
+    the implication network of Boros and Hammer (a term a u v becomes the arcs
+    u -> not v and v -> not u, each of capacity a / 2). After a maximum flow
+    from x0 to not x0, every literal reachable from x0 in the residual network
+    of the symmetrized flow equals 1 in all minimizers.
+
+    The max-flow solver needs integer capacities, so the coefficients must be
+    integral at some power-of-two scale (as for integer weights, values and
+    penalties); otherwise nothing is fixed.
+
+    Args:
+        J: Coupling matrix (dense, scipy.sparse or LowRankCoupling).
+        h (np.ndarray): Bias vector.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indices of the fixed variables and their values.
+    """
+    n = len(h)
+    none = (np.zeros(0, dtype=np.int64), np.zeros(0))
+    if n == 0:
+        return none
+    if isinstance(J, LowRankCoupling):
+        if n > ROOF_DUALITY_MAX_DENSE:
+            return none
+        J = J.toarray()
+    S = sp.csr_matrix(J, dtype=float)
+
+    # E = sum_i a_i x_i + sum_{i<j} b_ij x_i x_j (+ constant)
+    a = -np.asarray(h, dtype=float) - 0.5 * S.diagonal()
+    upper = sp.triu(S + S.T, k=1).tocoo()
+    i, j, b = upper.row, upper.col, -0.5 * upper.data
+
+    # Posiform: b x_i x_j = b x_i + |b| x_i (1 - x_j) for b < 0
+    a = a + np.bincount(i[b < 0], weights=b[b < 0], minlength=n)
+    coefficients = np.concatenate([a, b])
+    for shift in range(ROOF_DUALITY_MAX_SHIFT + 1):
+        # Arcs carry half a coefficient: scale so that halves are integral
+        scaled = np.ldexp(coefficients, shift + 1)
+        if np.all(np.abs(scaled - np.rint(scaled)) <= 1e-9 * np.maximum(1.0, np.abs(scaled))):
+            break
+    else:
+        return none
+    a, b = np.rint(scaled[:n]), np.rint(scaled[n:])
+
+    # Nodes: x_i = i, not x_i = n + i, x0 = 2n, not x0 = 2n + 1
+    source, sink = 2 * n, 2 * n + 1
+    negate = np.concatenate([np.arange(n, 2 * n), np.arange(n), [sink, source]])
+    index = np.arange(n)
+    literal = np.where(a >= 0, index, index + n)
+    positive = b > 0
+    second = np.where(positive, j, j + n)
+    tails = np.concatenate([np.full(n, source), literal, i, second])
+    heads = np.concatenate([negate[literal], np.full(n, sink), negate[second], negate[i]])
+    capacities = np.concatenate([np.abs(a), np.abs(a), np.abs(b), np.abs(b)])
+    keep = capacities > 0
+    network = sp.csr_matrix((capacities[keep], (tails[keep], heads[keep])), shape=(2 * n + 2, 2 * n + 2))
+    network.sum_duplicates()
+    if network.nnz == 0 or network.data.max() >= np.iinfo(np.int32).max or network.sum() >= np.iinfo(np.int32).max:
+        return none
+    network.data = network.data.astype(np.int32)
+
+    result = csgraph.maximum_flow(network, source, sink)
+    flow = result.flow if hasattr(result, 'flow') else result.residual
+    flow = sp.csr_matrix(flow, dtype=float)
+    # Symmetrize: the flow on u -> v equals the flow on not v -> not u
+    symmetric = 0.5 * (flow + flow[negate][:, negate].T)
+    residual = sp.csr_matrix(network, dtype=float) - symmetric
+    residual.data = (residual.data > 0.25).astype(float)
+    residual.eliminate_zeros()
+    reached = csgraph.breadth_first_order(residual, source, directed=True, return_predecessors=False)
+
+    reached = reached[reached < 2 * n]
+    ones, zeros = reached[reached < n], reached[reached >= n] - n
+    consistent = ~np.isin(ones, zeros)
+    ones, zeros = ones[consistent], zeros[~np.isin(zeros, ones)]
+    return np.concatenate([ones, zeros]), np.concatenate([np.ones(len(ones)), np.zeros(len(zeros))])
+
+@dataclass
+class Presolved:
+    """
+    A problem with its persistent variables fixed.
+
+    Attributes:
+        problem (Any): The original problem.
+        reduced (SubProblem): Hamiltonian over the free variables; its energies
+            equal those of the original problem with the fixed values.
+        free (np.ndarray): Indices of the free variables in the original problem.
+        fixed (np.ndarray): Indices of the fixed variables.
+        values (np.ndarray): Values of the fixed variables.
+        rounds (int): Number of presolve rounds performed.
+    """
+    problem: Any
+    reduced: SubProblem
+    free: np.ndarray
+    fixed: np.ndarray
+    values: np.ndarray
+    rounds: int
+
+    @property
+    def pobits_saved(self) -> int:
+        """Number of variables that no longer need a pobit."""
+        return len(self.fixed)
+
+    def expand(self, solution: np.ndarray) -> np.ndarray:
+        """
+        Map reduced solutions back to the full variable space.
+
+        Args:
+            solution (np.ndarray): (n_free,) state or (B, n_free) batch.
+
+        Returns:
+            np.ndarray: (n,) state or (B, n) batch.
+        """
+        solution = np.asarray(solution, dtype=float)
+        full = np.empty(solution.shape[:-1] + (len(self.free) + len(self.fixed),))
+        full[..., self.free] = solution
+        full[..., self.fixed] = self.values
+        return full
+
+    def __repr__(self):
+        return f"Presolved(free={len(self.free)}, pobits_saved={self.pobits_saved}, rounds={self.rounds})"
+
+def presolve(problem: Any, roof: bool = True, max_rounds: int = 100) -> Presolved:
+    """
+    Fix variables whose optimal value follows from bounds.
+
+    Each round fixes x_i = 1 where the gain of setting it is never negative
+    and x_i = 0 where it is never positive (see local_bounds); at least one
+    minimizer keeps every fix. When no bound applies, roof duality is tried on
+    quadratic Hamiltonians. Fixed variables are clamped into the remaining
+    ones, which tightens the bounds for the next round.
+
+    Args:
+        problem: The problem instance (must have J, h and offset attributes;
+            higher-order K blocks are honoured).
+        roof (bool): Also fix strong persistencies by roof duality. Defaults to True.
+        max_rounds (int): Maximum number of rounds. Defaults to 100.
+
+    Returns:
+        Presolved: The reduced problem and the fixed assignment.
+    """
+    J, h, K, _ = Kernel.quantize(problem.J, problem.h, "float64", K=getattr(problem, 'K', []), scale=getattr(problem, 'scale', 1.0))
+    offset = float(getattr(problem, 'offset', 0.0))
+    n = h.shape[0]
+
+    state = np.zeros(n)
+    free = np.arange(n)
+    reduced = SubProblem(J, h, offset, K, variables=free)
+    rounds = 0
+    while rounds < max_rounds and len(free) > 0:
+        rounds += 1
+        low, high = local_bounds(reduced.J, reduced.h, reduced.K)
+        zeros = high <= 0
+        ones = (low >= 0) & ~zeros
+        index = np.flatnonzero(ones | zeros)
+        values = ones[index].astype(float)
+        if len(index) == 0 and roof and not reduced.K:
+            index, values = roof_duality(reduced.J, reduced.h)
+        if len(index) == 0:
+            break
+        state[free[index]] = values
+        free = np.delete(free, index)
+        reduced = clamp(J, h, state, free, offset, K)
+
+    fixed = np.setdiff1d(np.arange(n), free)
+    return Presolved(
+        problem=problem,
+        reduced=reduced,
+        free=free,
+        fixed=fixed,
+        values=state[fixed],
+        rounds=rounds
+    )
@@ -0,0 +1,115 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.biocompiler import (
+    BioCompiler, Embedder, OpCode, Instruction,
+    dumps_program, loads_program, save_program, load_program
+)
+from pykoppu.biocompiler.binary import ALIGNMENT
+from pykoppu.electrophysiology import connect
+from pykoppu.opu import OPU
+from pykoppu.problems import MaxCut, SAT3, SeismicFeatureSelection, Knapsack
+
+
+def _seismic(n=12, seed=0):
+    rng = np.random.default_rng(seed)
+    C = rng.random((n, n))
+    return SeismicFeatureSelection(rng.random(n), (C + C.T) / 2, k=3, low_rank=True)
+
+
+PROBLEMS = [
+    lambda: MaxCut(nx.gnp_random_graph(10, 0.4, seed=1)),
+    lambda: _seismic(),
+    lambda: SAT3([(1, -2, 3), (-1, 2, 4), (2, 3, -4)], n_vars=4, encoding="cubic"),
+]
+
+
+def _assert_same(first, second):
+    assert [i.opcode for i in first] == [i.opcode for i in second]
+    for a, b in zip(first, second):
+        assert len(a.operands) == len(b.operands)
+        for x, y in zip(a.operands, b.operands):
+            if isinstance(x, np.ndarray):
+                assert x.dtype == y.dtype and np.array_equal(x, y)
+            else:
+                assert x == y
+
+
+def test_operands_are_read_only_views():
+    problem = MaxCut(nx.cycle_graph(5))
+    J = np.asarray(problem.J)
+    program = BioCompiler().compile(problem)
+    load = next(i for i in program if i.opcode == OpCode.LDJ)
+    assert isinstance(load.operands[0], np.ndarray)
+    assert np.shares_memory(load.operands[0], J)
+    assert not load.operands[0].flags.writeable
+
+
+def test_problem_mutation_leaves_compiled_program_unchanged():
+    items = [{'name': f"item{i}", 'value': float(i + 1), 'weight': float(i % 3 + 1)} for i in range(6)]
+    problem = Knapsack(items, capacity=6, penalty=2.0, low_rank=False)
+    program = BioCompiler().compile(problem)
+    load_h = next(i for i in program if i.opcode == OpCode.LDH).operands[0]
+    load_J = next(i for i in program if i.opcode == OpCode.LDJ).operands[0]
+    h, J = load_h.copy(), load_J.copy()
+
+    patch = problem.update_values([100.0], indices=[0])
+    problem.add_item({'name': 'new', 'value': 3.0, 'weight': 1.0})
+    assert np.array_equal(load_h, h) and np.array_equal(load_J, J)
+
+    # A driver holding the compiled h reaches the new bias by applying the patch once
+    assert np.allclose(patch.apply(load_J, load_h)[1][:6], problem.h[:6])
+
+
+@pytest.mark.parametrize("make", PROBLEMS)
+@pytest.mark.parametrize("precision", [None, "int16"])
+def test_binary_round_trip(make, precision):
+    program = BioCompiler(precision=precision, embedder=Embedder(OPU(capacity=16))).compile(make())
+    _assert_same(program, loads_program(dumps_program(program)))
+
+
+def test_file_is_memory_mapped_and_aligned(tmp_path):
+    program = BioCompiler().compile(_seismic())
+    path = tmp_path / "program.bioasm"
+    save_program(path, program)
+    loaded = load_program(path)
+    _assert_same(program, loaded)
+
+    arrays = [op for instr in loaded for op in instr.operands if isinstance(op, np.ndarray)]
+    assert arrays
+    for array in arrays:
+        base = array
+        while not isinstance(base, np.memmap) and base.base is not None:
+            base = base.base
+        assert isinstance(base, np.memmap)
+        assert array.__array_interface__['data'][0] % ALIGNMENT == 0 or array.size == 0
+        assert not array.flags.writeable
+
+
+def test_list_operands_and_bad_buffers():
+    program = [Instruction(OpCode.ALC, [3]), Instruction(OpCode.LDH, [[1.0, 2.0, 3.0]]), Instruction(OpCode.PRC, ["int16", 0.5])]
+    loaded = loads_program(dumps_program(program))
+    assert np.array_equal(loaded[1].operands[0], [1.0, 2.0, 3.0])
+    assert loaded[2].operands == ["int16", 0.5]
+    with pytest.raises(ValueError):
+        loads_program(b"not a program")
+
+
+def test_driver_runs_loaded_program(tmp_path):
+    problem = MaxCut(nx.cycle_graph(6))
+    path = tmp_path / "program.bioasm"
+    save_program(path, BioCompiler().compile(problem, duration=20.0))
+
+    driver = connect("cpu")
+    try:
+        state, energy, spikes = driver.execute(load_program(path))
+    finally:
+        driver.disconnect()
+    assert state.shape == (6,)
@@ -0,0 +1,105 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import BuildCache, set_cache, MaxCut, Knapsack, SAT3, Factorization
+from pykoppu.problems.logistics import TSP
+from pykoppu.problems.cache import stable_hash
+from pykoppu.biocompiler import BioCompiler
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    set_cache(cache)
+    yield cache
+    set_cache(None)
+
+
+def _coupling(J):
+    return J.toarray() if hasattr(J, 'toarray') else np.asarray(J)
+
+
+def test_stable_hash_depends_on_contents_only():
+    a = nx.gnp_random_graph(20, 0.3, seed=0)
+    b = nx.gnp_random_graph(20, 0.3, seed=0)
+    assert stable_hash(a, np.arange(3), {"k": [1, 2.0]}) == stable_hash(b, np.arange(3), {"k": [1, 2.0]})
+    assert stable_hash(np.arange(3)) != stable_hash(np.arange(3.0))
+    with pytest.raises(TypeError):
+        stable_hash(lambda x: x)
+
+
+@pytest.mark.parametrize("make", [
+    lambda: MaxCut(nx.gnp_random_graph(40, 0.2, seed=3), sparse=True),
+    lambda: Knapsack([{'name': str(i), 'value': i + 1.0, 'weight': 2.0 + i % 3} for i in range(300)], 50, 2.0),
+    lambda: SAT3([(1, -2, 3), (-1, 2, 4), (2, 3, -4)], n_vars=4),
+    lambda: Factorization(143, encoding="carry"),
+    lambda: TSP(np.arange(16.0).reshape(4, 4)),
+])
+def test_cached_build_matches_fresh_build(cache, make):
+    fresh = make()
+    assert cache.size() == 0
+    fresh.build()
+    assert cache.size() > 0
+    cached = make()
+
+    assert np.allclose(_coupling(cached.J), _coupling(fresh.J))
+    assert np.allclose(cached.h, fresh.h)
+    assert cached.offset == fresh.offset
+    assert len(cached.K) == len(fresh.K)
+    for a, b in zip(cached.K, fresh.K):
+        assert np.array_equal(a.indices, b.indices) and np.allclose(a.weights, b.weights)
+    assert isinstance(cached.J, type(fresh.J))
+    assert isinstance(cached.h, np.memmap)
+
+    # Data derived while building comes back too
+    states = np.random.default_rng(0).integers(0, 2, size=(8, len(fresh.h)))
+    batch_fresh, batch_cached = fresh.evaluate_batch(states), cached.evaluate_batch(states)
+    for key in batch_fresh:
+        assert np.array_equal(batch_fresh[key], batch_cached[key])
+
+
+def test_inputs_change_the_key(cache):
+    graph = nx.cycle_graph(6)
+    assert MaxCut(graph).cache_key() == MaxCut(nx.cycle_graph(6)).cache_key()
+    assert MaxCut(graph).cache_key() != MaxCut(nx.path_graph(6)).cache_key()
+    items = [{'name': 'a', 'value': 1.0, 'weight': 1.0}]
+    assert Knapsack(items, 1, 2.0).cache_key() != Knapsack(items, 1, 3.0).cache_key()
+
+
+def test_compiled_program_is_cached(cache):
+    problem = MaxCut(nx.gnp_random_graph(12, 0.5, seed=1))
+    compiler = BioCompiler()
+    first = compiler.compile(problem, duration=300.0)
+    second = compiler.compile(problem, duration=300.0)
+
+    assert [i.opcode for i in first] == [i.opcode for i in second]
+    for a, b in zip(first, second):
+        for x, y in zip(a.operands, b.operands):
+            assert np.array_equal(np.asarray(x), np.asarray(y))
+    # Operands are read-only whether or not the cache was hit
+    for program in (first, second):
+        for instr in program:
+            for operand in instr.operands:
+                if isinstance(operand, np.ndarray):
+                    assert not operand.flags.writeable
+    assert not MaxCut(nx.gnp_random_graph(12, 0.5, seed=1)).h.flags.writeable
+    # A different duration is a different program
+    assert compiler.compile(problem, duration=600.0)[-2].operands[0] != second[-2].operands[0]
+
+
+def test_lru_eviction_bounds_size(tmp_path):
+    cache = BuildCache(tmp_path / "small", max_bytes=200_000)
+    for seed in range(6):
+        cache.store_hamiltonian(f"k{seed}", {"J": np.full((100, 100), float(seed)), "h": np.zeros(100)})
+        if seed > 0:
+            assert cache.load_hamiltonian("k0") is not None
+    assert cache.size() <= 200_000
+    # k0 was used most recently, so it survived
+    assert cache.load_hamiltonian("k0") is not None
+    assert cache.load_hamiltonian("k1") is None
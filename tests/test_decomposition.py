@@ -0,0 +1,80 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import MaxCut, Knapsack, Factorization, SeismicFeatureSelection
+from pykoppu.solvers import DecompositionSolver, ExactSolver, partition, clamp
+from pykoppu.solvers.decomposition import interaction_graph
+from pykoppu.opu.kernel import Kernel
+
+
+def _energy(problem, states):
+    return Kernel.compute_energy_batch(problem.J, problem.h, states, offset=problem.offset, K=problem.K, dtype=np.float64)
+
+
+@pytest.mark.parametrize("method", ["spectral", "modularity"])
+def test_partition_covers_variables_within_capacity(method):
+    graph = interaction_graph(MaxCut(nx.connected_caveman_graph(6, 10)).J)
+    parts = partition(graph, 16, method)
+    assert all(len(part) <= 16 for part in parts)
+    assert np.array_equal(np.sort(np.concatenate(parts)), np.arange(60))
+    # Cliques are never split: only the 6 ring edges cross parts
+    label = np.empty(60, dtype=int)
+    for p, part in enumerate(parts):
+        label[part] = p
+    rows, cols = graph.nonzero()
+    assert np.sum(label[rows] != label[cols]) == 2 * 6
+
+
+@pytest.mark.parametrize("make", [
+    lambda: MaxCut(nx.gnp_random_graph(30, 0.2, seed=0), sparse=True),
+    lambda: Knapsack([{'name': str(i), 'value': i + 1.0, 'weight': 1.0 + i % 4} for i in range(30)], 20, 2.0, low_rank=True),
+    lambda: Factorization(143, encoding="carry"),
+])
+def test_clamped_energy_equals_full_energy(make):
+    problem = make()
+    n = len(problem.h)
+    rng = np.random.default_rng(0)
+    state = rng.integers(0, 2, n).astype(float)
+    part = np.sort(rng.choice(n, 8, replace=False))
+    sub = clamp(problem.J, problem.h, state, part, problem.offset, problem.K)
+
+    local = rng.integers(0, 2, (16, 8)).astype(float)
+    full = np.tile(state, (16, 1))
+    full[:, part] = local
+    assert np.allclose(_energy(sub, local), _energy(problem, full))
+
+
+def test_decomposed_solve_matches_exact_ground_state():
+    rng = np.random.default_rng(0)
+    corr = np.abs(rng.normal(size=(22, 22)))
+    problem = SeismicFeatureSelection(rng.uniform(size=22), 0.15 * (corr + corr.T), k=5)
+    ground = ExactSolver(processes=1).solve(problem)
+    result = DecompositionSolver(capacity=8, sub_solver="exact", processes=1).solve(problem)
+
+    assert all(len(part) <= 8 for part in result.parts)
+    assert np.all(np.diff(result.energy_history) <= 0)
+    assert np.isclose(result.energy, ground.energy)
+    assert result.metrics['selected_count'] == 5
+
+
+def test_parallel_sweeps_match_serial():
+    problem = MaxCut(nx.gnp_random_graph(40, 0.1, seed=4))
+    serial = DecompositionSolver(capacity=10, sub_solver="exact", processes=1).solve(problem)
+    parallel = DecompositionSolver(capacity=10, sub_solver="exact", processes=2).solve(problem)
+    assert np.array_equal(serial.solution, parallel.solution)
+    assert serial.energy == parallel.energy
+
+
+def test_small_problem_is_a_single_part():
+    problem = MaxCut(nx.cycle_graph(6))
+    result = DecompositionSolver(capacity=10, sub_solver="exact", processes=1).solve(problem)
+    assert len(result.parts) == 1
+    assert np.isclose(result.energy, ExactSolver(processes=1).solve(problem).energy)
+    with pytest.raises(ValueError):
+        DecompositionSolver(sub_solver="anneal")
@@ -0,0 +1,84 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.opu import OPU, MEALayout
+from pykoppu.biocompiler import BioCompiler, Embedder, OpCode
+from pykoppu.problems import BuildCache, MaxCut
+from pykoppu.solvers import SubProblem
+from pykoppu.oos.process import Process
+
+
+def _shuffled(graph, seed=0, weights=None):
+    n = graph.number_of_nodes()
+    perm = np.random.default_rng(seed).permutation(n)
+    A = sp.csr_matrix(nx.to_scipy_sparse_array(graph, nodelist=range(n), format='csr'), dtype=float)
+    if weights is not None:
+        A = A.multiply(weights).tocsr()
+    A = A[perm][:, perm]
+    return SubProblem(A, np.zeros(n), 0.0)
+
+
+def test_feedback_latency_grows_with_distance():
+    opu = OPU(capacity=16, layout=MEALayout(columns=4))
+    L = opu.feedback_latency()
+    assert L.shape == (16, 16)
+    assert np.allclose(L, L.T)
+    assert np.allclose(np.diag(L), opu.layout.delay)
+    # Neighbour < diagonal neighbour < opposite corner
+    assert L[0, 1] < L[0, 5] < L[0, 15]
+
+
+@pytest.mark.parametrize("graph", [
+    nx.convert_node_labels_to_integers(nx.grid_2d_graph(8, 8)),
+    nx.path_graph(100),
+])
+def test_placement_reduces_latency(graph):
+    embedding = Embedder(OPU(capacity=100), cache=None).embed(_shuffled(graph))
+    assert embedding.latency < 0.6 * embedding.baseline_latency
+    assert len(np.unique(embedding.channels)) == graph.number_of_nodes()
+    assert embedding.channels.min() >= 0 and embedding.channels.max() < 100
+    assert [pobit.index for pobit in embedding.pobits()] == embedding.channels.tolist()
+
+
+def test_same_structure_reuses_placement(tmp_path, monkeypatch):
+    graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(5, 5))
+    cache = BuildCache(tmp_path / "cache")
+    embedder = Embedder(OPU(capacity=25), cache=cache)
+    first = embedder.embed(_shuffled(graph))
+
+    def fail(graph):
+        raise AssertionError("placement rerun")
+
+    # New weights, same structure: in-memory hit
+    monkeypatch.setattr(embedder, "place", fail)
+    second = embedder.embed(_shuffled(graph, weights=3.0))
+    assert np.array_equal(first.channels, second.channels)
+
+    # Fresh embedder: disk hit
+    fresh = Embedder(OPU(capacity=25), cache=cache)
+    monkeypatch.setattr(fresh, "place", fail)
+    assert np.array_equal(fresh.embed(_shuffled(graph)).channels, first.channels)
+
+
+def test_too_many_variables_raises():
+    with pytest.raises(ValueError):
+        Embedder(OPU(capacity=10)).embed(_shuffled(nx.path_graph(11)))
+
+
+def test_compiler_emits_map_and_process_reports_embedding():
+    problem = MaxCut(nx.cycle_graph(6))
+    compiler = BioCompiler(embedder=Embedder(OPU(capacity=9)))
+    program = compiler.compile(problem, duration=20.0)
+    assert [instr.opcode for instr in program][:2] == [OpCode.ALC, OpCode.MAP]
+    assert sorted(program[1].operands[0]) == sorted(set(program[1].operands[0]))
+
+    result = Process(problem, backend="cpu", t=20.0, embed=True).run()
+    assert result.solution.shape == (6,)
+    assert result.metadata["embedding"].latency <= result.metadata["embedding"].baseline_latency
@@ -0,0 +1,79 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import WellPlacement, SeismicFeatureSelection, MaxCut, Knapsack, Factorization, SAT3, PortfolioOptimization
+from pykoppu.oos.process import Process
+
+
+def _problems():
+    rng = np.random.default_rng(0)
+    items = [{'name': f"item{i}", 'value': float(v), 'weight': float(w)}
+             for i, (v, w) in enumerate(zip(rng.integers(1, 10, 12), rng.integers(1, 6, 12)))]
+    locations = [{'id': i, 'x': float(x), 'y': float(y), 'value': float(v), 'cost': float(c)}
+                 for i, (x, y, v, c) in enumerate(zip(rng.uniform(0, 10, 15), rng.uniform(0, 10, 15),
+                                                      rng.uniform(1, 5, 15), rng.uniform(1, 3, 15)))]
+    corr = np.abs(rng.normal(size=(10, 10)))
+    clauses = [tuple(int(v) for v in rng.choice(np.arange(1, 7), 3, replace=False) * rng.choice([-1, 1], 3))
+               for _ in range(8)]
+    return [
+        Knapsack(items, capacity=15, penalty=2.0),
+        Knapsack(items, capacity=15, penalty=2.0, constraint="inequality"),
+        MaxCut(nx.gnp_random_graph(12, 0.4, seed=1)),
+        Factorization(35),
+        Factorization(143, encoding="carry"),
+        WellPlacement(locations, budget=10.0, min_dist=2.5),
+        SeismicFeatureSelection(rng.uniform(size=10), (corr + corr.T) / 2, k=3),
+        SAT3(clauses, n_vars=6),
+        SAT3(clauses, n_vars=6, encoding="cubic"),
+    ]
+
+
+@pytest.mark.parametrize("problem", _problems(), ids=lambda p: type(p).__name__)
+def test_evaluate_batch_matches_evaluate(problem):
+    rng = np.random.default_rng(1)
+    states = rng.uniform(size=(40, len(problem.h)))
+    batch = problem.evaluate_batch(states)
+
+    for key in ("valid", "objective", "violation"):
+        assert len(batch[key]) == len(states)
+    assert np.array_equal(batch["valid"], batch["violation"] == 0)
+
+    for b, state in enumerate(states):
+        single = problem.evaluate(state)
+        for key, values in batch.items():
+            if key in single:
+                assert np.allclose(np.asarray(values[b], dtype=float), np.asarray(single[key], dtype=float)), key
+
+
+def test_base_evaluate_batch_stacks_evaluate():
+    # PortfolioOptimization has no evaluate, so the fallback returns no metrics
+    problem = PortfolioOptimization([0.1, 0.2], np.eye(2))
+    assert problem.evaluate_batch(np.ones((3, 2))) == {}
+
+    # SAT3 reports a per-state assignment vector
+    problem = SAT3([(1, 2, -3)], n_vars=3, encoding="cubic")
+    columns = super(SAT3, problem).evaluate_batch(np.eye(3))
+    assert columns["valid"].dtype == bool
+    assert columns["assignment"].shape == (3, 3)
+
+
+def test_process_picks_best_sample():
+    problem = Knapsack([{'name': 'a', 'value': 5.0, 'weight': 2.0},
+                        {'name': 'b', 'value': 4.0, 'weight': 3.0},
+                        {'name': 'c', 'value': 1.0, 'weight': 4.0}], capacity=5, penalty=2.0)
+    samples = np.array([[1.0, 1.0, 1.0], [0.0, 0.0, 1.0], [1.0, 1.0, 0.0]])
+
+    process = Process(problem)
+    best, metrics = process._best_sample(samples)
+    process.driver.disconnect()
+
+    assert np.array_equal(best, samples[2])
+    assert metrics["total_value"] == 9.0
+    assert metrics["valid_rate"] == pytest.approx(2 / 3)
+    assert np.array_equal(metrics["samples"]["valid"], [False, True, True])
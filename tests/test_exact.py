@@ -0,0 +1,74 @@
+import sys
+import os
+import itertools
+import pytest
+import numpy as np
+import networkx as nx
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import MaxCut, Factorization, Knapsack
+from pykoppu.opu.kernel import Kernel, DeltaKernel, HyperEdges
+from pykoppu.solvers import ExactSolver
+
+
+def _brute_force(problem):
+    n = problem.h.shape[0]
+    states = np.array(list(itertools.product([0, 1], repeat=n)), dtype=float)
+    return Kernel.compute_energy_batch(problem.J, problem.h, states, offset=problem.offset, K=problem.K)
+
+
+def test_exact_maxcut_matches_brute_force():
+    problem = MaxCut(nx.gnp_random_graph(11, 0.4, seed=3))
+    energies = _brute_force(problem)
+    
+    # low_bits < n forces the Gray-code walk over the high bits
+    for processes in (1, 2):
+        result = ExactSolver(processes=processes, low_bits=4).solve(problem, num_lowest=5)
+        assert np.isclose(result.energy, energies.min())
+        assert result.degeneracy == np.sum(np.isclose(energies, energies.min()))
+        assert np.allclose(result.spectrum, np.sort(energies)[:5])
+        for state in result.ground_states:
+            assert np.isclose(Kernel.compute_energy(problem.J, problem.h, state), result.energy)
+
+
+def test_exact_factorization_ground_state():
+    problem = Factorization(15, p_bits=2, q_bits=3)
+    result = ExactSolver(processes=1, low_bits=6).solve(problem)
+    
+    assert np.isclose(result.energy, 0.0)
+    assert problem.evaluate(result.solution)['valid']
+
+
+def test_exact_higher_order():
+    problem = MaxCut(nx.path_graph(6))
+    problem.K = [HyperEdges([[0, 2, 4], [1, 3, 5]], [2.0, -1.0])]
+    energies = _brute_force(problem)
+    
+    result = ExactSolver(processes=1, low_bits=3).solve(problem, num_lowest=3)
+    assert np.isclose(result.energy, energies.min())
+    assert np.allclose(result.spectrum, np.sort(energies)[:3])
+
+
+def test_exact_quantized_problem_reports_real_energies():
+    rng = np.random.default_rng(4)
+    items = [{'name': f"item{i}", 'value': float(v), 'weight': float(w)}
+             for i, (v, w) in enumerate(zip(rng.integers(1, 10, 10), rng.integers(1, 6, 10)))]
+    reference = ExactSolver(processes=1).solve(Knapsack(items, capacity=12, penalty=2.0))
+    problem = Knapsack(items, capacity=12, penalty=2.0)
+    problem.set_precision("int16")
+    result = ExactSolver(processes=1).solve(problem)
+    assert np.isclose(result.energy, reference.energy, rtol=1e-3, atol=1e-2)
+
+    # DeltaKernel dequantizes the same way
+    x = reference.ground_states[0]
+    engine = DeltaKernel(problem.J, problem.h, state=x, offset=problem.offset, K=problem.K, scale=problem.scale)
+    assert np.isclose(engine.energy, reference.energy, rtol=1e-3, atol=1e-2)
+
+
+def test_exact_refuses_large_sparse_problem_without_densifying():
+    # A dense copy of this coupling would need 80 GB
+    problem = MaxCut(nx.cycle_graph(100_000), sparse=True)
+    with pytest.raises(ValueError, match="limited"):
+        ExactSolver(processes=1).solve(problem)
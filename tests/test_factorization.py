@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from pykoppu.problems.math.factorization import Factorization
 from pykoppu.oos.process import Process
+from pykoppu.solvers import ExactSolver
 import numpy as np
 
 def test_factorization():
@@ -85,5 +86,19 @@ def test_factorization():
     else:
         print("FAILURE: Invalid solution has zero energy.")
 
+def test_factorization_carry_encoding():
+    problem = Factorization(target=143, p_bits=4, q_bits=4, encoding="carry")
+    product = Factorization(target=143, p_bits=4, q_bits=4)
+    
+    # No z variables: only p, q and carry bits, with bounded coefficients
+    assert len(problem.h) == 8 + problem.n_carry
+    assert len(problem.h) < len(product.h)
+    assert max(np.abs(block.weights).max() for block in problem.K) < 10
+    
+    result = ExactSolver(processes=1).solve(problem)
+    assert abs(result.energy) < 1e-9
+    factors = {(r['p'], r['q']) for r in (problem.evaluate(s.astype(float)) for s in result.ground_states)}
+    assert factors == {(11, 13), (13, 11)}
+
 if __name__ == "__main__":
     test_factorization()
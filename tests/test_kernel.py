@@ -0,0 +1,111 @@
+import sys
+import os
+import numpy as np
+import scipy.sparse as sp
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.opu.kernel import Kernel, DeltaKernel, HyperEdges
+
+
+def _random_hamiltonian(n, seed=0):
+    rng = np.random.default_rng(seed)
+    J = rng.normal(size=(n, n))
+    J = J + J.T
+    h = rng.normal(size=n)
+    return J, h
+
+
+def test_compute_energy_batch_matches_single():
+    J, h = _random_hamiltonian(12)
+    rng = np.random.default_rng(1)
+    states = rng.integers(0, 2, size=(50, 12))
+    
+    expected = np.array([Kernel.compute_energy(J, h, s) for s in states]) + 3.5
+    
+    # Small chunk size forces several GEMM passes
+    energies = Kernel.compute_energy_batch(J, h, states, offset=3.5, chunk_size=7)
+    assert energies.shape == (50,)
+    assert np.allclose(energies, expected)
+    
+    energies32 = Kernel.compute_energy_batch(J, h, states, offset=3.5, dtype=np.float32)
+    assert energies32.dtype == np.float32
+    assert np.allclose(energies32, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_delta_kernel_tracks_energy():
+    J, h = _random_hamiltonian(10, seed=2)
+    J_sparse = sp.csr_matrix(np.where(np.abs(J) > 1.0, J, 0.0))
+    rng = np.random.default_rng(3)
+    
+    for coupling in (J, J_sparse):
+        dense = coupling.toarray() if sp.issparse(coupling) else coupling
+        x = rng.integers(0, 2, size=10).astype(float)
+        engine = DeltaKernel(coupling, h, state=x, offset=1.0)
+        assert np.isclose(engine.energy, Kernel.compute_energy(dense, h, x) + 1.0)
+        
+        for i in rng.integers(0, 10, size=25):
+            flipped = engine.state.copy()
+            flipped[i] = 1 - flipped[i]
+            expected = Kernel.compute_energy(dense, h, flipped) - Kernel.compute_energy(dense, h, engine.state)
+            assert np.isclose(engine.deltas()[i], expected)
+            assert np.isclose(engine.flip(i), expected)
+            
+        assert np.isclose(engine.energy, Kernel.compute_energy(dense, h, engine.state) + 1.0)
+
+
+def test_hyperedges_energy_and_field():
+    J, h = _random_hamiltonian(8, seed=4)
+    rng = np.random.default_rng(5)
+    cubic = HyperEdges(np.array([[0, 1, 2], [2, 5, 7], [1, 3, 6], [2, 1, 0]]), rng.normal(size=4))
+    quartic = HyperEdges(np.array([[0, 2, 4, 6]]), np.array([1.5]))
+    K = [cubic.canonical(), quartic]
+    assert len(K[0].weights) == 3  # (0,1,2) and (2,1,0) merged
+    
+    states = rng.integers(0, 2, size=(30, 8)).astype(float)
+    
+    def brute(x):
+        higher = sum(w * np.prod(x[e]) for block in K for e, w in zip(block.indices, block.weights))
+        return -0.5 * x @ J @ x - h @ x - higher
+        
+    expected = np.array([brute(x) for x in states])
+    assert np.allclose([Kernel.compute_energy(J, h, x, K) for x in states], expected)
+    assert np.allclose(Kernel.compute_energy_batch(J, h, states, K=K, chunk_size=8), expected)
+    
+    # Multilinear local field: f_i = E(x_i = 0) - E(x_i = 1) for zero-diagonal J
+    np.fill_diagonal(J, 0.0)
+    x = states[0]
+    field = Kernel.local_field(J, h, x, K)
+    for i in range(8):
+        lo, hi = x.copy(), x.copy()
+        lo[i], hi[i] = 0, 1
+        assert np.isclose(field[i], brute(lo) - brute(hi))
+        
+    engine = DeltaKernel(J, h, state=x, K=K)
+    for i in rng.integers(0, 8, size=20):
+        previous = engine.state.copy()
+        assert np.isclose(engine.flip(i), brute(engine.state) - brute(previous))
+        assert np.allclose(engine.field, Kernel.local_field(J, h, engine.state, K))
+    assert np.isclose(engine.energy, brute(engine.state))
+
+
+def test_quantize_precisions():
+    J, h = _random_hamiltonian(16, seed=6)
+    states = np.random.default_rng(7).integers(0, 2, size=(40, 16))
+    reference = Kernel.compute_energy_batch(J, h, states)
+    
+    J32, h32, _, scale32 = Kernel.quantize(J, h, "float32")
+    assert J32.dtype == np.float32 and scale32 == 1.0
+    
+    J16, h16, _, scale16 = Kernel.quantize(sp.csr_matrix(J), h, "int16")
+    assert J16.dtype == np.int16 and h16.dtype == np.int16
+    assert np.abs(J16.toarray()).max() <= 32767
+    
+    energies16 = Kernel.compute_energy_batch(J16, h16, states, scale=scale16)
+    assert np.allclose(energies16, reference, atol=1e-2 * np.abs(reference).max())
+    
+    # Converting back to float64 recovers the (rounded) real-valued coefficients
+    J64, _, _, scale64 = Kernel.quantize(J16, h16, "float64", scale=scale16)
+    assert scale64 == 1.0
+    assert np.allclose(J64.toarray(), J, atol=1.0 / scale16)
@@ -0,0 +1,91 @@
+import sys
+import os
+import itertools
+import warnings
+import pytest
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems.logistics import Knapsack
+from pykoppu.solvers import ExactSolver
+
+
+def _items(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'name': f"item{i}", 'value': float(v), 'weight': float(w)}
+            for i, (v, w) in enumerate(zip(rng.integers(1, 10, n), rng.integers(1, 6, n)))]
+
+
+def test_slack_coefficients_cover_capacity():
+    for capacity in [1, 2, 5, 8, 13, 100]:
+        coeffs = Knapsack._slack_coefficients(capacity)
+        assert len(coeffs) == int(np.ceil(np.log2(capacity + 1)))
+        sums = {int(np.dot(bits, coeffs)) for bits in itertools.product([0, 1], repeat=len(coeffs))}
+        assert sums == set(range(capacity + 1))
+
+
+def test_inequality_ground_state_is_optimal_packing():
+    items = _items(8)
+    problem = Knapsack(items, capacity=10, penalty=20.0, constraint="inequality")
+    assert len(problem.h) == 8 + len(problem.slack_coeffs)
+    
+    best = max(
+        sum(item['value'] for item, b in zip(items, bits) if b)
+        for bits in itertools.product([0, 1], repeat=8)
+        if sum(item['weight'] for item, b in zip(items, bits) if b) <= 10
+    )
+    result = ExactSolver(processes=1).solve(problem)
+    metrics = problem.evaluate(result.solution)
+    assert metrics['valid']
+    assert metrics['total_value'] == best
+    assert np.isclose(result.energy, -best)
+
+
+def test_repair_returns_feasible_filled_packings():
+    items = _items(30, seed=1)
+    problem = Knapsack(items, capacity=25, penalty=5.0, constraint="inequality")
+    rng = np.random.default_rng(0)
+    reads = rng.integers(0, 2, size=(64, len(problem.h))).astype(float)
+    
+    repaired = problem.repair(reads)
+    assert repaired.shape == reads.shape
+    assert problem.feasible(repaired).all()
+    assert not problem.feasible(reads).all()
+    
+    # Nothing else fits, and slack bits absorb the unused capacity
+    used = repaired[:, :30] @ problem.weights
+    free = np.where(repaired[:, :30] < 0.5, problem.weights, np.inf).min(axis=1)
+    assert np.all(used + free > 25)
+    assert np.allclose(used + repaired[:, 30:] @ problem.slack_coeffs, 25)
+    
+    # Single vectors round-trip too
+    assert problem.repair(reads[0]).shape == reads[0].shape
+
+
+def test_fractional_weights_warn_under_inequality():
+    items = [{'value': 3.0, 'weight': 1.5}, {'value': 2.0, 'weight': 2.0}]
+    problem = Knapsack(items, capacity=4, penalty=5.0, constraint="inequality")
+    with pytest.warns(UserWarning, match="integer"):
+        problem.build()
+    # Integer weights and the equality mode do not warn
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Knapsack(_items(5), capacity=4, penalty=5.0, constraint="inequality").build()
+        Knapsack(items, capacity=4, penalty=5.0).build()
+
+
+def test_inequality_with_fractional_capacity():
+    items = [{'weight': w, 'value': v} for w, v in [(3, 5), (4, 6), (4, 7), (2, 1)]]
+    problem = Knapsack(items, capacity=10.5, penalty=20.0, constraint="inequality")
+    result = ExactSolver(processes=1).solve(problem)
+    metrics = problem.evaluate(result.solution)
+    assert metrics['valid'] and metrics['total_value'] == 14
+    assert np.isclose(result.energy, -14)
+    
+    # Appended items target the same floor(C)
+    grown = Knapsack(items[:3], capacity=10.5, penalty=20.0, constraint="inequality")
+    grown.add_item(items[3])
+    assert np.allclose(grown.h, problem.h)
+    assert np.isclose(grown.offset, problem.offset)
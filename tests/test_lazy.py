@@ -0,0 +1,122 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import Knapsack, MaxCut, SeismicFeatureSelection, PortfolioOptimization, SAT3, WellPlacement
+
+
+def _items(n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'name': f"item{i}", 'value': float(v), 'weight': float(w)}
+            for i, (v, w) in enumerate(zip(rng.integers(1, 10, n), rng.integers(1, 6, n)))]
+
+
+def _dense(J):
+    return J.toarray() if hasattr(J, 'toarray') else np.asarray(J)
+
+
+def test_construction_and_evaluation_do_not_build():
+    problem = Knapsack(_items(), capacity=12, penalty=3.0)
+    problem.evaluate_batch(np.ones((4, 20)))
+    problem.evaluate(np.zeros(20))
+    assert '_built' not in vars(problem)
+
+    assert len(problem.h) == 20
+    assert '_built' in vars(problem)
+
+    # Evaluation uses cheap derived data (edges, geometry, literal nodes), never J
+    locations = [{'x': float(i), 'y': 0.0, 'cost': 1.0, 'value': 2.0} for i in range(6)]
+    problems = [
+        MaxCut(nx.cycle_graph(6)),
+        WellPlacement(locations, budget=3.0, min_dist=1.5),
+        SAT3([(1, 2, 3), (-1, 2, -3)], n_vars=3, encoding="mis"),
+    ]
+    for problem in problems:
+        problem.evaluate(np.zeros(6))
+        problem.evaluate_batch(np.ones((3, 6)))
+        assert '_built' not in vars(problem), type(problem).__name__
+    problems[0].cut_size(np.ones(6))
+    assert '_built' not in vars(problems[0])
+
+
+def test_only_derived_attributes_build():
+    problem = Knapsack(_items(), capacity=12, penalty=3.0)
+    try:
+        problem.no_such_attribute
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("missing attribute did not raise")
+    assert '_built' not in vars(problem)
+    assert len(problem.slack_coeffs) == 0
+
+
+def test_parameter_change_invalidates():
+    problem = Knapsack(_items(), capacity=12, penalty=3.0, constraint="inequality")
+    J_before = _dense(problem.J)
+
+    problem.penalty = 5.0
+    problem.capacity = 20
+    fresh = Knapsack(_items(), capacity=20, penalty=5.0, constraint="inequality")
+    assert problem.J.shape != J_before.shape
+    assert np.allclose(_dense(problem.J), _dense(fresh.J))
+    assert np.allclose(problem.h, fresh.h)
+    assert problem.offset == fresh.offset
+    # Derived data (slack bits) follows the new capacity
+    assert np.array_equal(problem.slack_coeffs, fresh.slack_coeffs)
+
+    # Unrelated attributes keep the built Hamiltonian
+    J = problem.J
+    problem.note = "sweep"
+    assert problem.J is J
+
+
+def test_input_reassignment_invalidates():
+    problem = Knapsack(_items(), capacity=12, penalty=3.0)
+    problem.h
+    problem.items = _items(12, seed=3)
+    fresh = Knapsack(_items(12, seed=3), capacity=12, penalty=3.0)
+    assert problem.n_items == 12 and len(problem.h) == 12
+    assert np.allclose(problem.h, fresh.h)
+    assert np.allclose(_dense(problem.J), _dense(fresh.J))
+
+    sat = SAT3([(1, 2, 3), (-1, 2, -3)], n_vars=3)
+    sat.h
+    sat.clauses = [(1, 2, 3), (-1, -2, 3), (1, -2, -3)]
+    fresh = SAT3([(1, 2, 3), (-1, -2, 3), (1, -2, -3)], n_vars=3)
+    assert len(sat.h) == 9
+    assert np.array_equal(sat.literals, fresh.literals)
+    assert np.allclose(_dense(sat.J), _dense(fresh.J))
+
+
+def test_derived_attributes_trigger_build():
+    problem = MaxCut(nx.cycle_graph(5))
+    assert 'edges' not in vars(problem)
+    assert problem.cut_size(np.array([1, 0, 1, 0, 0])) == 4.0
+
+
+def test_precision_survives_rebuild():
+    rng = np.random.default_rng(0)
+    corr = np.abs(rng.normal(size=(8, 8)))
+    problem = SeismicFeatureSelection(rng.uniform(size=8), (corr + corr.T) / 2, k=3)
+    problem.set_precision("int16")
+
+    problem.k = 4
+    assert problem.J.dtype == np.int16
+    assert problem.h.dtype == np.int16
+    assert problem.scale > 1.0
+
+
+def test_risk_aversion_before_and_after_build():
+    rng = np.random.default_rng(2)
+    A = rng.normal(size=(6, 6))
+    problem = PortfolioOptimization(rng.normal(size=6), A @ A.T, risk_aversion=1.0)
+    problem.q = 3.0
+    assert np.allclose(problem.J, -6.0 * A @ A.T)
+
+    problem.set_risk_aversion(0.5)
+    assert np.allclose(problem.J, -1.0 * A @ A.T)
@@ -0,0 +1,98 @@
+import sys
+import os
+import numpy as np
+import scipy.sparse as sp
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import WellPlacement
+from pykoppu.problems.logistics import Knapsack
+from pykoppu.problems.energy import SeismicFeatureSelection
+from pykoppu.problems.finance import PortfolioOptimization
+from pykoppu.opu.kernel import Kernel, DeltaKernel, LowRankCoupling
+from pykoppu.biocompiler import BioCompiler, OpCode
+from pykoppu.oos.process import Process
+
+
+def _random_coupling(n, rank=2, seed=0):
+    rng = np.random.default_rng(seed)
+    S = sp.random(n, n, density=0.2, random_state=seed)
+    S = (S + S.T).tocsr()
+    U = rng.normal(size=(n, rank))
+    V = U * rng.normal(size=rank)
+    return LowRankCoupling(S, U, V), rng.normal(size=n)
+
+
+def test_low_rank_coupling_matches_dense():
+    J, h = _random_coupling(30)
+    D = J.toarray()
+    rng = np.random.default_rng(1)
+    states = rng.integers(0, 2, size=(50, 30))
+
+    assert np.allclose(Kernel.compute_energy_batch(J, h, states), Kernel.compute_energy_batch(D, h, states))
+    assert np.isclose(Kernel.compute_energy(J, h, states[0]), Kernel.compute_energy(D, h, states[0]))
+    assert np.allclose(Kernel.local_field(J, h, states[0]), Kernel.local_field(D, h, states[0]))
+    assert np.allclose(J.diagonal(), np.diag(D))
+
+    engine = DeltaKernel(J, h, state=states[0])
+    for i in rng.integers(0, 30, size=40):
+        engine.flip(i)
+    assert np.isclose(engine.energy, Kernel.compute_energy(D, h, engine.state))
+    assert np.allclose(engine.field, D @ engine.state + h)
+
+    # int16 keeps the factors in floating point under the shared scale
+    Jq, hq, _, scale = Kernel.quantize(J, h, "int16")
+    assert isinstance(Jq, LowRankCoupling) and Jq.sparse.dtype == np.int16
+    assert np.allclose(Kernel.compute_energy_batch(Jq, hq, states, scale=scale), Kernel.compute_energy_batch(D, h, states), atol=1e-2)
+
+
+def test_problems_low_rank_matches_dense():
+    rng = np.random.default_rng(0)
+    n = 12
+    items = [{'name': f"i{i}", 'value': rng.random(), 'weight': rng.random()} for i in range(n)]
+    locations = [{'id': i, 'x': rng.random(), 'y': rng.random(), 'value': rng.random(), 'cost': rng.random()} for i in range(n)]
+    redundancy = rng.random((n, n))
+    relevance, mu = rng.random(n), rng.random(n)
+    B, F, d = rng.normal(size=(n, 2)), np.array([[1.0, 0.3], [0.3, 0.5]]), rng.random(n)
+    builders = [
+        lambda low_rank: Knapsack(items, capacity=2.0, penalty=5.0, low_rank=low_rank),
+        lambda low_rank: WellPlacement(locations, budget=2.0, min_dist=0.3, low_rank=low_rank),
+        lambda low_rank: SeismicFeatureSelection(relevance, redundancy, k=3, low_rank=low_rank),
+        lambda low_rank: PortfolioOptimization(mu, risk_aversion=0.5, factor_loadings=B, factor_covariance=F, specific_variance=d, low_rank=low_rank),
+    ]
+    states = rng.integers(0, 2, size=(40, n))
+
+    for build in builders:
+        dense = build(False)
+        low_rank = build(True)
+        assert isinstance(dense.J, np.ndarray)
+        assert isinstance(low_rank.J, LowRankCoupling)
+        assert np.allclose(low_rank.J.toarray(), dense.J)
+        assert np.allclose(
+            Kernel.compute_energy_batch(low_rank.J, low_rank.h, states, offset=low_rank.offset),
+            Kernel.compute_energy_batch(dense.J, dense.h, states, offset=dense.offset)
+        )
+
+    # The factor model reproduces the dense covariance formulation
+    dense_cov = PortfolioOptimization(mu, B @ F @ B.T + np.diag(d), risk_aversion=0.5)
+    assert np.allclose(builders[-1](True).J.toarray(), dense_cov.J)
+
+
+def test_low_rank_large_and_compiled():
+    # 20k items: the rank-1 capacity term never materializes an n x n matrix
+    rng = np.random.default_rng(0)
+    items = [{'name': str(i), 'value': 1.0, 'weight': w} for i, w in enumerate(rng.random(20000))]
+    problem = Knapsack(items, capacity=100.0, penalty=2.0)
+    assert isinstance(problem.J, LowRankCoupling) and problem.J.rank == 1
+    energies = Kernel.compute_energy_batch(problem.J, problem.h, rng.integers(0, 2, size=(4, 20000)), offset=problem.offset)
+    assert energies.shape == (4,)
+
+    small = Knapsack(items[:6], capacity=2.0, penalty=2.0, low_rank=True)
+    instructions = BioCompiler().compile(small, duration=20.0)
+    opcodes = [instr.opcode for instr in instructions]
+    assert OpCode.LDS in opcodes and OpCode.LDL in opcodes
+
+    result = Process(small, backend="cpu", t=20.0).run()
+    assert result.solution.shape == (6,)
+    assert len(result.energy_history) > 0
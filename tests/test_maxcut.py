@@ -0,0 +1,79 @@
+import sys
+import os
+import pytest
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import MaxCut
+from pykoppu.opu.kernel import Kernel
+
+
+def test_weighted_maxcut_cut_sizes():
+    rng = np.random.default_rng(0)
+    G = nx.relabel_nodes(nx.gnp_random_graph(15, 0.4, seed=2), lambda u: f"n{u}")
+    for u, v in G.edges:
+        G[u][v]['weight'] = float(rng.integers(1, 5))
+    problem = MaxCut(G)
+    
+    index = {node: i for i, node in enumerate(G.nodes)}
+    J = np.zeros((15, 15))
+    for u, v, w in G.edges(data='weight'):
+        J[index[u], index[v]] = J[index[v], index[u]] = -w
+    assert np.allclose(problem.J, J)
+    
+    states = rng.integers(0, 2, size=(40, 15))
+    expected = [sum(w for u, v, w in G.edges(data='weight') if x[index[u]] != x[index[v]]) for x in states]
+    assert np.allclose(problem.cut_size(states), expected)
+    assert problem.evaluate(states[0].astype(float)) == {"cut_size": expected[0], "cut_edges": int(sum(states[0][problem.edges[:, 0]] != states[0][problem.edges[:, 1]]))}
+    
+    # Spin energy: E(s) = -0.5 s^T J s = W_uncut - W_cut
+    spins = 2 * states - 1
+    energies = Kernel.compute_energy_batch(problem.J, problem.h, spins)
+    assert np.allclose(energies, problem.weights.sum() - 2 * np.asarray(expected))
+    
+    # weight=None ignores the attribute
+    assert np.allclose(MaxCut(G, weight=None).cut_size(states), [np.sum(x[problem.edges[:, 0]] != x[problem.edges[:, 1]]) for x in states])
+
+
+def test_unweighted_and_directed_maxcut():
+    # Unweighted graphs keep an integer edge count
+    problem = MaxCut(nx.cycle_graph(5))
+    metrics = problem.evaluate(np.array([1, 0, 1, 0, 0], dtype=float))
+    assert metrics["cut_size"] == 4 and isinstance(metrics["cut_size"], int)
+    assert problem.evaluate_batch(np.eye(5))["cut_size"].dtype == np.int64
+    
+    # Directed edges pointing "down" (u > v) are kept
+    D = nx.DiGraph()
+    D.add_nodes_from(range(4))
+    D.add_edges_from([(3, 0), (1, 2), (2, 1)])
+    directed = MaxCut(D)
+    assert directed.J[0, 3] == directed.J[3, 0] == -1.0
+    assert directed.J[1, 2] == -2.0
+    assert directed.evaluate(np.array([1, 0, 1, 0], dtype=float))["cut_size"] == 3
+
+
+def test_maxcut_from_edge_list(tmp_path):
+    gset = tmp_path / "G_small.txt"
+    gset.write_text("5 4\n1 2 1\n2 3 1\n3 4 -1\n1 5 1\n")
+    problem = MaxCut.from_edge_list(gset, sparse=True)
+    assert sp.issparse(problem.J) and problem.J.shape == (5, 5)
+    assert problem.J[2, 3] == 1.0 and problem.J[0, 1] == -1.0
+    assert problem.cut_size(np.array([1, 0, 1, 0, 0])) == 1.0 + 1.0 - 1.0 + 1.0
+    
+    plain = tmp_path / "edges.txt"
+    plain.write_text("0 1\n1 2\n")
+    assert MaxCut.from_edge_list(plain).graph.number_of_edges() == 2
+    
+    # A "u v" line followed by weighted lines is only Gset if the edge count matches
+    mixed = tmp_path / "mixed.txt"
+    mixed.write_text("2 3\n0 1 1\n1 2 2\n")
+    with pytest.raises(ValueError):
+        MaxCut.from_edge_list(mixed)
+    weighted = tmp_path / "weighted.txt"
+    weighted.write_text("4 2\n1 2 1\n2 3 5\n")
+    graph = MaxCut.from_edge_list(weighted).graph
+    assert graph.number_of_nodes() == 4 and graph[1][2]['weight'] == 5.0
@@ -0,0 +1,61 @@
+import sys
+import os
+import itertools
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import ModelBuilder
+from pykoppu.opu.kernel import Kernel, LowRankCoupling
+
+
+def _energies(J, h, offset, n):
+    states = np.array(list(itertools.product([0, 1], repeat=n)))
+    return states, Kernel.compute_energy_batch(J, h, states, offset=offset, dtype=np.float64)
+
+
+@pytest.mark.parametrize("sparse,low_rank", [(False, False), (True, False), (None, True)])
+def test_emitted_energy_matches_objective(sparse, low_rank):
+    rng = np.random.default_rng(0)
+    n = 8
+    a = rng.normal(size=n)
+    rows, cols = rng.integers(0, n, 30), rng.integers(0, n, 30)
+    b = rng.normal(size=30)
+    w = rng.normal(size=5)
+
+    model = ModelBuilder(n)
+    model.add_constant(1.5)
+    model.add_linear(np.arange(n), a)
+    model.add_quadratic(rows, cols, b)
+    model.add_squared_linear([0, 2, 3, 5, 7], w, constant=-0.5, penalty=2.0)
+    model.add_one_hot([[1, 4], [0, 6, 7]], penalty=3.0)
+    J, h, offset = model.emit(sparse=sparse, low_rank=low_rank)
+    assert isinstance(J, LowRankCoupling) == bool(low_rank)
+
+    states, energies = _energies(J, h, offset, n)
+    for x, energy in zip(states, energies):
+        H = 1.5 + a @ x + np.sum(b * x[rows] * x[cols])
+        H += 2.0 * (w @ x[[0, 2, 3, 5, 7]] - 0.5)**2
+        H += 3.0 * ((x[1] + x[4] - 1)**2 + (x[0] + x[6] + x[7] - 1)**2)
+        assert np.isclose(energy, H)
+
+
+def test_pairs_are_deduplicated_and_cancelled():
+    model = ModelBuilder(4)
+    model.add_quadratic([0, 1, 2], [1, 0, 3], [1.0, 2.0, 1.0])
+    model.add_quadratic([3], [2], [-1.0])
+    J, h, offset = model.emit(sparse=True)
+    assert J.nnz == 2
+    assert J[0, 1] == J[1, 0] == -3.0
+
+
+def test_variables_and_unfactored_constraint():
+    model = ModelBuilder()
+    index = model.add_variables(3)
+    assert model.n == 3 and list(index) == [0, 1, 2]
+    model.add_squared_linear(index, [1.0, 2.0, 4.0], constant=-3.0, factor=False)
+    J, h, offset = model.emit()
+    states, energies = _energies(J, h, offset, 3)
+    assert np.allclose(energies, (states @ [1.0, 2.0, 4.0] - 3.0)**2)
@@ -0,0 +1,162 @@
+import sys
+import os
+import numpy as np
+import scipy.sparse as sp
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.opu import HamiltonianPatch
+from pykoppu.opu.kernel import LowRankCoupling
+from pykoppu.problems import Knapsack, WellPlacement, SeismicFeatureSelection
+
+
+def _dense(J):
+    if isinstance(J, LowRankCoupling):
+        J = J.sparse.toarray() + J.U @ J.V.T
+    return J.toarray() if hasattr(J, 'toarray') else np.asarray(J)
+
+
+def _items(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'name': f"item{i}", 'value': float(v), 'weight': float(w)}
+            for i, (v, w) in enumerate(zip(rng.integers(1, 10, n), rng.integers(1, 6, n)))]
+
+
+def _locations(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'id': i, 'x': float(x), 'y': float(y), 'value': float(v), 'cost': float(c)}
+            for i, (x, y, v, c) in enumerate(zip(rng.uniform(0, 10, n), rng.uniform(0, 10, n),
+                                                 rng.uniform(1, 5, n), rng.integers(1, 4, n)))]
+
+
+def _assert_same(problem, fresh):
+    assert np.allclose(_dense(problem.J), _dense(fresh.J))
+    assert np.allclose(problem.h, fresh.h)
+    assert np.isclose(problem.offset, fresh.offset)
+
+
+@pytest.mark.parametrize("J", [
+    np.arange(16.0).reshape(4, 4),
+    sp.csr_matrix(np.arange(16.0).reshape(4, 4)),
+    LowRankCoupling(sp.csr_matrix((4, 4)), np.ones((4, 1)), np.arange(4.0).reshape(4, 1)),
+])
+def test_apply_matches_dense_reference(J):
+    patch = HamiltonianPatch(removed=[1], inserted=[0], rows=[0, 2], cols=[2, 0],
+                             values=[1.5, 1.5], h_index=[0, 3], h_values=[2.0, -1.0], offset=0.5)
+    reference = np.delete(np.delete(_dense(J), 1, 0), 1, 1)
+    reference = np.insert(np.insert(reference, 0, 0.0, axis=0), 0, 0.0, axis=1)
+    reference[0, 2] += 1.5
+    reference[2, 0] += 1.5
+
+    J_new, h_new, offset = patch.apply(J, np.arange(4.0), 1.0)
+    assert type(J_new) is type(J)
+    assert np.allclose(_dense(J_new), reference)
+    assert np.allclose(h_new, [2.0, 0.0, 2.0, 2.0])
+    assert offset == 1.5
+    assert patch.nnz == 4
+
+
+@pytest.mark.parametrize("constraint", ["equality", "inequality"])
+def test_knapsack_mutations_match_fresh_build(constraint):
+    items = _items(12)
+    problem = Knapsack(items, capacity=15, penalty=3.0, constraint=constraint)
+    old_J, old_h, old_offset = problem.J.copy(), problem.h.copy(), problem.offset
+
+    new_item = {'name': 'new', 'value': 7.0, 'weight': 2.0}
+    patch = problem.add_item(new_item)
+    _assert_same(problem, Knapsack(items + [new_item], capacity=15, penalty=3.0, constraint=constraint))
+
+    # A driver holding the old Hamiltonian reaches the same state
+    J, h, offset = patch.apply(old_J, old_h, old_offset)
+    assert np.allclose(J, problem.J) and np.allclose(h, problem.h) and offset == problem.offset
+
+    problem.remove_item(3)
+    remaining = [item for i, item in enumerate(items + [new_item]) if i != 3]
+    _assert_same(problem, Knapsack(remaining, capacity=15, penalty=3.0, constraint=constraint))
+
+    problem.update_values([20.0, 1.0], indices=[0, 5])
+    remaining[0] = {**remaining[0], 'value': 20.0}
+    remaining[5] = {**remaining[5], 'value': 1.0}
+    _assert_same(problem, Knapsack(remaining, capacity=15, penalty=3.0, constraint=constraint))
+    assert problem.evaluate(np.zeros(len(problem.h)))['total_value'] == 0
+    assert items[0]['value'] != 20.0
+
+
+@pytest.mark.parametrize("low_rank", [False, True])
+def test_well_placement_mutations_match_fresh_build(low_rank):
+    locations = _locations(15)
+    problem = WellPlacement(locations, budget=8.0, min_dist=2.5, low_rank=low_rank)
+    problem.h
+
+    new_location = {'id': 15, 'x': 5.0, 'y': 5.0, 'value': 4.0, 'cost': 2.0}
+    problem.add_location(new_location)
+    locations = locations + [new_location]
+    _assert_same(problem, WellPlacement(locations, budget=8.0, min_dist=2.5))
+
+    problem.remove_location(2)
+    locations = locations[:2] + locations[3:]
+    fresh = WellPlacement(locations, budget=8.0, min_dist=2.5)
+    _assert_same(problem, fresh)
+    assert np.array_equal(np.sort(problem.conflicts, axis=0), np.sort(fresh.conflicts, axis=0))
+
+    problem.update_values([9.0], indices=[4])
+    locations[4] = {**locations[4], 'value': 9.0}
+    _assert_same(problem, WellPlacement(locations, budget=8.0, min_dist=2.5))
+
+
+def test_seismic_relevance_update_and_reduced_precision():
+    rng = np.random.default_rng(1)
+    corr = np.abs(rng.normal(size=(10, 10)))
+    redundancy = (corr + corr.T) / 2
+    problem = SeismicFeatureSelection(rng.uniform(size=10), redundancy, k=3, alpha=2.0)
+    relevance = problem.relevance.copy()
+    relevance[[1, 7]] = [0.9, 0.1]
+
+    problem.update_relevance([0.9, 0.1], indices=[1, 7])
+    _assert_same(problem, SeismicFeatureSelection(relevance, redundancy, k=3, alpha=2.0))
+
+    # Quantized Hamiltonians are rebuilt rather than patched
+    problem.set_precision("int16")
+    relevance[0] = 0.0
+    problem.update_relevance(relevance)
+    fresh = SeismicFeatureSelection(relevance, redundancy, k=3, alpha=2.0)
+    fresh.set_precision("int16")
+    assert np.array_equal(problem.h, fresh.h)
+
+
+@pytest.mark.parametrize("J", [
+    np.arange(16.0).reshape(4, 4),
+    LowRankCoupling(sp.csr_matrix((4, 4)), np.ones((4, 1)), np.arange(4.0).reshape(4, 1)),
+])
+def test_apply_leaves_inputs_untouched(J):
+    h = np.arange(4.0)
+    before_J, before_h = _dense(J).copy(), h.copy()
+    patch = HamiltonianPatch(rows=[0, 2], cols=[2, 0], values=[1.5, 1.5], h_index=[3], h_values=[2.0])
+    J_new, h_new, _ = patch.apply(J, h)
+    assert np.array_equal(_dense(J), before_J) and np.array_equal(h, before_h)
+    assert h_new[3] == 5.0 and _dense(J_new)[0, 2] == before_J[0, 2] + 1.5
+
+
+def test_mutation_does_not_alter_previous_hamiltonian():
+    problem = Knapsack(_items(6), capacity=10, penalty=2.0, low_rank=False)
+    J, h = problem.J, problem.h
+    before_J, before_h = np.array(J), h.copy()
+    patch = problem.update_values([100.0], indices=[0])
+    assert np.array_equal(J, before_J) and np.array_equal(h, before_h)
+    # A holder of the old Hamiltonian applies the patch exactly once
+    assert np.allclose(patch.apply(J, h)[1], problem.h)
+
+
+def test_low_rank_add_item_stays_low_rank():
+    items = _items(200)
+    problem = Knapsack(items, capacity=150, penalty=3.0, low_rank=True)
+    nnz = problem.J.sparse.nnz
+    new_items = [{'name': f"new{i}", 'value': 5.0 + i, 'weight': 2.0 + i} for i in range(5)]
+    for item in new_items:
+        patch = problem.add_item(item)
+        assert patch.nnz <= 4
+    assert isinstance(problem.J, LowRankCoupling)
+    assert problem.J.sparse.nnz <= nnz + len(new_items)
+    _assert_same(problem, Knapsack(items + new_items, capacity=150, penalty=3.0, low_rank=True))
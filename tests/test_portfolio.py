@@ -0,0 +1,80 @@
+import sys
+import os
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems.finance import PortfolioOptimization
+from pykoppu.opu.kernel import Kernel
+
+
+def test_portfolio_from_returns(tmp_path):
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.01, 0.05, size=(3000, 8)) + 0.02 * rng.normal(size=(3000, 1))
+    
+    problem = PortfolioOptimization.from_returns(returns, risk_aversion=2.0, chunk_size=500)
+    assert np.allclose(problem.mu, returns.mean(axis=0))
+    assert np.allclose(problem.sigma, np.cov(returns, rowvar=False))
+    assert np.allclose(problem.J, -4.0 * np.cov(returns, rowvar=False))
+    
+    # Same estimate from a memory-mapped file and from a chunk stream
+    np.save(tmp_path / "returns.npy", returns)
+    from_file = PortfolioOptimization.from_returns(str(tmp_path / "returns.npy"), chunk_size=1000)
+    from_stream = PortfolioOptimization.from_returns(iter(np.array_split(returns, 7)))
+    assert np.allclose(from_file.sigma, problem.sigma) and np.allclose(from_stream.mu, problem.mu)
+    
+    # Rebalancing folds new rows into the existing estimate
+    head = PortfolioOptimization.from_returns(returns[:2000], risk_aversion=2.0)
+    head.update_returns(returns[2000:])
+    assert np.allclose(head.sigma, problem.sigma)
+    assert np.allclose(head.J, problem.J)
+    
+    # Sweep members own their moments: rebalancing one leaves the rest alone
+    base = PortfolioOptimization.from_returns(returns[:2000], risk_aversion=2.0)
+    first, second = base.sweep([1.0, 3.0])
+    first.update_returns(returns[2000:])
+    assert np.allclose(first.sigma, problem.sigma)
+    assert base.moments.count == 2000 and second.moments.count == 2000
+    assert np.allclose(base.sigma, np.cov(returns[:2000], rowvar=False))
+    
+    # Shrinkage keeps the trace and pulls off-diagonal entries towards zero
+    shrunk = PortfolioOptimization.from_returns(returns, shrinkage=0.5)
+    assert np.isclose(np.trace(shrunk.sigma), np.trace(problem.sigma))
+    assert np.allclose(shrunk.sigma - np.diag(np.diag(shrunk.sigma)), 0.5 * (problem.sigma - np.diag(np.diag(problem.sigma))))
+    oas = PortfolioOptimization.from_returns(returns, shrinkage="oas")
+    off = ~np.eye(8, dtype=bool)
+    ratio = oas.sigma[off] / problem.sigma[off]
+    assert np.allclose(ratio, ratio[0]) and 0.0 <= ratio[0] < 1.0
+
+
+def test_portfolio_risk_aversion_sweep():
+    rng = np.random.default_rng(1)
+    A = rng.normal(size=(6, 6))
+    problem = PortfolioOptimization(rng.random(6), A @ A.T / 6, risk_aversion=1.0)
+    states = rng.integers(0, 2, size=(32, 6))
+    qs = [0.1, 0.5, 1.0, 4.0]
+    
+    energies = problem.sweep_energies(states, qs)
+    for row, swept in zip(energies, problem.sweep(qs)):
+        assert np.allclose(row, Kernel.compute_energy_batch(swept.J, swept.h, states))
+        assert np.allclose(swept.J, PortfolioOptimization(problem.mu, problem.sigma, risk_aversion=swept.q).J)
+    assert problem.q == 1.0 # sweep leaves the original untouched
+    
+    # At reduced precision a new q is re-quantized with the coupling
+    quantized = PortfolioOptimization(problem.mu, problem.sigma, risk_aversion=1.0)
+    quantized.set_precision("int16")
+    quantized.set_risk_aversion(4.0)
+    reference = PortfolioOptimization(problem.mu, problem.sigma, risk_aversion=4.0)
+    expected = Kernel.compute_energy_batch(reference.J, reference.h, states)
+    energies = Kernel.compute_energy_batch(quantized.J, quantized.h, states, scale=quantized.scale, dtype=np.float64)
+    assert quantized.J.dtype == np.int16
+    assert np.allclose(energies, expected, atol=1e-2 * np.abs(expected).max())
+    
+    # Factor models sweep in low-rank form
+    B = rng.normal(size=(6, 2))
+    factor = PortfolioOptimization(problem.mu, risk_aversion=1.0, factor_loadings=B, specific_variance=np.full(6, 0.1), low_rank=True)
+    factor.set_risk_aversion(3.0)
+    assert np.allclose(factor.J.toarray(), -6.0 * (B @ B.T + 0.1 * np.eye(6)))
+    risk, expected = factor.risk_return(states)
+    assert np.allclose(risk, np.einsum('bi,ij,bj->b', states, B @ B.T + 0.1 * np.eye(6), states))
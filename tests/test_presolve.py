@@ -0,0 +1,80 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import SAT3, Knapsack
+from pykoppu.solvers import ExactSolver, SubProblem, presolve
+from pykoppu.solvers.presolve import local_bounds, roof_duality
+from pykoppu.oos.process import Process
+
+
+def _random_qubo(seed, n=12, unit=1.0):
+    rng = np.random.default_rng(seed)
+    J = np.triu(rng.integers(-3, 4, (n, n)) * (rng.random((n, n)) < 0.5), 1) * unit
+    h = rng.integers(-6, 7, n) * unit
+    return SubProblem(J + J.T, h, 1.0)
+
+
+def _ground(problem):
+    return ExactSolver(processes=1, max_ground_states=5000).solve(problem)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_roof_duality_fixes_hold_in_every_ground_state(seed):
+    problem = _random_qubo(seed, unit=0.5)
+    index, values = roof_duality(problem.J, problem.h)
+    for state in _ground(problem).ground_states:
+        assert np.array_equal(state[index], values)
+
+
+@pytest.mark.parametrize("make", [
+    lambda: _random_qubo(3),
+    lambda: _random_qubo(5, unit=0.3),
+    lambda: SAT3([(1, -2, 3), (-1, 2, 4), (2, 3, -4), (1, 3, 4)], n_vars=4, encoding="cubic"),
+])
+def test_reduced_problem_keeps_the_optimum(make):
+    problem = make()
+    presolved = presolve(problem)
+    reduced = presolved.reduced
+    energy = _ground(reduced).energy if len(presolved.free) else reduced.offset
+    assert np.isclose(energy, _ground(problem).energy)
+    assert presolved.pobits_saved == len(problem.h) - len(presolved.free)
+
+    # Reduced states map back with the same energy
+    local = np.random.default_rng(0).integers(0, 2, (4, len(presolved.free)))
+    full = presolved.expand(local)
+    assert np.allclose(
+        [reduced.evaluate(x)['energy'] for x in local],
+        [SubProblem(problem.J, problem.h, problem.offset, problem.K).evaluate(x)['energy'] for x in full]
+    )
+
+
+def test_low_rank_bounds_are_valid():
+    items = [{'name': str(i), 'value': 1.0 + i % 5, 'weight': 1.0 + i % 3} for i in range(40)]
+    low_rank = Knapsack(items, 10, 2.0, low_rank=True)
+    dense = Knapsack(items, 10, 2.0, low_rank=False)
+    low, high = local_bounds(low_rank.J, low_rank.h)
+    exact_low, exact_high = local_bounds(dense.J, dense.h)
+    assert np.all(low <= exact_low + 1e-9) and np.all(high >= exact_high - 1e-9)
+
+
+def test_process_runs_the_reduced_instance():
+    # A strongly biased chain: every variable is fixed, nothing is simulated
+    J = np.diag(np.ones(5), 1)
+    problem = SubProblem(J + J.T, np.array([5.0, -5.0, 5.0, 5.0, -5.0, 5.0]))
+    result = Process(problem, backend="cpu", t=20.0, presolve=True).run()
+    assert result.metadata["pobits_saved"] == 6
+    assert np.array_equal(result.solution, [1, 0, 1, 1, 0, 1])
+
+    # Partly fixed: the driver sees only the free variables
+    problem = SubProblem(np.ones((4, 4)) - np.eye(4), np.array([-1.0, -1.0, 0.5, 9.0]))
+    process = Process(problem, backend="cpu", t=20.0, presolve=True)
+    result = process.run()
+    assert result.solution.shape == (4,)
+    assert result.solution[3] == 1.0
+    assert result.metadata["pobits_saved"] == len(process.presolved.fixed) >= 1
@@ -0,0 +1,99 @@
+import sys
+import os
+import itertools
+import pytest
+from types import SimpleNamespace
+import numpy as np
+import networkx as nx
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems.math import SAT3
+from pykoppu.opu.kernel import Kernel
+
+
+def _reference_edges(clauses):
+    """All-pairs construction of the MIS literal graph."""
+    literals = [lit for clause in clauses for lit in clause]
+    edges = set()
+    for m in range(len(clauses)):
+        for a, b in [(0, 1), (1, 2), (2, 0)]:
+            edges.add(tuple(sorted((3 * m + a, 3 * m + b))))
+    for i, j in itertools.combinations(range(len(literals)), 2):
+        if literals[i] == -literals[j]:
+            edges.add((i, j))
+    return edges
+
+
+def test_sat3_conflict_edges():
+    rng = np.random.default_rng(0)
+    clauses = [tuple(int(v) * int(s) for v, s in zip(rng.choice(np.arange(1, 7), 3, replace=False), rng.choice([-1, 1], 3))) for _ in range(12)]
+    clauses.append((1, -1, 2))  # clique and conflict edge coincide
+    
+    problem = SAT3(clauses, n_vars=6)
+    expected = _reference_edges(clauses)
+    
+    assert set(map(tuple, problem.edges)) == expected
+    assert problem._graph is None  # graph is only built on demand
+    assert set(map(lambda e: tuple(sorted(e)), problem.graph.edges)) == expected
+    
+    J = problem.J
+    assert np.count_nonzero(J) == 2 * len(expected)
+    assert np.all(J[J != 0] == problem.penalty)
+    assert problem.node_info[3 * 12 + 1] == (1, True)
+
+
+def test_sat3_clause_encodings():
+    rng = np.random.default_rng(1)
+    n_vars = 5
+    clauses = [tuple(int(v) * int(s) for v, s in zip(rng.choice(np.arange(1, n_vars + 1), 3, replace=False), rng.choice([-1, 1], 3))) for _ in range(14)]
+    clauses += [(1, 1, -2), (3, -3, 4)]  # repeated variable and tautology
+    
+    cubic = SAT3(clauses, n_vars=n_vars, penalty=3.0, encoding="cubic")
+    quadratic = SAT3(clauses, n_vars=n_vars, penalty=3.0, encoding="quadratic")
+    assert cubic.h.shape == (n_vars,)
+    assert len(cubic.K) == 1 and cubic.K[0].arity == 3
+    assert quadratic.K == [] and quadratic.n_aux > 0
+    
+    assignments = np.array(list(itertools.product([0, 1], repeat=n_vars)))
+    violated = len(clauses) - cubic.count_satisfied(assignments)
+    
+    # H = P * (number of violated clauses) for every assignment
+    energies = Kernel.compute_energy_batch(cubic.J, cubic.h, assignments, offset=cubic.offset, K=cubic.K)
+    assert np.allclose(energies, 3.0 * violated)
+    
+    # Quadratized form: minimizing over the auxiliaries recovers the cubic energy
+    n_aux = quadratic.n_aux
+    aux = np.array(list(itertools.product([0, 1], repeat=n_aux)))
+    for x, target in zip(assignments, energies):
+        states = np.hstack([np.tile(x, (len(aux), 1)), aux])
+        best = Kernel.compute_energy_batch(quadratic.J, quadratic.h, states, offset=quadratic.offset).min()
+        assert np.isclose(best, target)
+        
+    # Vectorized clause counter agrees with a per-clause check
+    x = assignments[7]
+    expected = sum(any((x[abs(l) - 1] == 1) == (l > 0) for l in clause) for clause in clauses)
+    metrics = cubic.evaluate(x)
+    assert metrics['satisfied_clauses'] == expected
+    assert metrics['valid'] == (expected == len(clauses))
+
+
+def test_sat3_mis_evaluate():
+    clauses = [(1, 2, 3), (-1, 2, -3)]
+    problem = SAT3(clauses, n_vars=3)
+    # Select literal x2 in both clauses
+    y = np.zeros(6)
+    y[[1, 4]] = 1
+    metrics = problem.evaluate(y)
+    assert metrics['valid']
+    assert list(metrics['assignment']) == [0, 1, 0]
+
+
+def test_sat3_decode_warns_on_inconsistent_selection():
+    problem = SAT3([(1, 2, 3), (-1, 2, -3)], n_vars=3)
+    # x1 in the first clause and NOT x1 in the second
+    y = np.zeros(6)
+    y[[0, 3]] = 1
+    with pytest.warns(UserWarning, match="variable 1"):
+        problem.decode_solution(SimpleNamespace(solution=y))
@@ -67,5 +67,35 @@ def test_seismic_feature_selection():
     else:
         print("FAILURE: Cardinality constraint failed.")
 
+def test_seismic_from_attributes(tmp_path):
+    rng = np.random.default_rng(0)
+    n_samples = 5000
+    X = rng.normal(size=(n_samples, 6))
+    X[:, 1] = X[:, 0] + 0.1 * rng.normal(size=n_samples) # redundant copy of F0
+    X[:, 5] = 3.0 # constant attribute
+    y = X[:, 0] + 0.5 * X[:, 2] + rng.normal(size=n_samples)
+    
+    corr = np.abs(np.corrcoef(np.hstack([X[:, :5], y[:, None]]), rowvar=False))
+    
+    problem = SeismicFeatureSelection.from_attributes(X, y, k=2, chunk_size=777)
+    assert np.allclose(problem.relevance[:5], corr[:5, -1])
+    assert np.allclose(problem.redundancy[:5, :5], corr[:5, :5] - np.eye(5))
+    assert problem.relevance[5] == 0.0 and not problem.redundancy[5].any()
+    
+    # Memory-mapped files streamed by a process pool give the same matrices
+    np.save(tmp_path / "attributes.npy", X)
+    np.save(tmp_path / "target.npy", y)
+    streamed = SeismicFeatureSelection.from_attributes(
+        str(tmp_path / "attributes.npy"), str(tmp_path / "target.npy"), k=2, chunk_size=1000, processes=2, beta=0.5
+    )
+    assert streamed.beta == 0.5
+    assert np.allclose(streamed.relevance, problem.relevance)
+    assert np.allclose(streamed.redundancy, problem.redundancy)
+    
+    # In-memory arrays go through the pool a bounded window of chunks at a time
+    shipped = SeismicFeatureSelection.from_attributes(X, y, k=2, chunk_size=250, processes=2)
+    assert np.allclose(shipped.relevance, problem.relevance)
+    assert np.allclose(shipped.redundancy, problem.redundancy)
+
 if __name__ == "__main__":
     test_seismic_feature_selection()
@@ -0,0 +1,82 @@
+import sys
+import os
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems import MaxCut, SAT3, WellPlacement, Factorization
+from pykoppu.problems.logistics import TSP
+from pykoppu.opu.kernel import Kernel
+from pykoppu.biocompiler import BioCompiler, OpCode
+from pykoppu.oos.process import Process
+
+
+def test_sparse_matches_dense():
+    rng = np.random.default_rng(0)
+    G = nx.gnp_random_graph(12, 0.3, seed=1)
+    distances = rng.random((4, 4))
+    locations = [{'id': i, 'x': rng.random(), 'y': rng.random(), 'value': 1.0, 'cost': 1.0} for i in range(8)]
+    builders = [
+        lambda sparse: MaxCut(G, sparse=sparse),
+        lambda sparse: SAT3([(1, -2, 3), (-1, 2, 4), (2, -3, -4)], n_vars=4, sparse=sparse),
+        lambda sparse: TSP(distances, sparse=sparse),
+        lambda sparse: WellPlacement(locations, budget=3, min_dist=0.3, sparse=sparse),
+        lambda sparse: Factorization(15, p_bits=2, q_bits=3, sparse=sparse),
+    ]
+    
+    for build in builders:
+        dense = build(False)
+        sparse = build(True)
+        assert isinstance(dense.J, np.ndarray)
+        assert sp.issparse(sparse.J)
+        assert np.allclose(sparse.J.toarray(), dense.J)
+        
+        states = rng.integers(0, 2, size=(20, dense.J.shape[0]))
+        assert np.allclose(
+            Kernel.compute_energy_batch(sparse.J, sparse.h, states),
+            Kernel.compute_energy_batch(dense.J, dense.h, states)
+        )
+        assert np.isclose(Kernel.compute_energy(sparse.J, sparse.h, states[0]), Kernel.compute_energy(dense.J, dense.h, states[0]))
+
+
+def test_sparse_automatic_selection():
+    # Small graphs stay dense, large sparse graphs switch to CSR
+    assert isinstance(MaxCut(nx.cycle_graph(10)).J, np.ndarray)
+    assert sp.issparse(MaxCut(nx.cycle_graph(1000)).J)
+
+
+def test_sparse_compile_and_run():
+    problem = MaxCut(nx.cycle_graph(6), sparse=True)
+    instructions = BioCompiler().compile(problem, duration=20.0)
+    opcodes = [instr.opcode for instr in instructions]
+    assert OpCode.LDS in opcodes
+    assert OpCode.LDJ not in opcodes
+    
+    result = Process(problem, backend="cpu", t=20.0).run()
+    assert result.solution.shape == (6,)
+    assert len(result.energy_history) > 0
+
+
+def test_reduced_precision_problem():
+    problem = MaxCut(nx.cycle_graph(8))
+    problem.h = np.linspace(-1.0, 1.0, 8)
+    assert problem.precision_error("float32") < 1e-6
+    
+    error = problem.set_precision("int16")
+    assert problem.precision == "int16"
+    assert problem.J.dtype == np.int16
+    assert 0.0 <= error < 1e-3
+    
+    instructions = BioCompiler().compile(problem, duration=20.0)
+    assert instructions[1].opcode == OpCode.PRC
+    assert instructions[1].operands == ["int16", problem.scale]
+    
+    result = Process(problem, backend="cpu", t=20.0).run()
+    assert result.solution.shape == (8,)
+    
+    # The compiler can also lower precision on its own
+    program = BioCompiler(precision="float32").compile(MaxCut(nx.cycle_graph(4)), duration=20.0)
+    assert program[1].opcode == OpCode.PRC and program[1].operands[0] == "float32"
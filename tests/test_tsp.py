@@ -0,0 +1,54 @@
+import sys
+import os
+import numpy as np
+import scipy.sparse as sp
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pykoppu.problems.logistics import TSP
+
+
+def _reference_hamiltonian(D, A):
+    """Loop-based construction (one term at a time) used as ground truth."""
+    N = D.shape[0]
+    J = np.zeros((N * N, N * N))
+    h = np.zeros(N * N)
+    idx = lambda i, t: i * N + t
+    for i in range(N):
+        for t in range(N):
+            h[idx(i, t)] += 2 * A
+            for t2 in range(N):
+                if t2 != t:
+                    J[idx(i, t), idx(i, t2)] += A
+            for j in range(N):
+                if j != i:
+                    J[idx(i, t), idx(j, t)] += A
+                    u, v = idx(i, t), idx(j, (t + 1) % N)
+                    J[u, v] += D[i, j]
+                    J[v, u] += D[i, j]
+    h[idx(0, 0)] += 2 * A
+    return J, h
+
+
+def test_tsp_vectorized_matches_reference():
+    rng = np.random.default_rng(0)
+    for N in (2, 3, 5):
+        D = rng.random((N, N)) * 10
+        J_ref, h_ref = _reference_hamiltonian(D, 7.0)
+        
+        problem = TSP(D, penalty=7.0)
+        assert np.allclose(problem.J, J_ref)
+        assert np.allclose(problem.h, h_ref)
+        
+        sparse = TSP(D, penalty=7.0, sparse=True)
+        assert sp.issparse(sparse.J)
+        assert np.allclose(sparse.J.toarray(), J_ref)
+
+
+def test_tsp_large_instance_is_sparse():
+    rng = np.random.default_rng(1)
+    problem = TSP(rng.random((100, 100)))
+    assert sp.issparse(problem.J)
+    assert problem.J.shape == (10000, 10000)
+    assert problem.J.nnz == 4 * 100 * 100 * 99
@@ -1,6 +1,7 @@
 import sys
 import os
 import numpy as np
+import scipy.sparse as sp
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -85,5 +86,32 @@ def test_well_placement():
     else:
         print(f"FAILURE: Energy {H_total} != -70.0")
 
+def test_well_placement_conflicts():
+    rng = np.random.default_rng(0)
+    n = 400
+    points = rng.random((n, 2)) * 20
+    points[1] = points[0] + [1.0, 0.0] # exactly min_dist apart: compatible
+    locations = [{'id': i, 'x': px, 'y': py, 'value': 1.0, 'cost': 1.0} for i, (px, py) in enumerate(points)]
+    
+    # Without the budget coupling only close pairs remain, so J is stored sparse
+    problem = WellPlacement(locations, budget=5, min_dist=1.0, penalty_budget=0.0)
+    assert sp.issparse(problem.J)
+    
+    dist = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+    expected = {(i, j) for i, j in zip(*np.nonzero(np.triu(dist < 1.0, k=1)))}
+    assert {tuple(p) for p in problem.conflicts} == expected
+    assert (0, 1) not in expected
+    
+    J = problem.J.toarray()
+    assert np.allclose(J[np.triu_indices(n, k=1)], np.where(np.triu(dist < 1.0, k=1), -20.0, 0.0)[np.triu_indices(n, k=1)])
+    
+    # Violations and closest pair agree with brute force
+    for x in rng.integers(0, 2, size=(5, n)):
+        metrics = problem.evaluate(x)
+        selected = np.flatnonzero(x)
+        sub = dist[np.ix_(selected, selected)][np.triu_indices(len(selected), k=1)]
+        assert metrics['dist_ok'] == bool(np.all(sub >= 1.0))
+        assert np.isclose(metrics['min_dist_found'], sub.min())
+
 if __name__ == "__main__":
     test_well_placement()